@@ -1,20 +1,21 @@
-import pandas as pd
+"""
+Rebuild backend/data/merged_ports_data.csv from the port CSVs in this folder.
 
-def merge_ports_data():
-    # Read CSV files
-    humidity = pd.read_csv('ports_humidity.csv')
-    coverage = pd.read_csv('ports_coverage_area.csv')
-    temperature = pd.read_csv('ports_temperature_range.csv')
-    wind_speed = pd.read_csv('ports_wind_speed_extended.csv')
+Kept as an entry point; the work is done by the incremental, validated ETL
+in backend/port_etl.py, which only rewrites ports whose data changed.
+"""
+import os
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+from port_etl import main  # noqa: E402
 
-    # Merge dataframes on country_code and port_name
-    merged = humidity.merge(coverage, on=['country_code', 'port_name'], how='outer') \
-        .merge(temperature, on=['country_code', 'port_name'], how='outer') \
-        .merge(wind_speed, on=['country_code', 'port_name'], how='outer')
 
-    # Save merged dataframe to new CSV
-    merged.to_csv('merged_ports_data.csv', index=False)
-    print("Merged CSV file saved as 'merged_ports_data.csv'")
+def merge_ports_data():
+    return main([])
+
 
 if __name__ == "__main__":
-    merge_ports_data()
+    sys.exit(merge_ports_data())
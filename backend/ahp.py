@@ -0,0 +1,164 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+# Saaty's random consistency index by matrix size
+RANDOM_INDEX = {1: 0.0, 2: 0.0, 3: 0.58, 4: 0.90, 5: 1.12, 6: 1.24, 7: 1.32, 8: 1.41, 9: 1.45, 10: 1.49}
+# Judgements with a consistency ratio above this are usually revised
+CONSISTENCY_THRESHOLD = 0.1
+# Rows processed at once, to bound the (rows, k, k) pairwise matrices
+CHUNK_ROWS = 65536
+
+
+def pairwise_matrices(values):
+    """(N, k, k) pairwise comparison matrices a_ij = v_i / v_j for (N, k) slider values."""
+    values = np.asarray(values, dtype=float)
+    return values[:, :, None] / values[:, None, :]
+
+
+def geometric_mean_weights(matrices):
+    """Row geometric means of each pairwise matrix, normalized to sum to 1."""
+    logs = np.log(matrices).mean(axis=2)
+    weights = np.exp(logs - logs.max(axis=1, keepdims=True))
+    return weights / weights.sum(axis=1, keepdims=True)
+
+
+def principal_eigenvectors(matrices, start=None, tol=1e-12, max_iter=100):
+    """
+    Normalized principal eigenvectors by power iteration, batched over the
+    first axis. Rows stop iterating once they change by less than tol.
+    """
+    n, k = matrices.shape[:2]
+    weights = np.full((n, k), 1.0 / k) if start is None else np.array(start, dtype=float)
+    active = np.arange(n)
+    for _ in range(max_iter):
+        updated = np.einsum('nij,nj->ni', matrices[active], weights[active])
+        updated /= updated.sum(axis=1, keepdims=True)
+        delta = np.abs(updated - weights[active]).max(axis=1)
+        weights[active] = updated
+        active = active[delta > tol]
+        if not len(active):
+            break
+    return weights
+
+
+class AHPResult:
+    """
+    Batched AHP priorities: geometric-mean and eigenvector weights (N, k),
+    principal eigenvalue, consistency index and consistency ratio (N,).
+    Rows that are not a valid positive comparison fall back to plain
+    normalization and have a NaN consistency.
+    """
+
+    def __init__(self, geometric, eigenvector, lambda_max, consistency_index, consistency_ratio):
+        self.geometric = geometric
+        self.eigenvector = eigenvector
+        self.lambda_max = lambda_max
+        self.consistency_index = consistency_index
+        self.consistency_ratio = consistency_ratio
+
+    def __len__(self):
+        return len(self.geometric)
+
+    def take(self, rows):
+        return AHPResult(self.geometric[rows], self.eigenvector[rows], self.lambda_max[rows],
+                         self.consistency_index[rows], self.consistency_ratio[rows])
+
+    @property
+    def consistent(self):
+        """Rows whose consistency ratio is within CONSISTENCY_THRESHOLD."""
+        return self.consistency_ratio <= CONSISTENCY_THRESHOLD
+
+
+def _unique_rows(rows):
+    """
+    Positions of the first occurrence of each distinct row and the inverse
+    mapping, by hashing each column and then the combined column codes.
+    """
+    combined = np.zeros(len(rows), dtype=np.int64)
+    for column in rows.T:
+        codes, uniques = pd.factorize(column, use_na_sentinel=False)
+        # Both factors are below len(rows), so the mixed radix code fits in int64
+        combined, _ = pd.factorize(combined * len(uniques) + codes)
+    # factorize numbers rows in order of first appearance
+    seen = np.maximum.accumulate(np.concatenate(([-1], combined[:-1])))
+    return np.flatnonzero(combined > seen), combined
+
+
+def _fallback_weights(values):
+    totals = values.sum(axis=1, keepdims=True)
+    uniform = np.full_like(values, 1.0 / values.shape[1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weights = values / totals
+    return np.where(np.isfinite(weights).all(axis=1, keepdims=True) & (totals > 0), weights, uniform)
+
+
+def _solve(matrices, values=None):
+    n, k = matrices.shape[:2]
+    valid = np.isfinite(matrices).all(axis=(1, 2)) & (matrices > 0).all(axis=(1, 2))
+    geometric = np.empty((n, k))
+    eigenvector = np.empty((n, k))
+    lambda_max = np.full(n, np.nan)
+
+    good = matrices[valid]
+    if len(good):
+        geometric[valid] = geometric_mean_weights(good)
+        eigenvector[valid] = principal_eigenvectors(good, start=geometric[valid])
+        product = np.einsum('nij,nj->ni', good, eigenvector[valid])
+        lambda_max[valid] = (product / eigenvector[valid]).mean(axis=1)
+    if not valid.all():
+        source = values[~valid] if values is not None else np.ones((int((~valid).sum()), k))
+        geometric[~valid] = eigenvector[~valid] = _fallback_weights(source)
+
+    consistency_index = (lambda_max - k) / (k - 1) if k > 1 else np.zeros(n)
+    consistency_index = np.where(valid, np.maximum(consistency_index, 0.0), np.nan)
+    random_index = RANDOM_INDEX.get(k, 1.49)
+    consistency_ratio = consistency_index / random_index if random_index else np.where(valid, 0.0, np.nan)
+    return AHPResult(geometric, eigenvector, lambda_max, consistency_index, consistency_ratio)
+
+
+def batch_ahp(values, memoize=True):
+    """
+    AHP priorities for a batch of judgements.
+
+    `values` is either an (N, k) array of slider values, compared as ratios
+    v_i / v_j, or an (N, k, k) array of pairwise comparison matrices. With
+    memoize, identical rows are solved once, which makes batches of slider
+    settings (a handful of distinct values per criterion) cheap however
+    long they are.
+    """
+    values = np.asarray(values, dtype=float)
+    pairwise = values.ndim == 3
+    if values.ndim not in (2, 3):
+        raise ValueError("expected an (N, k) array of slider values or (N, k, k) pairwise matrices")
+
+    if memoize and len(values) > 1:
+        first, inverse = _unique_rows(values.reshape(len(values), -1))
+        if len(first) < len(values):
+            return batch_ahp(values[first], memoize=False).take(inverse)
+
+    parts = []
+    for start in range(0, len(values), CHUNK_ROWS):
+        chunk = values[start:start + CHUNK_ROWS]
+        if pairwise:
+            parts.append(_solve(chunk))
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                parts.append(_solve(pairwise_matrices(chunk), chunk))
+    if not parts:
+        k = values.shape[1] if values.ndim > 1 else 0
+        empty = np.zeros((0, k))
+        return AHPResult(empty, empty, np.zeros(0), np.zeros(0), np.zeros(0))
+    return AHPResult(*(np.concatenate([getattr(p, name) for p in parts]) for name in
+                       ('geometric', 'eigenvector', 'lambda_max', 'consistency_index', 'consistency_ratio')))
+
+
+@functools.lru_cache(maxsize=4096)
+def slider_priorities(values):
+    """Memoized batch_ahp for a single tuple of slider values."""
+    result = batch_ahp(np.array([values], dtype=float), memoize=False)
+    for array in (result.geometric, result.eigenvector, result.lambda_max,
+                  result.consistency_index, result.consistency_ratio):
+        array.flags.writeable = False
+    return result
@@ -1,15 +1,182 @@
-from flask import Flask, request, render_template, send_file
+from flask import Flask, request, render_template, jsonify, Response, stream_with_context, send_file, redirect, url_for
 from utils import DroneSelectionSystem
+from catalog import get_catalog
+from config import Config
+from query_cache import QueryCache, canonical_query, query_key
+from candidates import CandidateSet
+from ranking import RANKING_ENGINES, get_engine
+from export import EXPORT_FORMATS, ExportUnavailable, export_stream
+from sensitivity import WeightSensitivity
+from metrics import REGISTRY, REQUEST_SECONDS, WorkerMetrics, format_fields, span
+from portfolio import PortfolioPool, portfolio_report, select_ports
+from reports import REPORT_ROWS, ArtifactCache, ReportJobs, ReportQueueFull, build_report, report_key
+import cProfile
+import json
+import logging
 import os
-import io
+import pstats
+import time
+import uuid
+
+logging.basicConfig(level=Config.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+logger = logging.getLogger("dss.requests")
 
 template_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend', 'templates'))
 app = Flask(__name__, template_folder=template_dir)
 
+# Report workers are spawned processes; when this script is run directly
+# they re-import it as __mp_main__ and only need render_report, not the
+# catalog or the caches and pools below.
+if __name__ != "__mp_main__":
+    # Load and normalize the drone and port catalogs once at startup; requests
+    # share them and pick up a fresh snapshot whenever the data files change.
+    catalog = get_catalog()
+    drone_system = DroneSelectionSystem()
+    match_cache = QueryCache(Config.MATCH_CACHE_SIZE, Config.MATCH_CACHE_TTL)
+    # Filtered candidate sets for slider-only re-ranking, keyed by token
+    candidate_store = QueryCache(Config.CANDIDATE_STORE_SIZE, Config.CANDIDATE_TTL)
+    # PDF reports rendered by worker processes into a content-addressed cache
+    report_jobs = ReportJobs(ArtifactCache(Config.REPORT_CACHE_DIR), Config.REPORT_WORKERS,
+                             Config.REPORT_MAX_PENDING)
+    # Forked workers evaluating the distinct ports of /api/v1/portfolio requests
+    portfolio_pool = PortfolioPool(Config.PORTFOLIO_WORKERS)
+
+# Slider form fields and the criteria they weight
+SLIDER_FIELDS = {
+    "battery_life_priority": "Battery Life (minutes)",
+    "wind_resistance_priority": "Wind Resistance (m/s)",
+    "camera_resolution_priority": "Camera Resolution (MP)",
+    "price_priority": "Price (EUR)",
+}
+
+@app.before_request
+def _start_request():
+    request.started_at = time.perf_counter()
+    if Config.PROFILING and request.headers.get(Config.PROFILE_HEADER):
+        request.profiler = cProfile.Profile()
+        request.profiler.enable()
+
+@app.after_request
+def _finish_request(response):
+    """Request duration metric and log line, and the profile of opted-in requests."""
+    profiler = getattr(request, "profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        profile_id = uuid.uuid4().hex[:16]
+        os.makedirs(Config.PROFILE_DIR, exist_ok=True)
+        path = os.path.join(Config.PROFILE_DIR, f"{profile_id}.prof")
+        stats = pstats.Stats(profiler)
+        stats.dump_stats(path)
+        response.headers["X-Profile-Id"] = profile_id
+        logger.info(format_fields(event="profile", path=request.path, profile=path,
+                                  calls=stats.total_calls, seconds=stats.total_tt))
+    started_at = getattr(request, "started_at", None)
+    if started_at is not None:
+        elapsed = time.perf_counter() - started_at
+        endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+        REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, status=response.status_code)
+        logger.debug(format_fields(event="request", method=request.method, endpoint=endpoint,
+                                  status=response.status_code, duration_ms=elapsed * 1000))
+    return response
+
+def _slider_values(source):
+    """Read the four AHP slider priorities (default 3) from a form or JSON dict."""
+    return {criterion: float(source.get(field, 3)) for field, criterion in SLIDER_FIELDS.items()}
+
+def _optional_float(source, field):
+    value = source.get(field)
+    return None if value in (None, "") else float(value)
+
+def _page(source, default_top_k=None):
+    """Read top_k/offset paging fields; top_k is capped at 1000 rows."""
+    top_k = source.get("top_k", default_top_k)
+    top_k = None if top_k in (None, "") else max(0, min(int(top_k), 1000))
+    offset = max(0, int(source.get("offset") or 0))
+    return top_k, offset
+
+def _ranking_method(source):
+    """Validated ranking method name (default 'wsm')."""
+    return get_engine(source.get("method") or "wsm").name
+
+def _request_fields():
+    """JSON body, or form/query fields with repeated 'purpose' fields as a list."""
+    payload = request.get_json(silent=True)
+    if payload is not None:
+        return payload
+    fields = request.values.to_dict()
+    if "purpose" in request.values:
+        fields["purposes"] = request.values.getlist("purpose")
+    return fields
+
+def _filter_fields(payload):
+    """Port, purposes, budget and maintenance cap from a JSON request body."""
+    purposes = payload.get("purposes", payload.get("purpose", []))
+    if isinstance(purposes, str):
+        purposes = [purposes]
+    return (payload.get("port"), purposes,
+            _optional_float(payload, "budget"), _optional_float(payload, "maintenance_cost"))
+
+def _operability(source):
+    """Optional minimum fraction of flyable hours (0-1) replacing the wind and temperature cutoffs."""
+    threshold = _optional_float(source, "operability")
+    if threshold is not None and not 0 <= threshold <= 1:
+        raise ValueError("operability must be a fraction between 0 and 1")
+    return threshold
+
+def _flag(source, field):
+    """A checkbox or JSON boolean field."""
+    value = source.get(field)
+    return value is True or str(value).lower() in ("1", "true", "yes", "on")
+
+def _records(df):
+    """DataFrame rows as JSON-safe dicts (NaN becomes null)."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+def _candidate_set(payload, snapshot):
+    """
+    Token and candidate set for the filter fields of a request, filtering the
+    catalog only when the set is not already stored.
+    """
+    port_name, purposes, budget, max_maintenance_cost = _filter_fields(payload)
+    operability = _operability(payload)
+    query = canonical_query(drone_system, snapshot, port_name, purposes, budget, max_maintenance_cost, {},
+                            operability=operability)
+    token = f"{snapshot.version}-{query_key(query)[:32]}"
+    candidates = candidate_store.get(token, snapshot.version)
+    if candidates is None:
+        selection = drone_system.run_selection(
+            port_name=query["port"],
+            selected_purposes=query["purposes"],
+            budget=budget,
+            max_maintenance_cost=max_maintenance_cost,
+            catalog=snapshot,
+            operability_threshold=operability
+        )
+        candidates = CandidateSet(drone_system, selection["results"], SLIDER_FIELDS.values(),
+                                  selection["summary"], selection["total"])
+        candidate_store.put(token, snapshot.version, candidates)
+    return token, candidates
+
 @app.route("/", methods=["GET"])
 def home():
     """Render the homepage."""
-    return render_template("index.html")
+    port_index = catalog.snapshot().port_index
+    countries = port_index.countries_list() if port_index is not None else []
+    methods = [(name, engine.label) for name, engine in RANKING_ENGINES.items()]
+    return render_template("index.html", countries=countries, ranking_methods=methods)
+
+@app.route("/api/v1/ports")
+def port_autocomplete():
+    """Port name suggestions for the search box, optionally limited to one country."""
+    port_index = catalog.snapshot().port_index
+    if port_index is None:
+        return jsonify([])
+    limit = min(request.args.get("limit", 10, type=int), 50)
+    return jsonify(port_index.complete(
+        request.args.get("q", ""),
+        country=request.args.get("country") or None,
+        limit=limit
+    ))
 
 @app.route("/match-drones", methods=["POST"])
 def match_drones():
@@ -21,55 +188,531 @@ def match_drones():
     user_budget = float(request.form.get("budget"))
     max_maintenance_cost = float(request.form.get("maintenance_cost"))
 
-    # Get AHP slider values from form
-    slider_values = {
-        "Battery Life (minutes)": float(request.form.get("battery_life_priority", 3)),
-        "Wind Resistance (m/s)": float(request.form.get("wind_resistance_priority", 3)),
-        "Camera Resolution (MP)": float(request.form.get("camera_resolution_priority", 3)),
-        "Price (EUR)": float(request.form.get("price_priority", 3))
-    }
-
-    # Initialize drone selection system
-    drone_system = DroneSelectionSystem()
+    # Get AHP slider values and ranking method from form
+    slider_values = _slider_values(request.form)
+    top_k, offset = _page(request.form, Config.RESULTS_PAGE_SIZE)
+    try:
+        method = _ranking_method(request.form)
+        operability = _operability(request.form)
+    except ValueError as e:
+        return str(e), 400
+    fleet = _flag(request.form, "fleet")
 
-    # Run selection pipeline
-    results_df, summary = drone_system.select_drones(
+    # Run selection pipeline against the shared catalog, ranking only the requested page
+    snapshot = catalog.snapshot()
+    selection = drone_system.run_selection(
         port_name=port_name,
         selected_purposes=purposes,
         slider_values=slider_values,
         budget=user_budget,
-        max_maintenance_cost=max_maintenance_cost
+        max_maintenance_cost=max_maintenance_cost,
+        catalog=snapshot,
+        top_k=top_k,
+        offset=offset,
+        method=method,
+        operability_threshold=operability,
+        fleet=fleet
     )
+    results_df = selection["results"]
 
-    # Convert results to dict for template
-    drones = results_df.to_dict(orient="records") if not results_df.empty else []
+    # No single drone meets every purpose: suggest models that cover them together
+    mix = None
+    if results_df.empty and offset == 0 and len(set(purposes)) > 1:
+        mix = drone_system.select_mixed_fleet(
+            port_name=port_name,
+            selected_purposes=purposes,
+            slider_values=slider_values,
+            budget=user_budget,
+            max_maintenance_cost=max_maintenance_cost,
+            catalog=snapshot,
+            operability_threshold=operability,
+            fleet=fleet
+        )
+        mix["models"] = mix["models"].to_dict(orient="records")
 
-    # Send matched drones and summary to frontend
-    return render_template("results.html", drones=drones, summary=summary)
+    with span("render", rows_in=len(results_df)):
+        # Convert results to dict for template
+        drones = results_df.to_dict(orient="records") if not results_df.empty else []
 
-@app.route("/export/csv")
-def export_csv():
-    """Export current results as CSV."""
-    # For simplicity, export all drones without filters
-    drone_system = DroneSelectionSystem()
-    results_df, _ = drone_system.select_drones(
-        port_name=None,
-        selected_purposes=[],
-        slider_values={},
-        budget=float('inf'),
-        max_maintenance_cost=float('inf')
+        # Original form fields, re-posted by the pagination buttons
+        form_fields = [(k, v) for k in request.form if k not in ("top_k", "offset") for v in request.form.getlist(k)]
+
+        # Per-constraint elimination counts explain an empty result
+        report = selection["diagnostics"]
+        constraints = report.constraints(near_misses=1) if report is not None else []
+
+        # Send matched drones and summary to frontend
+        return render_template("results.html", drones=drones, summary=selection["summary"],
+                               total=selection["total"], offset=offset, page_size=top_k, form_fields=form_fields,
+                               score_column=get_engine(method).score_column, constraints=constraints,
+                               fleet=selection["fleet"], mix=mix)
+
+@app.route("/api/v1/match", methods=["POST"])
+def api_match():
+    """
+    JSON variant of /match-drones. Accepts the same fields as the form
+    (port, purpose or purposes, budget, maintenance_cost, the *_priority
+    sliders and the ranking method) plus optional top_k/offset paging and
+    an operability threshold (the fraction of the port's recorded weather
+    hours a drone must be able to fly, instead of the worst-case wind and
+    temperature cutoffs) and `fleet` (size a fleet per drone for continuous
+    coverage of the port and rank by fleet cost); results are cached per
+    canonical query and catalog version.
+    """
+    payload = request.get_json(silent=True) or {}
+    try:
+        port_name, purposes, budget, max_maintenance_cost = _filter_fields(payload)
+        slider_values = _slider_values(payload)
+        top_k, offset = _page(payload)
+        method = _ranking_method(payload)
+        operability = _operability(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+    fleet = _flag(payload, "fleet")
+
+    snapshot = catalog.snapshot()
+    query = canonical_query(drone_system, snapshot, port_name, purposes, budget, max_maintenance_cost,
+                            slider_values, top_k, offset, method=method, operability=operability, fleet=fleet)
+    key = query_key(query)
+    etag = f"{snapshot.version}-{key[:32]}"
+    if request.if_none_match.contains(etag):
+        not_modified = Response(status=304)
+        not_modified.set_etag(etag)
+        return not_modified
+
+    body = match_cache.get(key, snapshot.version)
+    if body is None:
+        selection = drone_system.run_selection(
+            port_name=query["port"],
+            selected_purposes=query["purposes"],
+            slider_values=slider_values,
+            budget=budget,
+            max_maintenance_cost=max_maintenance_cost,
+            catalog=snapshot,
+            top_k=top_k,
+            offset=offset,
+            method=method,
+            operability_threshold=operability,
+            fleet=fleet
+        )
+        with span("render", rows_in=len(selection["results"])):
+            body = json.dumps({
+                "catalog_version": snapshot.version,
+                "query": query,
+                "summary": selection["summary"],
+                "operability": selection["operability"],
+                "fleet": selection["fleet"],
+                "total": selection["total"],
+                "offset": offset,
+                "top_k": top_k,
+                "drones": _records(selection["results"]),
+            }).encode()
+        match_cache.put(key, snapshot.version, body)
+
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+@app.route("/api/v1/match/diagnostics", methods=["POST"])
+def api_match_diagnostics():
+    """
+    Why drones were eliminated for the /api/v1/match filter fields: per
+    constraint the drones it eliminates and its closest near-misses
+    (near_misses, default 5), and the constraints each eliminated drone
+    fails, for the named `drones` or the first `limit` (default 100).
+    """
+    payload = request.get_json(silent=True) or {}
+    try:
+        port_name, purposes, budget, max_maintenance_cost = _filter_fields(payload)
+        operability = _operability(payload)
+        near_misses = max(0, min(int(payload.get("near_misses", 5)), 50))
+        limit = max(0, min(int(payload.get("limit", 100)), 1000))
+        drones = payload.get("drones")
+        if isinstance(drones, str):
+            drones = [drones]
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+
+    snapshot = catalog.snapshot()
+    query = canonical_query(drone_system, snapshot, port_name, purposes, budget, max_maintenance_cost, {},
+                            operability=operability)
+    selection = drone_system.run_selection(
+        port_name=query["port"],
+        selected_purposes=query["purposes"],
+        budget=budget,
+        max_maintenance_cost=max_maintenance_cost,
+        catalog=snapshot,
+        top_k=0,
+        diagnostics=True,
+        operability_threshold=operability
+    )
+    if selection["diagnostics"] is None:
+        return jsonify({"error": selection["summary"]}), 503
+    return jsonify({
+        "catalog_version": snapshot.version,
+        "query": query,
+        "summary": selection["summary"],
+        "diagnostics": selection["diagnostics"].to_dict(near_misses, drones, limit),
+    })
+
+@app.route("/api/v1/fleet-mix", methods=["POST"])
+def api_fleet_mix():
+    """
+    A mixed fleet for the /api/v1/match fields: the fewest drone models
+    (at most max_models, default 3) that together cover every purpose, one
+    unit each, within the budget and maintenance cap as totals, with the
+    highest total WSM score. The search stops after time_limit seconds
+    (default 1) with the best fleet found; "optimal" tells whether it
+    completed.
+    """
+    payload = request.get_json(silent=True) or {}
+    try:
+        port_name, purposes, budget, max_maintenance_cost = _filter_fields(payload)
+        slider_values = _slider_values(payload)
+        max_models = max(1, min(int(payload.get("max_models", 3)), 5))
+        time_limit = max(0.05, min(float(payload.get("time_limit", 1.0)), 10.0))
+        operability = _operability(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+    fleet = _flag(payload, "fleet")
+
+    snapshot = catalog.snapshot()
+    query = canonical_query(drone_system, snapshot, port_name, purposes, budget, max_maintenance_cost, slider_values,
+                            operability=operability, fleet=fleet)
+    mix = drone_system.select_mixed_fleet(
+        port_name=query["port"],
+        selected_purposes=query["purposes"],
+        slider_values=slider_values,
+        budget=budget,
+        max_maintenance_cost=max_maintenance_cost,
+        catalog=snapshot,
+        max_models=max_models,
+        time_limit=time_limit,
+        operability_threshold=operability,
+        fleet=fleet
     )
-    output = io.StringIO()
-    results_df.to_csv(output, index=False)
-    output.seek(0)
-    return send_file(io.BytesIO(output.getvalue().encode()), mimetype='text/csv',
-                     as_attachment=True, download_name='drones.csv')
+    return jsonify({
+        "catalog_version": snapshot.version,
+        "query": query,
+        "summary": mix["summary"],
+        "uncoverable": mix["uncoverable"],
+        "optimal": mix["optimal"],
+        "score": mix["score"],
+        "price": mix["price"],
+        "maintenance": mix["maintenance"],
+        "models": _records(mix["models"]),
+    })
+
+@app.route("/api/v1/portfolio", methods=["POST"])
+def api_portfolio():
+    """
+    The /api/v1/match fields evaluated for many ports at once: `ports` (a
+    list of names, or "all") and/or every port of `country`. Returns each
+    port's top_k ranked drones (default 5) and a cross-port report, e.g.
+    the drone models deployable at the most ports.
+    """
+    payload = request.get_json(silent=True) or {}
+    try:
+        _, purposes, budget, max_maintenance_cost = _filter_fields(payload)
+        slider_values = _slider_values(payload)
+        top_k = max(1, min(int(payload.get("top_k", 5)), 100))
+        method = _ranking_method(payload)
+        operability = _operability(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+    fleet = _flag(payload, "fleet")
+
+    snapshot = catalog.snapshot()
+    names, unknown = select_ports(snapshot.ports, payload.get("ports"), payload.get("country"), snapshot.port_index)
+    if not names:
+        return jsonify({"error": "No ports selected", "unknown_ports": unknown}), 400
+    query = canonical_query(drone_system, snapshot, None, purposes, budget, max_maintenance_cost, slider_values,
+                            top_k, method=method, operability=operability, fleet=fleet)
+    groups = drone_system.evaluate_ports(
+        names, snapshot, top_k, executor=portfolio_pool.executor(drone_system, snapshot),
+        selected_purposes=query["purposes"], slider_values=slider_values, budget=budget,
+        max_maintenance_cost=max_maintenance_cost, method=method, operability_threshold=operability, fleet=fleet)
+
+    with span("render", rows_in=len(names)):
+        by_port = {}
+        for group in groups:
+            drones = _records(group["results"])
+            for port in group["ports"]:
+                by_port[port] = {"port": port, "summary": group["summary"], "total": group["total"], "drones": drones}
+        return jsonify({
+            "catalog_version": snapshot.version,
+            "query": query,
+            "unknown_ports": unknown,
+            "ports": [by_port[port] for port in names],
+            "report": portfolio_report(groups, top_k),
+        })
+
+@app.route("/api/v1/candidates", methods=["POST"])
+def api_candidates():
+    """
+    Filter drones by port, purposes, budget and maintenance cap and keep the
+    candidate set under a short-lived token for /api/v1/rerank.
+    """
+    payload = request.get_json(silent=True) or {}
+    try:
+        token, candidates = _candidate_set(payload, catalog.snapshot())
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+
+    return jsonify({
+        "token": token,
+        "expires_in": candidate_store.ttl,
+        "summary": candidates.summary,
+        "total": candidates.total,
+    })
+
+@app.route("/api/v1/rerank", methods=["POST"])
+def api_rerank():
+    """Re-rank a stored candidate set for new slider priorities."""
+    payload = request.get_json(silent=True) or {}
+    snapshot = catalog.snapshot()
+    candidates = candidate_store.get(payload.get("token"), snapshot.version)
+    if candidates is None:
+        return jsonify({"error": "Unknown or expired token; request /api/v1/candidates again"}), 410
+    try:
+        slider_values = _slider_values(payload)
+        top_k, offset = _page(payload, Config.RESULTS_PAGE_SIZE)
+        method = _ranking_method(payload)
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+
+    ranked, total = candidates.rank(slider_values, top_k, offset, method)
+    return jsonify({
+        "token": payload.get("token"),
+        "summary": candidates.summary,
+        "total": total,
+        "method": method,
+        "offset": offset,
+        "top_k": top_k,
+        "weights": dict(zip(candidates.criteria, candidates.weights(slider_values).round(6).tolist())),
+        "drones": _records(ranked),
+    })
+
+@app.route("/api/v1/analysis", methods=["POST"])
+def api_analysis():
+    """
+    Monte Carlo weight sensitivity of the ranking: how often each drone ranks
+    first or in the top N when the weights are sampled around the sliders
+    ("local") or uniformly over all weightings ("uniform").
+    """
+    payload = request.get_json(silent=True) or {}
+    snapshot = catalog.snapshot()
+    try:
+        if payload.get("token"):
+            token = payload["token"]
+            candidates = candidate_store.get(token, snapshot.version)
+            if candidates is None:
+                return jsonify({"error": "Unknown or expired token; request /api/v1/candidates again"}), 410
+        else:
+            token, candidates = _candidate_set(payload, snapshot)
+        slider_values = _slider_values(payload)
+        mode = payload.get("mode", "local")
+        if mode not in ("local", "uniform"):
+            raise ValueError("mode must be 'local' or 'uniform'")
+        samples = max(1, min(int(payload.get("samples") or Config.ANALYSIS_SAMPLES), Config.ANALYSIS_MAX_SAMPLES))
+        concentration = float(payload.get("concentration") or 100.0)
+        top = max(1, min(int(payload.get("top") or 10), 100))
+        seed = None if payload.get("seed") in (None, "") else int(payload["seed"])
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+
+    weights = candidates.weights(slider_values)
+    engine = WeightSensitivity(candidates.matrix, candidates.valid, candidates.bonus, top)
+    result = engine.run(weights if mode == "local" else None, samples, concentration, seed)
+    names = candidates.candidates["Drone Name"].tolist() if len(candidates.candidates) else []
+    drones = result.records(names, engine.base_ranks(weights))
+    for record in drones:
+        del record["position"]
+
+    return jsonify({
+        "token": token,
+        "summary": candidates.summary,
+        "total": candidates.total,
+        "mode": mode,
+        "samples": samples,
+        "top": engine.top,
+        "weights": dict(zip(candidates.criteria, weights.round(6).tolist())),
+        "drones": drones,
+    })
+
+@app.route("/analysis")
+def analysis():
+    """Weight sensitivity page; query arguments pre-fill the filters and sliders."""
+    return render_template("analysis.html", args=request.args, purposes=request.args.getlist("purpose"),
+                           purpose_options=list(drone_system.purpose_mapping))
+
+@app.route("/metrics")
+def metrics():
+    """
+    Stage and request timing histograms in the Prometheus text format;
+    under the pre-fork server, summed over all of its workers.
+    """
+    directory = app.config.get("METRICS_DIR")
+    text = WorkerMetrics(directory).render() if directory else REGISTRY.render()
+    return Response(text, mimetype="text/plain; version=0.0.4")
+
+@app.route("/ready")
+def ready():
+    """Readiness probe: 200 with the catalog version once it is loaded, 503 while the worker drains."""
+    if app.config.get("DRAINING"):
+        return jsonify({"status": "draining", "pid": os.getpid()}), 503
+    snapshot = catalog.snapshot()
+    return jsonify({"status": "ready", "catalog_version": snapshot.version, "drones": len(snapshot.drones),
+                    "ports": 0 if snapshot.ports is None else len(snapshot.ports), "pid": os.getpid()})
+
+@app.route("/api/v1/match/cache")
+def api_match_cache():
+    """Hit/miss counters of the match result cache."""
+    return jsonify(match_cache.stats())
+
+@app.route("/api/v1/drones/<path:drone_name>/ports")
+def drone_ports(drone_name):
+    """List the ports where a drone meets the environmental constraints."""
+    snapshot = catalog.snapshot()
+    if snapshot.compatibility is None:
+        return jsonify({"error": "Port data is not available"}), 503
+    if not (snapshot.drones["Drone Name"] == drone_name).any():
+        return jsonify({"error": f"Unknown drone: {drone_name}"}), 404
+    ports = snapshot.compatibility.ports_for_drone(drone_name, snapshot.drones, snapshot.ports)
+    return jsonify({
+        "drone": drone_name,
+        "count": len(ports),
+        "ports": ports[["country_code", "port_name"]].to_dict(orient="records"),
+    })
+
+@app.route("/export/<fmt>", methods=["GET", "POST"])
+def export_results(fmt):
+    """
+    Stream the ranked results of a query as csv, jsonl, parquet or arrow.
+
+    Takes the /api/v1/match fields (JSON body, form or query string) or a
+    candidate token, an optional top_k row limit and gzip=1 for a gzip
+    file. Rows are ranked once and encoded chunk by chunk as they are sent.
+    """
+    fields = _request_fields()
+    snapshot = catalog.snapshot()
+    try:
+        if fields.get("token"):
+            token = fields["token"]
+            candidates = candidate_store.get(token, snapshot.version)
+            if candidates is None:
+                return jsonify({"error": "Unknown or expired token; request /api/v1/candidates again"}), 410
+        else:
+            token, candidates = _candidate_set(fields, snapshot)
+        slider_values = _slider_values(fields)
+        method = _ranking_method(fields)
+        top_k, _ = _page(fields)
+        compress = str(fields.get("gzip", "")).lower() in ("1", "true", "yes")
+        chunks = candidates.iter_ranked(slider_values, method, Config.EXPORT_CHUNK_ROWS, top_k)
+        stream = export_stream(chunks, fmt, compress)
+    except ExportUnavailable as e:
+        return jsonify({"error": str(e)}), 501
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    filename = f"drones.{extension}.gz" if compress else f"drones.{extension}"
+    return Response(stream_with_context(stream), mimetype="application/gzip" if compress else mimetype,
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+def _submit_report(fields):
+    """
+    Queue the PDF report for the /api/v1/match fields of a request. The job
+    id is the report's content key, so a repeated request finds the queued
+    job or the finished artifact instead of rendering again.
+    """
+    snapshot = catalog.snapshot()
+    port_name, purposes, budget, max_maintenance_cost = _filter_fields(fields)
+    slider_values = _slider_values(fields)
+    method = _ranking_method(fields)
+    operability = _operability(fields)
+    fleet = _flag(fields, "fleet")
+    query = canonical_query(drone_system, snapshot, port_name, purposes, budget, max_maintenance_cost,
+                            slider_values, top_k=REPORT_ROWS, method=method, operability=operability, fleet=fleet)
+
+    def build():
+        selection = drone_system.run_selection(
+            port_name=query["port"],
+            selected_purposes=query["purposes"],
+            slider_values=slider_values,
+            budget=budget,
+            max_maintenance_cost=max_maintenance_cost,
+            catalog=snapshot,
+            top_k=REPORT_ROWS,
+            method=method,
+            operability_threshold=operability,
+            fleet=fleet
+        )
+        return build_report(query, snapshot.version, selection, slider_values, get_engine(method).score_column)
+
+    return report_jobs.submit(report_key(query, snapshot.version), build)
+
+def _report_status(status):
+    status = dict(status)
+    status["status_url"] = url_for("report_status", job_id=status["id"])
+    status["download_url"] = url_for("report_download", job_id=status["id"])
+    return jsonify(status), 200 if status["status"] == "done" else 202
+
+def _valid_job_id(job_id):
+    return len(job_id) == 64 and all(c in "0123456789abcdef" for c in job_id)
+
+@app.route("/api/v1/reports", methods=["POST"])
+def api_reports():
+    """
+    Queue a PDF report for the /api/v1/match fields. Returns 202 with the
+    job id and its status and download URLs, or 200 when the report is
+    already available; 503 when too many reports are being prepared.
+    """
+    try:
+        status = _submit_report(_request_fields())
+    except ReportQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+    return _report_status(status)
+
+@app.route("/api/v1/reports/<job_id>")
+def report_status(job_id):
+    """Status of a report job: queued, running, done or failed."""
+    status = report_jobs.status(job_id) if _valid_job_id(job_id) else None
+    if status is None:
+        return jsonify({"error": "Unknown report"}), 404
+    return _report_status(status)
+
+@app.route("/api/v1/reports/<job_id>/pdf")
+def report_download(job_id):
+    """The finished report. Its content never changes, so clients may cache it indefinitely."""
+    path = report_jobs.cache.get(job_id) if _valid_job_id(job_id) else None
+    if path is None:
+        status = report_jobs.status(job_id) if _valid_job_id(job_id) else None
+        if status is None:
+            return jsonify({"error": "Unknown report"}), 404
+        return jsonify(status), 409
+    response = send_file(path, mimetype="application/pdf", as_attachment=True,
+                         download_name="drone-report.pdf", etag=job_id, max_age=365 * 24 * 3600)
+    response.cache_control.immutable = True
+    return response
 
-@app.route("/export/pdf")
+@app.route("/export/pdf", methods=["GET", "POST"])
 def export_pdf():
-    """Export current results as PDF."""
-    # PDF export implementation placeholder
-    return "PDF export not implemented yet", 501
+    """
+    Export a query's results as a PDF report: redirects to the report when it
+    is ready, otherwise queues it and returns its job status (202).
+    """
+    try:
+        status = _submit_report(_request_fields())
+    except ReportQueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "5"}
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": f"Invalid request: {e}"}), 400
+    if status["status"] == "done":
+        return redirect(url_for("report_download", job_id=status["id"]), 303)
+    return _report_status(status)
 
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,70 @@
+import numpy as np
+
+from ranking import DecisionMatrix, get_engine, rank_order, weighted_scores
+
+
+class CandidateSet:
+    """
+    The filtered candidates of one query with their normalized criteria
+    matrix, kept so that moving the priority sliders only re-weights it.
+    """
+
+    def __init__(self, system, candidates, criteria, summary='', total=None):
+        self.system = system
+        self.candidates = candidates
+        self.criteria = list(criteria)
+        self.summary = summary
+        self.total = len(candidates) if total is None else total
+        self.decision = DecisionMatrix(candidates, self.criteria)
+        self.matrix, self.valid = self.decision.normalized, self.decision.valid
+        self.bonus = system._cost_effectiveness_bonus(candidates)
+
+    def weights(self, slider_values):
+        """AHP weights for the slider values as a vector aligned with the criteria."""
+        priority_weights = self.system.ahp_priority_scaling(slider_values) if slider_values else {}
+        return np.array([priority_weights.get(c, 0.0) for c in self.criteria], dtype=float)
+
+    def _ranking(self, slider_values, method='wsm', limit=None):
+        """
+        Positions of the first `limit` ranked candidates (all when None), the
+        number of ranked candidates and a function building result rows for
+        a slice of those positions.
+        """
+        engine = get_engine(method)
+        if self.candidates.empty or not slider_values:
+            count = len(self.candidates) if limit is None else min(limit, len(self.candidates))
+            return np.arange(count), len(self.candidates), lambda rows: self.candidates.iloc[rows]
+
+        weights = self.weights(slider_values)
+        if engine.name == 'wsm':
+            scores = weighted_scores(self.matrix, self.valid, weights, self.bonus)
+            order = rank_order(scores, limit)
+            return order, len(self.candidates), lambda rows: self.system.wsm_rows(
+                self.candidates, self.criteria, self.matrix, self.valid, weights, scores, rows)
+
+        order, scores, total = engine.rank(self.decision, weights, limit)
+
+        def rows_of(rows):
+            ranked = self.candidates.iloc[rows].copy()
+            ranked[engine.score_column] = scores[rows]
+            return ranked
+        return order, total, rows_of
+
+    def rank(self, slider_values, top_k=None, offset=0, method='wsm'):
+        """
+        Ranked candidates for new slider values, without re-running any filter,
+        and the number of ranked candidates (see DroneSelectionSystem.rank_candidates).
+        """
+        order, total, rows_of = self._ranking(slider_values, method, None if top_k is None else offset + top_k)
+        return rows_of(order[offset:]), total
+
+    def iter_ranked(self, slider_values, method='wsm', chunk_rows=1000, limit=None):
+        """
+        Ranked result rows in chunks of chunk_rows, ranking only once. With
+        no rows, one empty chunk carries the columns (a CSV header, a schema).
+        """
+        order, _, rows_of = self._ranking(slider_values, method, limit)
+        if not len(order):
+            yield self.candidates.iloc[:0]
+        for start in range(0, len(order), chunk_rows):
+            yield rows_of(order[start:start + chunk_rows])
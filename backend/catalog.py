@@ -0,0 +1,157 @@
+import hashlib
+import os
+import threading
+import time
+
+from compat import CompatibilityMatrix
+from config import Config
+from ports import PortIndex
+from purposes import PurposeIndex
+from utils import DroneSelectionSystem
+from weather import MANIFEST, WeatherStore
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+
+def resolve_data_path(path):
+    """Resolve a configured data path relative to the project root."""
+    if os.path.isabs(path):
+        return path
+    return os.path.join(PROJECT_ROOT, path)
+
+
+def _file_signature(path):
+    """Cheap change detector: (mtime_ns, size), or None if the file is missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _file_digest(path):
+    """Content hash used to confirm that a changed signature is a real change."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as handle:
+            for block in iter(lambda: handle.read(1 << 20), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+class CatalogSnapshot:
+    """
+    One fully built generation of the drone and port catalogs.
+
+    Snapshots are never modified after construction; a reload builds a new
+    snapshot and swaps the reference, so a request holding an older snapshot
+    keeps a consistent view until it finishes.
+    """
+
+    def __init__(self, drones, ports, version, digests, compatibility=None, purposes=None, port_index=None,
+                 weather=None):
+        self.drones = drones
+        self.ports = ports
+        self.version = version
+        self.digests = digests
+        self.compatibility = compatibility
+        self.purposes = purposes
+        self.port_index = port_index
+        self.weather = weather
+        self.loaded_at = time.time()
+
+
+class DroneCatalog:
+    """
+    Loads and normalizes the drone and port datasets once and reloads them
+    when the underlying files change. A compiled hourly weather store is
+    opened with them when one exists; recompiling it also counts as a change.
+    """
+
+    def __init__(self, drone_data_path=None, port_data_path=None, check_interval=1.0, system=None,
+                 weather_dir=None):
+        self.drone_data_path = resolve_data_path(drone_data_path or Config.DRONE_DATA_PATH)
+        self.port_data_path = resolve_data_path(port_data_path or Config.PORT_DATA_PATH)
+        self.weather_dir = resolve_data_path(weather_dir or Config.WEATHER_DATA_DIR)
+        self.check_interval = check_interval
+        self.system = system or DroneSelectionSystem()
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._signatures = None
+        self._last_check = 0.0
+
+    def _paths(self):
+        return (self.drone_data_path, self.port_data_path, os.path.join(self.weather_dir, MANIFEST))
+
+    def _build(self, digests, previous=None):
+        """Load both datasets into a new snapshot (runs outside any reader's view)."""
+        drones = self.system.load_and_normalize_drone_data(self.drone_data_path)
+        try:
+            ports = self.system.load_port_data(self.port_data_path)
+        except FileNotFoundError:
+            ports = None
+        version = hashlib.sha256('|'.join(d or '' for d in digests).encode()).hexdigest()[:16]
+        compatibility = None
+        port_index = None
+        if ports is not None:
+            port_index = PortIndex(ports)
+            compatibility = CompatibilityMatrix.rebuild(
+                previous.compatibility if previous is not None else None, self.system, drones, ports)
+        purposes = PurposeIndex(self.system, drones)
+        weather = WeatherStore.open(self.weather_dir)
+        return CatalogSnapshot(drones, ports, version, digests, compatibility, purposes, port_index, weather)
+
+    def reload(self, force=False, blocking=True):
+        """
+        Rebuild the catalog if either file's content changed (or always, with force).
+        Returns the current snapshot; with blocking=False a caller that finds a
+        rebuild already in progress gets the previous snapshot instead of waiting.
+        """
+        if not self._lock.acquire(blocking=blocking):
+            return self._snapshot
+        try:
+            current = self._snapshot
+            self._last_check = time.monotonic()
+            signatures = tuple(_file_signature(p) for p in self._paths())
+            if not force and current is not None and signatures == self._signatures:
+                return current
+
+            digests = tuple(_file_digest(p) for p in self._paths())
+            if force or current is None or digests != current.digests:
+                self._snapshot = self._build(digests, current)
+            # A touched-but-unchanged file only needs its new signature recorded
+            self._signatures = signatures
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+    def snapshot(self):
+        """Return the current snapshot, reloading first if the files have changed."""
+        current = self._snapshot
+        if current is None:
+            return self.reload()
+        if time.monotonic() - self._last_check >= self.check_interval:
+            return self.reload(blocking=False)
+        return current
+
+    @property
+    def version(self):
+        return self.snapshot().version
+
+
+_default_catalog = None
+_default_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """Return the process-wide catalog, loading it on first use."""
+    global _default_catalog
+    if _default_catalog is None:
+        with _default_catalog_lock:
+            if _default_catalog is None:
+                catalog = DroneCatalog()
+                catalog.reload()
+                _default_catalog = catalog
+    return _default_catalog
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+# Bumped whenever the on-disk layout or the loaders' normalization changes
+COLUMNAR_FORMAT = 1
+# Text columns with at most this share of distinct values are stored as categoricals
+CATEGORY_MAX_FRACTION = 0.5
+# Columns that use one dictionary between them, so equal labels share one code
+SHARED_DICTIONARIES = [
+    ('Real-Time Data Streaming', 'Infrared/Night Vision Capability'),
+]
+MANIFEST = 'manifest.json'
+
+
+def cache_directory(source_path, root=None):
+    """Cache directory for a CSV: <root>/<name>, by default next to the CSV under .columnar/."""
+    root = root or os.path.join(os.path.dirname(os.path.abspath(source_path)), '.columnar')
+    return os.path.join(root, os.path.basename(source_path))
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def narrow_numeric(values):
+    """
+    The narrowest dtype of the same kind that holds every value exactly:
+    int16 or int32 for integers, float32 for floats whose float64 round
+    trip is lossless; otherwise the values unchanged.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind not in 'iu' or not len(values):
+        if values.dtype.kind == 'f' and values.dtype.itemsize > 4:
+            narrowed = values.astype(np.float32)
+            if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+                return narrowed
+        return values
+    for dtype in (np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if values.min() >= info.min and values.max() <= info.max:
+            return values.astype(dtype)
+    return values
+
+
+def _codes_dtype(size):
+    # The code width pandas itself picks, so categoricals wrap the stored codes without a copy
+    return pd.Categorical.from_codes([], categories=pd.RangeIndex(size)).codes.dtype
+
+
+def _encode(series, categories):
+    codes = pd.Categorical(series, categories=categories).codes
+    return codes.astype(_codes_dtype(len(categories)), copy=False)
+
+
+def _pack_labels(labels):
+    """Labels as one UTF-8 blob and the character offset of each label's end."""
+    offsets = np.cumsum([0] + [len(label) for label in labels], dtype=np.int64)
+    return ''.join(labels).encode(), offsets
+
+
+def _unpack_labels(data, offsets):
+    text = data.tobytes().decode()
+    return pd.Index([text[a:b] for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())], dtype=object)
+
+
+def _text_columns(df):
+    return [c for c in df.columns if df[c].dtype.kind not in 'biufcmM']
+
+
+def write_columnar(df, directory, source_path):
+    """
+    Compile a normalized frame into `directory`: one .npy file per numeric
+    column (narrowed where exact) and, for text columns, integer codes plus
+    a dictionary file shared by columns with the same labels. The manifest
+    is replaced last and atomically, so readers see the old or the new
+    cache, never a partial one.
+    """
+    os.makedirs(directory, exist_ok=True)
+    generation = uuid.uuid4().hex[:12]
+    rows = len(df)
+    # One dictionary per shared group, else per column; equal dictionaries are stored once
+    groups = {c: (c,) for c in _text_columns(df)}
+    for group in SHARED_DICTIONARIES:
+        members = tuple(c for c in group if c in groups)
+        for c in members:
+            groups[c] = members
+    categories = {}
+    for group in set(groups.values()):
+        labels = pd.unique(pd.concat([df[c].dropna().astype(str) for c in group], ignore_index=True))
+        for c in group:
+            categories[c] = sorted(labels)
+
+    def save(array, kind):
+        name = f'{generation}-{kind}-{len(saved)}.npy'
+        np.save(os.path.join(directory, name), np.ascontiguousarray(array), allow_pickle=False)
+        saved.append(name)
+        return name
+
+    saved = []
+    dictionaries = {}
+    columns = []
+    for column in df.columns:
+        if column in categories:
+            labels = categories[column]
+            text, offsets = _pack_labels(labels)
+            digest = hashlib.sha256(text).hexdigest()
+            if digest not in dictionaries:
+                dictionaries[digest] = {'data': save(np.frombuffer(text, dtype=np.uint8), 'dict'),
+                                        'offsets': save(offsets, 'offsets')}
+            distinct = df[column].nunique()
+            columns.append({
+                'name': column,
+                'kind': 'category' if distinct <= CATEGORY_MAX_FRACTION * rows else 'text',
+                'codes': save(_encode(df[column].astype(object).where(df[column].notna(), None), labels), 'codes'),
+                'dictionary': dictionaries[digest],
+            })
+        else:
+            values = narrow_numeric(df[column].to_numpy())
+            columns.append({'name': column, 'kind': 'numeric', 'values': save(values, 'values')})
+
+    manifest = {
+        'format': COLUMNAR_FORMAT,
+        'source': _source_signature(source_path),
+        'rows': rows,
+        'columns': columns,
+    }
+    temp = os.path.join(directory, f'{MANIFEST}.{generation}.tmp')
+    with open(temp, 'w') as handle:
+        json.dump(manifest, handle)
+    os.replace(temp, os.path.join(directory, MANIFEST))
+
+    # Files of older generations; open memory maps keep their data until unmapped
+    for name in os.listdir(directory):
+        if name.endswith('.npy') and name not in saved:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+    return manifest
+
+
+def _manifest(directory, source_path):
+    """The cache manifest if the cache is complete and was built from the current source file."""
+    try:
+        with open(os.path.join(directory, MANIFEST)) as handle:
+            manifest = json.load(handle)
+        source = _source_signature(source_path)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('format') != COLUMNAR_FORMAT or manifest.get('source') != source:
+        return None
+    return manifest
+
+
+def read_columnar(directory, source_path):
+    """
+    Open a compiled catalog as a DataFrame whose numeric columns and
+    category codes are read-only memory maps of the cache files, or return
+    None when the cache is missing or stale. Pages are shared by every
+    process that maps the same files, and nothing is parsed.
+    """
+    manifest = _manifest(directory, source_path)
+    if manifest is None:
+        return None
+    try:
+        dictionaries = {}
+
+        def load(name):
+            return np.load(os.path.join(directory, name), mmap_mode='r', allow_pickle=False)
+
+        data = {}
+        for column in manifest['columns']:
+            if column['kind'] == 'numeric':
+                data[column['name']] = load(column['values'])
+                continue
+            dictionary = column['dictionary']
+            if dictionary['data'] not in dictionaries:
+                dictionaries[dictionary['data']] = _unpack_labels(load(dictionary['data']), load(dictionary['offsets']))
+            labels = dictionaries[dictionary['data']]
+            categorical = pd.Categorical.from_codes(load(column['codes']), dtype=pd.CategoricalDtype(labels))
+            if column['kind'] == 'text':
+                # Mostly distinct values gain nothing from a dictionary once loaded
+                categorical = pd.array(np.asarray(categorical, dtype=object), dtype='str')
+            data[column['name']] = categorical
+    except (OSError, ValueError, KeyError):
+        return None
+    if any(len(values) != manifest['rows'] for values in data.values()):
+        return None
+    return pd.DataFrame(data, columns=[c['name'] for c in manifest['columns']], copy=False)
+
+
+def load_cached(source_path, build, root=None, enabled=True):
+    """
+    Frame for source_path from its columnar cache when fresh; otherwise
+    `build()` parses the source, and its result is compiled and returned
+    as loaded from the new cache, so cold and warm starts see identical
+    frames. A cache that cannot be written leaves the built frame as is.
+    """
+    if not enabled:
+        return build()
+    directory = cache_directory(source_path, root)
+    df = read_columnar(directory, source_path)
+    if df is not None:
+        return df
+    df = build()
+    try:
+        write_columnar(df, directory, source_path)
+    except OSError:
+        return df
+    cached = read_columnar(directory, source_path)
+    return df if cached is None else cached
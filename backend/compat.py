@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+from utils import IP_HIERARCHY
+
+# Drone and port columns that decide environmental compatibility
+DRONE_COLUMNS = ['Wind Resistance (m/s)', 'temp_min_c', 'temp_max_c', 'Flight Radius (km)', 'ip_level']
+PORT_KEYS = ['maximum_wind_speed_m_s', 'temperature_range_min', 'temperature_range_max', 'coverage_area_sq_km']
+
+# Ports evaluated per block while building, to bound the temporary bool matrix
+PORT_BLOCK = 64
+
+
+def _drone_arrays(drones):
+    arrays = {}
+    for col in DRONE_COLUMNS:
+        if col in drones.columns:
+            arrays[col] = drones[col].to_numpy(dtype=float)
+        else:
+            arrays[col] = np.full(len(drones), np.nan)
+    return arrays
+
+
+def _port_arrays(system, ports):
+    if ports is None or not len(ports):
+        return None
+    return system.port_constraint_arrays(ports)
+
+
+def compatibility_block(drone_arrays, port_arrays, ports):
+    """
+    Boolean (len(ports), n_drones) matrix for the selected port positions.
+
+    Mirrors DroneSelectionSystem.filter_drones_by_port_constraints: wind with an
+    80% margin, temperature range, coverage radius with a 70% margin and IP rating.
+    """
+    max_wind = port_arrays['maximum_wind_speed_m_s'][ports, None]
+    t_min = port_arrays['temperature_range_min'][ports, None]
+    t_max = port_arrays['temperature_range_max'][ports, None]
+    radius = np.sqrt(port_arrays['coverage_area_sq_km'][ports, None] / np.pi) * 0.7
+    ip_required = np.array([IP_HIERARCHY.get(ip, 0) for ip in port_arrays['environmental_durability'][ports]])
+
+    block = drone_arrays['Wind Resistance (m/s)'][None, :] >= max_wind * 0.8
+    block &= drone_arrays['temp_min_c'][None, :] <= t_min
+    block &= drone_arrays['temp_max_c'][None, :] >= t_max
+    block &= drone_arrays['Flight Radius (km)'][None, :] >= radius
+    block &= drone_arrays['ip_level'][None, :] >= ip_required[:, None]
+    return block
+
+
+class CompatibilityMatrix:
+    """
+    Bit-packed ports x drones matrix: bit (p, d) is set when drone d passes the
+    environmental constraints of port p.
+
+    Rows are ports (positional index into the port frame) and columns are drones
+    (positional index into the drone frame); each row is packed with
+    np.packbits, so a port's candidate mask is one unpack and a drone's
+    deployable ports are one bit test down a column.
+    """
+
+    def __init__(self, system, drones, ports, _build=True):
+        self.system = system
+        self.n_drones = len(drones)
+        self.n_ports = 0 if ports is None else len(ports)
+        self._drones = _drone_arrays(drones)
+        self._ports = _port_arrays(system, ports)
+        self.drone_hashes = self._hash_drones()
+        self.port_hashes = self._hash_ports()
+        if _build:
+            self.bits = np.zeros((self.n_ports, (self.n_drones + 7) // 8), dtype=np.uint8)
+            self._fill_rows(np.arange(self.n_ports))
+
+    def _hash_drones(self):
+        return pd.util.hash_pandas_object(pd.DataFrame(self._drones), index=False).to_numpy()
+
+    def _hash_ports(self):
+        if not self.n_ports:
+            return np.zeros(0, dtype=np.uint64)
+        frame = pd.DataFrame({k: self._ports[k] for k in PORT_KEYS + ['environmental_durability']})
+        return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+    def _fill_rows(self, ports):
+        for start in range(0, len(ports), PORT_BLOCK):
+            chunk = ports[start:start + PORT_BLOCK]
+            self.bits[chunk] = np.packbits(compatibility_block(self._drones, self._ports, chunk), axis=1)
+
+    def _fill_columns(self, drones):
+        if not self.n_ports or not len(drones):
+            return
+        subset = {k: v[drones] for k, v in self._drones.items()}
+        block = compatibility_block(subset, self._ports, np.arange(self.n_ports))
+        byte, shift = drones // 8, 7 - (drones % 8)
+        for j in range(len(drones)):
+            bit = np.uint8(1 << int(shift[j]))
+            column = self.bits[:, byte[j]]
+            column &= ~bit
+            column |= block[:, j].astype(np.uint8) * bit
+
+    def port_mask(self, port_index):
+        """Boolean mask over drones that are deployable at the given port."""
+        return np.unpackbits(self.bits[port_index], count=self.n_drones).astype(bool)
+
+    def drone_ports(self, drone_index):
+        """Positional indices of the ports where the given drone is deployable."""
+        column = self.bits[:, drone_index // 8]
+        return np.flatnonzero((column >> (7 - drone_index % 8)) & 1)
+
+    def ports_for_drone(self, drone_name, drones, ports):
+        """Rows of the port frame where the named drone is deployable."""
+        positions = np.flatnonzero(drones['Drone Name'].to_numpy() == drone_name)
+        if not len(positions):
+            return ports.iloc[[]]
+        return ports.iloc[self.drone_ports(int(positions[0]))]
+
+    def deployable_counts(self):
+        """Number of deployable ports for every drone."""
+        unpacked = np.unpackbits(self.bits, axis=1, count=self.n_drones)
+        return unpacked.sum(axis=0)
+
+    @classmethod
+    def rebuild(cls, previous, system, drones, ports):
+        """
+        Build a matrix for new catalog data, reusing `previous` where possible.
+
+        If the drone and port counts are unchanged, only the rows and columns of
+        records whose relevant values changed are recomputed; otherwise the matrix
+        is built from scratch.
+        """
+        if (previous is None or ports is None or len(drones) != previous.n_drones
+                or len(ports) != previous.n_ports):
+            return cls(system, drones, ports)
+
+        matrix = cls(system, drones, ports, _build=False)
+        matrix.bits = previous.bits.copy()
+        changed_ports = np.flatnonzero(matrix.port_hashes != previous.port_hashes)
+        changed_drones = np.flatnonzero(matrix.drone_hashes != previous.drone_hashes)
+        matrix._fill_rows(changed_ports)
+        matrix._fill_columns(changed_drones)
+        return matrix
@@ -1,6 +1,7 @@
 # Configuration settings for the backend application
 
 import os
+import tempfile
 
 class Config:
     DEBUG = False
@@ -10,6 +11,34 @@ class Config:
     DRONE_DATA_PATH = os.environ.get('DRONE_DATA_PATH', 'backend/data/droneType002.csv')
     PORT_DATA_PATH = os.environ.get('PORT_DATA_PATH', 'backend/data/merged_ports_data.csv')
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    MATCH_CACHE_SIZE = int(os.environ.get('MATCH_CACHE_SIZE', 256))
+    MATCH_CACHE_TTL = float(os.environ.get('MATCH_CACHE_TTL', 300))
+    RESULTS_PAGE_SIZE = int(os.environ.get('RESULTS_PAGE_SIZE', 25))
+    CANDIDATE_STORE_SIZE = int(os.environ.get('CANDIDATE_STORE_SIZE', 128))
+    CANDIDATE_TTL = float(os.environ.get('CANDIDATE_TTL', 120))
+    ANALYSIS_SAMPLES = int(os.environ.get('ANALYSIS_SAMPLES', 20000))
+    ANALYSIS_MAX_SAMPLES = int(os.environ.get('ANALYSIS_MAX_SAMPLES', 200000))
+    EXPORT_CHUNK_ROWS = int(os.environ.get('EXPORT_CHUNK_ROWS', 1000))
+    COLUMNAR_CACHE = os.environ.get('COLUMNAR_CACHE', '1').lower() not in ('0', 'false', 'no')
+    COLUMNAR_CACHE_DIR = os.environ.get('COLUMNAR_CACHE_DIR', '')
+    # Compiled hourly port weather (backend/weather.py); operability thresholds need it
+    WEATHER_DATA_DIR = os.environ.get('WEATHER_DATA_DIR', 'backend/data/weather')
+    # cProfile requests that carry PROFILE_HEADER; off unless PROFILING is set
+    PROFILING = os.environ.get('PROFILING', '0').lower() in ('1', 'true', 'yes')
+    PROFILE_HEADER = os.environ.get('PROFILE_HEADER', 'X-Profile')
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'dss-profiles'))
+    REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 2))
+    REPORT_MAX_PENDING = int(os.environ.get('REPORT_MAX_PENDING', 16))
+    REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'dss-reports'))
+    # Forked processes evaluating the ports of a /api/v1/portfolio request
+    PORTFOLIO_WORKERS = int(os.environ.get('PORTFOLIO_WORKERS', os.cpu_count() or 1))
+    # Pre-fork server (backend/serve.py): worker processes, threads per worker, catalog poll and drain seconds
+    HOST = os.environ.get('HOST', '0.0.0.0')
+    PORT = int(os.environ.get('PORT', 8000))
+    WORKERS = int(os.environ.get('WORKERS', os.cpu_count() or 1))
+    THREADS = int(os.environ.get('THREADS', 4))
+    CATALOG_CHECK_INTERVAL = float(os.environ.get('CATALOG_CHECK_INTERVAL', 5))
+    GRACEFUL_TIMEOUT = float(os.environ.get('GRACEFUL_TIMEOUT', 30))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,90 @@
+import numpy as np
+
+# Near-misses listed per constraint, and eliminated drones listed, by default
+NEAR_MISSES = 5
+FAILED_DRONES = 100
+
+
+class EliminationDiagnostics:
+    """
+    Why drones were eliminated, from a single evaluation of every constraint
+    over the whole catalog (see QueryPlan.evaluate).
+
+    `passes` is the (constraints x drones) pass matrix, `gaps` the matching
+    per-constraint distance-to-passing arrays (None for yes/no constraints)
+    and `names` the drone names. A drone is selected when it passes every
+    constraint.
+    """
+
+    def __init__(self, predicates, passes, gaps, names):
+        self.predicates = list(predicates)
+        self.passes = passes
+        self.gaps = gaps
+        self.names = np.asarray(names, dtype=object)
+        # Number of constraints each drone fails
+        self.failures = (~passes).sum(axis=0)
+        self.passing = self.failures == 0
+
+    def survivors(self, stages=None, exclude_keys=()):
+        """Number of drones passing every constraint of the given stages (all by default)."""
+        rows = [i for i, p in enumerate(self.predicates)
+                if (stages is None or p.stage in stages) and p.key not in exclude_keys]
+        if not rows:
+            return len(self.names)
+        return int(self.passes[rows].all(axis=0).sum())
+
+    def near_misses(self, index, limit=NEAR_MISSES):
+        """
+        The drones failing constraint `index` that are closest to passing it:
+        fewest other failed constraints first, then the smallest gap.
+        """
+        failed = np.flatnonzero(~self.passes[index])
+        if not len(failed) or not limit:
+            return []
+        gap = self.gaps[index]
+        distance = np.zeros(len(failed)) if gap is None else np.nan_to_num(gap[failed], nan=np.inf)
+        order = np.lexsort((distance, self.failures[failed]))[:limit]
+        return [{
+            'drone': self.names[failed[j]],
+            'gap': round(float(distance[j]), 6) if gap is not None and np.isfinite(distance[j]) else None,
+            'other_failures': int(self.failures[failed[j]]) - 1,
+        } for j in order]
+
+    def constraints(self, near_misses=NEAR_MISSES):
+        """
+        Per constraint: the drones it eliminates, those it alone eliminates
+        (they would pass if it were relaxed) and its near-misses.
+        """
+        only = self.failures == 1
+        summary = []
+        for i, predicate in enumerate(self.predicates):
+            failed = ~self.passes[i]
+            summary.append({
+                'constraint': predicate.name,
+                'key': predicate.key,
+                'stage': predicate.stage,
+                'eliminated': int(failed.sum()),
+                'only_blocker': int((failed & only).sum()),
+                'near_misses': self.near_misses(i, near_misses),
+            })
+        return summary
+
+    def failed_constraints(self, drones=None, limit=FAILED_DRONES):
+        """
+        Constraint names failed by each named drone (an empty list when it
+        passes), or by the first `limit` eliminated drones.
+        """
+        if drones is None:
+            rows = np.flatnonzero(~self.passing)[:limit]
+        else:
+            rows = np.flatnonzero(np.isin(self.names, list(drones)))
+        names = [p.name for p in self.predicates]
+        return {self.names[r]: [names[i] for i in np.flatnonzero(~self.passes[:, r])] for r in rows}
+
+    def to_dict(self, near_misses=NEAR_MISSES, drones=None, limit=FAILED_DRONES):
+        return {
+            'total': len(self.names),
+            'passing': int(self.passing.sum()),
+            'constraints': self.constraints(near_misses),
+            'failed_constraints': self.failed_constraints(drones, limit),
+        }
@@ -0,0 +1,123 @@
+import zlib
+
+# Export formats: media type and file extension
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', 'arrow'),
+}
+# Formats written with pyarrow, which is optional
+ARROW_FORMATS = ('parquet', 'arrow')
+
+
+class ExportUnavailable(Exception):
+    """The requested export format needs an optional library that is not installed."""
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ExportUnavailable("Parquet and Arrow export need the pyarrow package")
+    return pyarrow
+
+
+def iter_csv(chunks):
+    """CSV text per chunk of rows, with the header before the first chunk."""
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode()
+        header = False
+
+
+def iter_jsonl(chunks):
+    """One JSON object per row and line; NaN becomes null."""
+    for chunk in chunks:
+        if len(chunk):
+            yield chunk.to_json(orient='records', lines=True, force_ascii=False).rstrip('\n').encode() + b'\n'
+
+
+class _Sink:
+    """Write-only file object that hands out what was written since the last drain."""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _arrow_tables(pa, chunks):
+    schema = None
+    for chunk in chunks:
+        if schema is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            # Columns that are all missing in the first chunk hold text later on
+            schema = pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema])
+        yield pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+
+
+def iter_arrow(chunks, fmt='arrow'):
+    """Parquet (one row group per chunk) or Arrow IPC stream bytes, as each chunk is written."""
+    pa = _arrow()
+    sink = _Sink()
+    writer = None
+    for table in _arrow_tables(pa, chunks):
+        if writer is None:
+            if fmt == 'parquet':
+                writer = pa.parquet.ParquetWriter(sink, table.schema)
+            else:
+                writer = pa.ipc.new_stream(sink, table.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    yield sink.drain()
+
+
+def gzip_stream(parts, level=6):
+    """Compress a byte stream incrementally into one gzip member."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for part in parts:
+        compressed = compressor.compress(part)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_stream(chunks, fmt='csv', compress=False):
+    """
+    Encode an iterable of DataFrame chunks as `fmt`, yielding bytes as each
+    chunk is encoded, so only one chunk is held in its encoded form.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'; choose one of {', '.join(EXPORT_FORMATS)}")
+    if fmt in ARROW_FORMATS:
+        _arrow()
+        parts = iter_arrow(chunks, fmt)
+    elif fmt == 'jsonl':
+        parts = iter_jsonl(chunks)
+    else:
+        parts = iter_csv(chunks)
+    return gzip_stream(parts) if compress else parts
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+
+# Hours per day the port must be covered by airborne drones
+COVERAGE_HOURS = 24.0
+# Years of per-unit maintenance included in the fleet cost
+FLEET_YEARS = 3
+# Extra units held in reserve, as a fraction of the operating fleet
+SPARE_FRACTION = 0.0
+
+# Columns added by DroneSelectionSystem.fleet_sizing
+FLEET_COST = 'Fleet Cost (EUR)'
+FLEET_COLUMNS = ['Fleet Stations', 'Fleet Units', 'Fleet Capex (EUR)', 'Fleet Maintenance (EUR)', FLEET_COST]
+
+
+def _column(df, name):
+    if name not in df.columns:
+        return np.full(len(df), np.nan)
+    return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+
+
+def fleet_size(radius_km, battery_minutes, daily_flights, coverage_area_sq_km,
+               coverage_hours=COVERAGE_HOURS, spare_fraction=SPARE_FRACTION):
+    """
+    Stations and units needed for continuous coverage, vectorized over drones.
+
+    A station is one airborne position; ceil(area / (pi * radius^2)) of them
+    cover the port. Each unit flies at most battery x daily flights minutes
+    a day (a missing flight limit does not cap it), so a station needs
+    enough units to fill the coverage window, and at least two while one
+    sortie is shorter than it, as a relief must launch before the flying
+    unit lands. Spares are added on top. Drones with a missing or zero
+    radius or battery life cannot be sized and get NaN.
+    Returns (stations, units) as float arrays.
+    """
+    radius = np.asarray(radius_km, dtype=float)
+    battery = np.asarray(battery_minutes, dtype=float)
+    flights = np.asarray(daily_flights, dtype=float)
+    window = coverage_hours * 60.0
+    sizable = (radius > 0) & (battery > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stations = np.ceil(coverage_area_sq_km / (np.pi * radius ** 2))
+        airtime = np.minimum(np.where(flights > 0, battery * flights, window), window)
+        per_station = np.maximum(np.ceil(window / airtime), np.where(battery < window, 2, 1))
+    stations = np.where(sizable, np.maximum(stations, 1), np.nan)
+    units = stations * np.where(sizable, per_station, np.nan)
+    units = units + np.ceil(units * spare_fraction)
+    return stations, units
+
+
+def fleet_costs(df, coverage_area_sq_km, coverage_hours=COVERAGE_HOURS, years=FLEET_YEARS,
+                spare_fraction=SPARE_FRACTION):
+    """
+    The FLEET_COLUMNS for every drone of df as a dict of arrays: stations,
+    units, capex (units x price), maintenance over `years` and their sum.
+    """
+    stations, units = fleet_size(
+        _column(df, 'Flight Radius (km)'), _column(df, 'Battery Life (minutes)'), _column(df, 'Max Daily Flights'),
+        coverage_area_sq_km, coverage_hours, spare_fraction)
+    capex = units * _column(df, 'Price (EUR)')
+    maintenance = units * _column(df, 'Maintenance Cost (EUR)') * years
+    return dict(zip(FLEET_COLUMNS, (stations, units, capex, maintenance, capex + maintenance)))
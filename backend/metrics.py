@@ -0,0 +1,307 @@
+import bisect
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+# Histogram buckets for durations in seconds and for row counts
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+# Seconds between a pre-fork worker's writes of its metrics to the shared directory
+METRICS_FLUSH_INTERVAL = 1.0
+# File of a WorkerMetrics directory holding the totals of exited workers
+RETIRED_FILE = 'retired.json'
+
+logger = logging.getLogger('dss.metrics')
+
+
+def _labels(names, values):
+    if not names:
+        return ''
+    pairs = ('%s="%s"' % (n, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+             for n, v in zip(names, values))
+    return '{' + ','.join(pairs) + '}'
+
+
+class Counter:
+    """Monotonic counter per label set."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(n, '') for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def empty(self):
+        return Counter(self.name, self.documentation, self.labelnames)
+
+    def state(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self._values.items()]
+
+    def merge(self, state):
+        with self._lock:
+            for key, value in state:
+                key = tuple(key)
+                self._values[key] = self._values.get(key, 0) + value
+
+    def clear(self):
+        with self._lock:
+            self._values = {}
+
+    def samples(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield self.name, _labels(self.labelnames, key), value
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, in the Prometheus layout."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(n, '') for n in self.labelnames)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][position] += 1
+            series[1] += value
+
+    def count(self, **labels):
+        key = tuple(labels.get(n, '') for n in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            return sum(series[0]) if series else 0
+
+    def empty(self):
+        return Histogram(self.name, self.documentation, self.labelnames, self.buckets)
+
+    def state(self):
+        with self._lock:
+            return [[list(key), list(counts), total] for key, (counts, total) in self._series.items()]
+
+    def merge(self, state):
+        with self._lock:
+            for key, counts, total in state:
+                series = self._series.setdefault(tuple(key), [[0] * (len(self.buckets) + 1), 0.0])
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+
+    def clear(self):
+        with self._lock:
+            self._series = {}
+
+    def samples(self):
+        with self._lock:
+            series = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        for key, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                yield self.name + '_bucket', _labels(self.labelnames + ('le',), key + (le,)), cumulative
+            yield self.name + '_sum', _labels(self.labelnames, key), total
+            yield self.name + '_count', _labels(self.labelnames, key), cumulative
+
+
+class MetricsRegistry:
+    """Named metrics rendered together in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def after_fork(self):
+        """Fresh locks in a forked child, where a lock held by another parent thread is never released."""
+        self._lock = threading.Lock()
+        for metric in self._metrics.values():
+            metric._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def state(self):
+        """Every metric's values as JSON-serializable data, see merge."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: metric.state() for metric in metrics}
+
+    def merge(self, state):
+        """Add the values of another registry's state to the metrics registered here."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        for name, values in state.items():
+            if name in metrics:
+                metrics[name].merge(values)
+
+    def reset(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+    def combined(self, states, own=True):
+        """
+        A new registry with this one's metrics holding the sum of the given
+        states and, with own=True, of this registry's values.
+        """
+        registry = MetricsRegistry()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            registry.register(metric.empty())
+        for state in ([self.state()] if own else []) + list(states):
+            registry.merge(state)
+        return registry
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, value in metric.samples():
+                lines.append(f'{name}{labels} {value:g}' if isinstance(value, float) else f'{name}{labels} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+STAGE_SECONDS = REGISTRY.histogram(
+    'dss_stage_duration_seconds', 'Time spent in each selection pipeline stage.', ['stage'])
+STAGE_ROWS = REGISTRY.histogram(
+    'dss_stage_rows', 'Rows entering and leaving each selection pipeline stage.', ['stage', 'direction'],
+    buckets=ROW_BUCKETS)
+REQUEST_SECONDS = REGISTRY.histogram(
+    'dss_request_duration_seconds', 'Time to produce a response, by endpoint and status.', ['endpoint', 'status'])
+
+
+class WorkerMetrics:
+    """
+    Metrics of the pre-fork workers, combined through files in a shared
+    directory. Each worker writes its registry's state to <pid>.json (see
+    write) and renders the sum of its own live values and the other
+    files. The parent folds the file of an exited worker into RETIRED_FILE
+    (see retire), so totals do not go back when workers are replaced.
+    """
+
+    def __init__(self, directory, registry=None):
+        self.directory = directory
+        self.registry = REGISTRY if registry is None else registry
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, name, data):
+        fd, temp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp, os.path.join(self.directory, name))
+
+    def write(self, pid=None):
+        self._write(f'{pid or os.getpid()}.json', self.registry.state())
+
+    def states(self, exclude=None):
+        """The states of the other workers and the retired totals."""
+        workers = {}
+        for name in os.listdir(self.directory):
+            pid, _, suffix = name.partition('.')
+            if suffix == 'json' and pid.isdigit() and int(pid) != exclude:
+                state = self._read(name)
+                if state is not None:
+                    workers[int(pid)] = state
+        # Read last: a worker folded in meanwhile is counted from here only
+        retired = self._read(RETIRED_FILE) or {'pids': [], 'state': {}}
+        folded = set(retired['pids'])
+        return [state for pid, state in workers.items() if pid not in folded] + [retired['state']]
+
+    def retire(self, pid):
+        """Fold an exited worker's file into the retired totals (parent only)."""
+        state = self._read(f'{pid}.json')
+        if state is None:
+            return
+        retired = self._read(RETIRED_FILE) or {'pids': [], 'state': {}}
+        totals = self.registry.combined([retired['state'], state], own=False)
+        self._write(RETIRED_FILE, {'pids': retired['pids'] + [pid], 'state': totals.state()})
+        os.remove(os.path.join(self.directory, f'{pid}.json'))
+
+    def render(self):
+        """This worker's live metrics plus every other worker's, in the Prometheus text format."""
+        return self.registry.combined(self.states(exclude=os.getpid())).render()
+
+
+def format_fields(**fields):
+    """key=value pairs for a structured log line; floats are rounded and spaces quoted."""
+    parts = []
+    for key, value in fields.items():
+        if isinstance(value, float):
+            value = f'{value:.3f}'
+        value = str(value)
+        parts.append(f'{key}="{value}"' if ' ' in value else f'{key}={value}')
+    return ' '.join(parts)
+
+
+def record_stage(stage, seconds, rows_in=None, rows_out=None):
+    """Record one pipeline stage: its duration, row counts and a debug log line."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if rows_in is not None:
+        STAGE_ROWS.observe(rows_in, stage=stage, direction='in')
+    if rows_out is not None:
+        STAGE_ROWS.observe(rows_out, stage=stage, direction='out')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(format_fields(event='stage', stage=stage, duration_ms=seconds * 1000,
+                                   rows_in=rows_in, rows_out=rows_out))
+
+
+class Span:
+    """A timed pipeline stage; set rows_out (and rows_in) while it runs."""
+
+    def __init__(self, stage, rows_in=None):
+        self.stage = stage
+        self.rows_in = rows_in
+        self.rows_out = None
+
+
+@contextlib.contextmanager
+def span(stage, rows_in=None):
+    """Time the body as pipeline stage `stage` and record it with record_stage."""
+    current = Span(stage, rows_in)
+    start = time.perf_counter()
+    try:
+        yield current
+    finally:
+        record_stage(stage, time.perf_counter() - start, current.rows_in, current.rows_out)
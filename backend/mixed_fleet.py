@@ -0,0 +1,182 @@
+import time
+
+import numpy as np
+
+from ranking import skyline_mask
+
+# Largest number of drone models in a mixed fleet, by default
+MAX_MODELS = 3
+# Seconds the search may run before the best fleet found so far is returned
+TIME_LIMIT = 1.0
+# Rows compared at once by the dominance check
+DOMINANCE_BLOCK = 1024
+
+
+def _popcount(values):
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    # NumPy before 2.0: count the set bits of each value's eight bytes
+    values = np.asarray(values, dtype=np.uint64)
+    counts = np.unpackbits(values.reshape(-1, 1).view(np.uint8), axis=1).sum(axis=1, dtype=np.uint8)
+    return counts.reshape(values.shape)
+
+
+def dominated_models(masks, scores, prices, maintenance, block=DOMINANCE_BLOCK):
+    """
+    Models that another model makes redundant: it covers at least the same
+    purposes at no lower score and no higher price or maintenance cost.
+    Of identical models the first is kept.
+
+    Models with the same purposes are first reduced to their skyline, so
+    the pairwise check across purpose sets only sees a few rows per set.
+    """
+    n = len(masks)
+    points = np.column_stack([scores, -prices, -maintenance])
+    groups, inverse = np.unique(masks, return_inverse=True)
+    front = np.ones(n, dtype=bool)
+    if len(groups) < n:
+        order = np.argsort(inverse, kind='stable')
+        bounds = np.flatnonzero(np.diff(inverse[order])) + 1
+        for members in np.split(order, bounds):
+            if len(members) > 1:
+                front[members] = skyline_mask(points[members])
+
+    rows_left = np.flatnonzero(front)
+    masks, scores, prices, maintenance = masks[rows_left], scores[rows_left], prices[rows_left], maintenance[rows_left]
+    found = np.zeros(len(rows_left), dtype=bool)
+    for start in range(0, len(rows_left), block):
+        rows = slice(start, start + block)
+        mask = masks[rows, None]
+        better = (((masks[None, :] & mask) == mask) & (scores[None, :] >= scores[rows, None])
+                  & (prices[None, :] <= prices[rows, None]) & (maintenance[None, :] <= maintenance[rows, None]))
+        strict = ((masks[None, :] != mask) | (scores[None, :] > scores[rows, None])
+                  | (prices[None, :] < prices[rows, None]) | (maintenance[None, :] < maintenance[rows, None])
+                  | (rows_left[None, :] < rows_left[rows, None]))
+        found[rows] = (better & strict).any(axis=1)
+    dominated = ~front
+    dominated[rows_left[found]] = True
+    return dominated
+
+
+class MixedFleetOptimizer:
+    """
+    Branch-and-bound search for the smallest set of drone models that
+    together cover every purpose bit of `target`, with the largest total
+    score among sets of that size, within a total price (`budget`) and
+    total maintenance cost (`max_maintenance`) for one unit per model.
+
+    `masks` holds each model's purpose bits (what it satisfies on its own).
+    Dominated models are dropped first (see dominated_models; in a
+    smallest cover a dominated model can always be swapped for its
+    dominator). Fleet sizes are tried from 1 to max_models. Each node
+    branches on the uncovered purpose with the fewest usable models,
+    earlier siblings are excluded from later branches so no set is visited
+    twice, and a node is pruned when its score plus the best remaining
+    scores cannot beat the best fleet, when the usable models cannot cover
+    the remaining purposes, or when the remaining slots times the most
+    purposes one model adds fall short of them.
+    """
+
+    def __init__(self, masks, scores, prices, maintenance, budget=None, max_maintenance=None,
+                 max_models=MAX_MODELS, time_limit=TIME_LIMIT):
+        self.masks = np.asarray(masks, dtype=np.uint64)
+        self.scores = np.nan_to_num(np.asarray(scores, dtype=float))
+        self.prices = np.asarray(prices, dtype=float)
+        self.maintenance = np.asarray(maintenance, dtype=float)
+        self.budget = np.inf if budget is None else float(budget)
+        self.max_maintenance = np.inf if max_maintenance is None else float(max_maintenance)
+        self.max_models = max_models
+        self.time_limit = time_limit
+
+    def solve(self, target):
+        """
+        Returns a dict with the chosen model positions ('models', best score
+        first; empty when no fleet fits), their total 'score', 'price' and
+        'maintenance', whether the search completed ('optimal'), the number
+        of 'candidates' left after dominance pruning and the 'nodes' visited.
+        """
+        started = time.perf_counter()
+        self._deadline = started + self.time_limit
+        self._nodes = 0
+        self._timed_out = False
+        target = np.uint64(target)
+        usable = (((self.masks & target) != 0) & (self.prices <= self.budget)
+                   & (self.maintenance <= self.max_maintenance) & ~np.isnan(self.prices) & ~np.isnan(self.maintenance))
+        usable = np.flatnonzero(usable)
+        masks = self.masks[usable] & target
+        keep = ~dominated_models(masks, self.scores[usable], self.prices[usable], self.maintenance[usable])
+        # Candidates by descending score, so branches and bounds see the best models first
+        candidates = usable[keep][np.argsort(-self.scores[usable[keep]], kind='stable')]
+        self._ids = candidates
+        self._masks = self.masks[candidates] & target
+        self._scores = self.scores[candidates]
+        self._prices = self.prices[candidates]
+        self._maintenance = self.maintenance[candidates]
+
+        self._best, self._best_score = None, -np.inf
+        for size in range(1, self.max_models + 1):
+            self._size = size
+            self._search(np.uint64(0), target, [], 0.0, 0.0, 0.0, np.ones(len(candidates), dtype=bool))
+            if self._best is not None or self._timed_out:
+                break
+
+        chosen = [] if self._best is None else [int(self._ids[i]) for i in self._best]
+        return {
+            'models': chosen,
+            'score': float(self.scores[chosen].sum()) if chosen else None,
+            'price': float(self.prices[chosen].sum()) if chosen else None,
+            'maintenance': float(self.maintenance[chosen].sum()) if chosen else None,
+            'optimal': not self._timed_out,
+            'candidates': len(candidates),
+            'nodes': self._nodes,
+            'elapsed_ms': (time.perf_counter() - started) * 1000,
+        }
+
+    def _search(self, covered, target, chosen, score, price, maintenance, allowed):
+        self._nodes += 1
+        if self._nodes & 255 == 0 and time.perf_counter() > self._deadline:
+            self._timed_out = True
+        if self._timed_out:
+            return
+        uncovered = target & ~covered
+        if not uncovered:
+            if score > self._best_score:
+                self._best, self._best_score = list(chosen), score
+            return
+        slots = self._size - len(chosen)
+        if not slots:
+            return
+
+        gains = self._masks & uncovered
+        eligible = (allowed & (gains != 0) & (self._prices <= self.budget - price)
+                    & (self._maintenance <= self.max_maintenance - maintenance))
+        rows = np.flatnonzero(eligible)
+        if not len(rows):
+            return
+        # Purpose-bitmask bounds: the remaining purposes must be coverable with the remaining slots
+        if np.bitwise_or.reduce(gains[rows]) != uncovered:
+            return
+        needed = int(_popcount(uncovered))
+        if int(_popcount(gains[rows]).max()) * slots < needed:
+            return
+        # Rows are in descending score order, so the first ones bound the remaining score
+        if score + self._scores[rows[:slots]].sum() <= self._best_score:
+            return
+
+        # Branch on the uncovered purpose with the fewest eligible models
+        bits = [np.uint64(1) << np.uint64(b) for b in range(64) if int(uncovered) >> b & 1]
+        counts = [np.count_nonzero(gains[rows] & bit) for bit in bits]
+        bit = bits[int(np.argmin(counts))]
+        branch = rows[(gains[rows] & bit) != 0]
+        remaining = allowed.copy()
+        for row in branch:
+            remaining[row] = False
+            rest = rows[rows != row][:slots - 1]
+            if score + self._scores[row] + self._scores[rest].sum() <= self._best_score:
+                continue
+            chosen.append(row)
+            self._search(covered | self._masks[row], target, chosen, score + self._scores[row],
+                         price + self._prices[row], maintenance + self._maintenance[row], remaining.copy())
+            chosen.pop()
+            if self._timed_out:
+                return
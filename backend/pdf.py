@@ -0,0 +1,143 @@
+import zlib
+
+# A4 portrait in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 50
+# Average Helvetica glyph width as a fraction of the font size, for fitting text
+CHAR_WIDTH = 0.52
+
+FONTS = {False: 'F1', True: 'F2'}
+
+
+def _escape(text):
+    encoded = str(text).encode('cp1252', 'replace')
+    return encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+def fit(text, width, size):
+    """Truncate text with an ellipsis so that it fits width points at the font size."""
+    text = '' if text is None else str(text)
+    limit = max(1, int(width / (size * CHAR_WIDTH)))
+    return text if len(text) <= limit else text[:max(0, limit - 1)] + '…'
+
+
+class PDFDocument:
+    """
+    Minimal PDF writer for text reports: headings, paragraphs and simple
+    tables in the standard Helvetica fonts (no embedding, WinAnsi text),
+    with automatic page breaks. Needs nothing beyond the standard library.
+    """
+
+    def __init__(self, title=''):
+        self.title = title
+        self.pages = []
+        self._new_page()
+
+    def _new_page(self):
+        self.pages.append([])
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def _room(self, height):
+        if self.y - height < MARGIN:
+            self._new_page()
+
+    def _text_at(self, x, y, text, size, bold=False):
+        self.pages[-1].append(b'BT /%s %d Tf %.2f %.2f Td (%s) Tj ET' % (
+            FONTS[bold].encode(), size, x, y, _escape(text)))
+
+    def _rule(self, x1, x2, y):
+        self.pages[-1].append(b'0.6 G 0.5 w %.2f %.2f m %.2f %.2f l S 0 G' % (x1, y, x2, y))
+
+    def heading(self, text, size=14):
+        self._room(size * 2.2)
+        self.y -= size * 1.4
+        self._text_at(MARGIN, self.y, text, size, bold=True)
+        self.y -= size * 0.6
+
+    def paragraph(self, text, size=10):
+        """Text wrapped at word boundaries to the page width."""
+        limit = int((PAGE_WIDTH - 2 * MARGIN) / (size * CHAR_WIDTH))
+        line = ''
+        for word in str(text).split():
+            if line and len(line) + 1 + len(word) > limit:
+                self.line(line, size)
+                line = word
+            else:
+                line = f'{line} {word}' if line else word
+        self.line(line, size)
+
+    def line(self, text, size=10, bold=False):
+        self._room(size * 1.4)
+        self.y -= size * 1.4
+        self._text_at(MARGIN, self.y, text, size, bold)
+
+    def table(self, headers, rows, widths=None, size=8):
+        """Rows of cells under a bold header row that is repeated after page breaks."""
+        usable = PAGE_WIDTH - 2 * MARGIN
+        widths = widths or [1] * len(headers)
+        scale = usable / float(sum(widths))
+        widths = [w * scale for w in widths]
+        row_height = size * 1.6
+
+        def draw(cells, bold):
+            self.y -= row_height
+            x = MARGIN
+            for cell, width in zip(cells, widths):
+                self._text_at(x + 2, self.y + size * 0.45, fit(cell, width - 4, size), size, bold)
+                x += width
+
+        def header():
+            draw(headers, True)
+            self._rule(MARGIN, MARGIN + usable, self.y)
+
+        self._room(row_height * 2)
+        header()
+        for row in rows:
+            if self.y - row_height < MARGIN:
+                self._new_page()
+                header()
+            draw(row, False)
+        self.y -= size * 0.6
+
+    def space(self, points=8):
+        self.y -= points
+
+    def render(self):
+        """The document as PDF bytes."""
+        objects = []
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(None)
+        pages = add(None)
+        regular = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+        bold = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>')
+        resources = b'<< /Font << /F1 %d 0 R /F2 %d 0 R >> >>' % (regular, bold)
+
+        kids = []
+        for number, commands in enumerate(self.pages, 1):
+            footer = b'BT /F1 8 Tf %d %d Td (%s) Tj ET' % (
+                MARGIN, MARGIN // 2, _escape(f'{self.title}  -  page {number} of {len(self.pages)}'))
+            stream = zlib.compress(b'\n'.join(commands + [footer]))
+            content = add(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+            kids.append(add(b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources %s /Contents %d 0 R >>'
+                            % (pages, PAGE_WIDTH, PAGE_HEIGHT, resources, content)))
+        objects[catalog - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages
+        objects[pages - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % kid for kid in kids), len(kids))
+        info = add(b'<< /Title (%s) /Producer (Drone DSS) >>' % _escape(self.title))
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+        xref = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        out += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+        out += b'trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(objects) + 1, catalog, info, xref)
+        return bytes(out)
@@ -0,0 +1,204 @@
+import threading
+import time
+
+import numpy as np
+
+
+class Predicate:
+    """
+    A single row filter over catalog columns.
+
+    `test` receives one NumPy array per entry in `columns` (already restricted
+    to the rows still alive) and returns a boolean mask of the same length.
+    `key` identifies the predicate across queries for selectivity statistics,
+    so it should not include the threshold value. `arrays` are extra
+    precomputed arrays aligned with the frame, passed after the columns.
+    `gap`, when given, takes the same arrays as `test` and returns how far
+    each row is from passing, in the constraint's own units (0 or less for
+    rows that pass); diagnostics rank near-misses by it.
+    """
+
+    def __init__(self, name, stage, columns, test, key=None, cost=1.0, arrays=(), gap=None):
+        self.name = name
+        self.stage = stage
+        self.columns = tuple(columns)
+        self.arrays = tuple(arrays)
+        self.test = test
+        self.key = key or name
+        self.cost = cost
+        self.gap = gap
+
+
+class ColumnStore:
+    """Lazily materialized NumPy views of DataFrame columns."""
+
+    def __init__(self, df):
+        self.df = df
+        self._arrays = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def array(self, column):
+        if column not in self._arrays:
+            self._arrays[column] = self.df[column].to_numpy()
+        return self._arrays[column]
+
+
+class PredicateStats:
+    """Running estimates of pass rate and per-row cost for each predicate key."""
+
+    def __init__(self, smoothing=0.2):
+        self.smoothing = smoothing
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def after_fork(self):
+        """Fresh lock in a forked child (see MetricsRegistry.after_fork)."""
+        self._lock = threading.Lock()
+
+    def estimate(self, predicate):
+        selectivity, ns_per_row = self._stats.get(predicate.key, (0.5, None))
+        if ns_per_row is None:
+            ns_per_row = 100.0 * predicate.cost
+        return selectivity, ns_per_row
+
+    def observe(self, predicate, rows_in, rows_out, elapsed_ns):
+        if rows_in == 0:
+            return
+        selectivity = rows_out / rows_in
+        ns_per_row = elapsed_ns / rows_in
+        with self._lock:
+            if predicate.key in self._stats:
+                old_sel, old_ns = self._stats[predicate.key]
+                a = self.smoothing
+                selectivity = (1 - a) * old_sel + a * selectivity
+                ns_per_row = (1 - a) * old_ns + a * ns_per_row
+            self._stats[predicate.key] = (selectivity, ns_per_row)
+
+
+class QueryPlan:
+    """
+    An ordered conjunction of predicates evaluated as fused boolean masks.
+
+    Predicates run cheapest-and-most-selective first, each one only over the
+    rows that survived the previous ones, and the source frame is sliced once
+    at the end.
+    """
+
+    def __init__(self, predicates, stats):
+        self.stats = stats
+        self.predicates = self._order(predicates)
+        self.trace = []
+
+    def _order(self, predicates):
+        def rank(predicate):
+            selectivity, ns_per_row = self.stats.estimate(predicate)
+            # Classic predicate ordering: cost per row over fraction of rows removed
+            return ns_per_row / max(1.0 - selectivity, 1e-6)
+        return sorted(predicates, key=rank)
+
+    def rows(self, df):
+        """Return the positional indices of the rows that satisfy every predicate."""
+        store = ColumnStore(df)
+        rows = np.arange(len(store))
+        self.trace = []
+        for predicate in self.predicates:
+            selectivity, ns_per_row = self.stats.estimate(predicate)
+            rows_in = len(rows)
+            start = time.perf_counter_ns()
+            if rows_in:
+                full = rows_in == len(store)
+                arrays = [store.array(c) if full else store.array(c)[rows] for c in predicate.columns]
+                arrays += [a if full else a[rows] for a in predicate.arrays]
+                rows = rows[np.asarray(predicate.test(*arrays), dtype=bool)]
+            elapsed = time.perf_counter_ns() - start
+            self.stats.observe(predicate, rows_in, len(rows), elapsed)
+            self.trace.append({
+                'predicate': predicate.name,
+                'stage': predicate.stage,
+                'estimated_selectivity': round(selectivity, 4),
+                'estimated_ns_per_row': round(ns_per_row, 1),
+                'rows_in': rows_in,
+                'rows_out': len(rows),
+                'elapsed_ms': elapsed / 1e6,
+            })
+        return rows
+
+    def evaluate(self, df):
+        """
+        Evaluation mode: run every predicate once over all rows, without
+        skipping rows an earlier predicate removed. Returns a (predicates x
+        rows) boolean pass matrix and each predicate's gap array (None when
+        it has no gap function). The trace is recorded as rows() would, with
+        rows_out counting the rows that pass every predicate so far.
+        """
+        store = ColumnStore(df)
+        passes = np.ones((len(self.predicates), len(store)), dtype=bool)
+        gaps = []
+        alive = np.ones(len(store), dtype=bool)
+        self.trace = []
+        for i, predicate in enumerate(self.predicates):
+            selectivity, ns_per_row = self.stats.estimate(predicate)
+            rows_in = int(alive.sum())
+            start = time.perf_counter_ns()
+            arrays = [store.array(c) for c in predicate.columns] + list(predicate.arrays)
+            if len(store):
+                passes[i] = np.asarray(predicate.test(*arrays), dtype=bool)
+            alive &= passes[i]
+            elapsed = time.perf_counter_ns() - start
+            self.stats.observe(predicate, len(store), int(passes[i].sum()), elapsed)
+            gap = None
+            if predicate.gap is not None and len(store):
+                gap = np.asarray(predicate.gap(*arrays), dtype=float)
+            gaps.append(gap)
+            self.trace.append({
+                'predicate': predicate.name,
+                'stage': predicate.stage,
+                'estimated_selectivity': round(selectivity, 4),
+                'estimated_ns_per_row': round(ns_per_row, 1),
+                'rows_in': rows_in,
+                'rows_out': int(alive.sum()),
+                'elapsed_ms': elapsed / 1e6,
+            })
+        return passes, gaps
+
+    def subset(self, stages=None, exclude_keys=()):
+        """Return a plan over only the predicates of the given stages."""
+        predicates = [
+            p for p in self.predicates
+            if (stages is None or p.stage in stages) and p.key not in exclude_keys
+        ]
+        return QueryPlan(predicates, self.stats)
+
+    def execute(self, df):
+        """Apply the plan and return the surviving rows as a single slice of df."""
+        return df.iloc[self.rows(df)]
+
+    def explain(self):
+        """
+        Describe the plan: one entry per predicate in execution order, with
+        row counts and timings once the plan has run.
+        """
+        if self.trace:
+            return list(self.trace)
+        explained = []
+        for predicate in self.predicates:
+            selectivity, ns_per_row = self.stats.estimate(predicate)
+            explained.append({
+                'predicate': predicate.name,
+                'stage': predicate.stage,
+                'estimated_selectivity': round(selectivity, 4),
+                'estimated_ns_per_row': round(ns_per_row, 1),
+            })
+        return explained
+
+
+class QueryPlanner:
+    """Builds query plans that share predicate statistics across requests."""
+
+    def __init__(self):
+        self.stats = PredicateStats()
+
+    def plan(self, predicates):
+        return QueryPlan(predicates, self.stats)
@@ -0,0 +1,391 @@
+"""
+Incremental, validated port-data ETL.
+
+Source CSVs with country_code, port_name and any of the port fields (in the
+units listed in UNIT_COLUMNS) are read in chunks, validated, matched to the
+known ports across spelling variants and upserted into the merged port CSV:
+only rows whose content hash differs from the merged row are written, and
+source files unchanged since the last run are skipped. The merged CSV is
+rewritten only when something changed, followed by the columnar cache the
+backend loads.
+
+    python backend/port_etl.py                      # the default sources below
+    python backend/port_etl.py new_ports.csv --output backend/data/merged_ports_data.csv
+    python backend/port_etl.py --full --prune --strict
+"""
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from catalog import PROJECT_ROOT, resolve_data_path
+from columnar import load_cached
+from config import Config
+from ports import normalize_port_name
+from utils import PORT_TEMPERATURE_PATTERN, DroneSelectionSystem, parse_range_column
+
+KEY_COLUMNS = ['country_code', 'port_name']
+# Column order of the merged port CSV
+PORT_COLUMNS = KEY_COLUMNS + ['humidity_percent', 'coverage_area_sq_km', 'temperature_range_c',
+                              'average_wind_speed_m_s', 'maximum_wind_speed_m_s']
+# Accepted numeric source columns: (merged column, factor to its unit)
+UNIT_COLUMNS = {
+    'humidity_percent': ('humidity_percent', 1.0),
+    'humidity_fraction': ('humidity_percent', 100.0),
+    'coverage_area_sq_km': ('coverage_area_sq_km', 1.0),
+    'coverage_area_ha': ('coverage_area_sq_km', 0.01),
+    'average_wind_speed_m_s': ('average_wind_speed_m_s', 1.0),
+    'average_wind_speed_km_h': ('average_wind_speed_m_s', 1 / 3.6),
+    'average_wind_speed_kn': ('average_wind_speed_m_s', 0.514444),
+    'maximum_wind_speed_m_s': ('maximum_wind_speed_m_s', 1.0),
+    'maximum_wind_speed_km_h': ('maximum_wind_speed_m_s', 1 / 3.6),
+    'maximum_wind_speed_kn': ('maximum_wind_speed_m_s', 0.514444),
+}
+# Accepted "min-max" temperature source columns and their unit
+TEMPERATURE_COLUMNS = {'temperature_range_c': 'C', 'temperature_range_f': 'F'}
+# Plausible values of each merged column (inclusive) and its unit
+VALID_RANGES = {
+    'humidity_percent': (0, 100, '%'),
+    'coverage_area_sq_km': (0, 10000, 'km²'),
+    'average_wind_speed_m_s': (0, 60, 'm/s'),
+    'maximum_wind_speed_m_s': (0, 90, 'm/s'),
+    'temperature_range_c': (-70, 60, '°C'),
+}
+# Rows per chunk read from a source file
+CHUNK_ROWS = 50000
+# Similarity (difflib ratio) above which an unknown name is a spelling of a known port in the same country
+FUZZY_CUTOFF = 0.9
+# Problems kept in the report (all are counted)
+MAX_PROBLEMS = 1000
+
+# Numbers in a folded port name; a spelling match must carry the same ones ("haven 2" is not "haven 3")
+_DIGITS = re.compile(r'\d+')
+
+SOURCE_DIR = os.path.join(PROJECT_ROOT, 'additional resources')
+DEFAULT_SOURCES = [os.path.join(SOURCE_DIR, name) for name in (
+    'ports_humidity.csv', 'ports_coverage_area.csv', 'ports_temperature_range.csv',
+    'ports_wind_speed_extended.csv')]
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _canonical(frame, columns):
+    """Columns in a dtype-independent form (float64 or Python str/None) for hashing."""
+    data = {}
+    for column in columns:
+        values = frame[column]
+        if column == 'temperature_range_c' or not pd.api.types.is_numeric_dtype(values):
+            data[column] = values.astype(object).where(values.notna(), None).to_numpy()
+        else:
+            data[column] = values.to_numpy(dtype=float)
+    return pd.DataFrame(data)
+
+
+def content_hash(frame, columns):
+    """One uint64 per row over the given columns."""
+    return pd.util.hash_pandas_object(_canonical(frame, columns), index=False).to_numpy()
+
+
+def _format_range(low, high):
+    return [None if np.isnan(a) or np.isnan(b) else f'{a:g}-{b:g}' for a, b in zip(low, high)]
+
+
+class _Chunk:
+    """Validation of one chunk of a source file; rejected rows are dropped with their problems."""
+
+    def __init__(self, chunk, source, first_line):
+        self.chunk = chunk
+        self.source = source
+        self.lines = np.arange(first_line, first_line + len(chunk))
+        self.rejected = np.zeros(len(chunk), dtype=bool)
+        self.problems = []
+
+    def reject(self, mask, field, values, reason):
+        mask = np.asarray(mask, dtype=bool) & ~self.rejected
+        for i in np.flatnonzero(mask):
+            value = values.iloc[i]
+            self.problems.append({
+                'source': os.path.basename(self.source), 'line': int(self.lines[i]),
+                'port': self.chunk['port_name'].iloc[i], 'field': field,
+                'value': None if pd.isna(value) else value, 'reason': reason})
+        self.rejected |= mask
+
+    def _check_range(self, values, column, field, raw):
+        low, high, unit = VALID_RANGES[column]
+        self.reject(values.notna() & ((values < low) | (values > high)), field, raw,
+                    f'outside {low:g}..{high:g} {unit}')
+
+    def normalize(self):
+        """(validated rows with merged column names, ignored source columns)."""
+        chunk = self.chunk
+        country = chunk['country_code'].str.strip().str.upper()
+        name = chunk['port_name'].str.strip()
+        # The port lists mix ISO 3166 alpha-2 and alpha-3 codes; both are kept as given
+        self.reject(~country.str.fullmatch(r'[A-Z]{2,3}').fillna(False), 'country_code', chunk['country_code'],
+                    'not an ISO country code')
+        self.reject(name.isna() | name.eq(''), 'port_name', chunk['port_name'], 'missing port name')
+        out = {'country_code': country.to_numpy(object), 'port_name': name.to_numpy(object)}
+        ignored = []
+        for column in chunk.columns:
+            if column in KEY_COLUMNS:
+                continue
+            raw = chunk[column].str.strip()
+            present = raw.notna() & raw.ne('')
+            if column in UNIT_COLUMNS:
+                merged, factor = UNIT_COLUMNS[column]
+                values = pd.to_numeric(raw, errors='coerce')
+                self.reject(present & values.isna(), column, raw, 'not a number')
+                if factor != 1:
+                    # Drop float noise from the conversion so unchanged values hash equal
+                    values = (values * factor).round(6)
+                self._check_range(values, merged, column, raw)
+                out[merged] = values.to_numpy(dtype=float)
+            elif column in TEMPERATURE_COLUMNS:
+                low, high = parse_range_column(raw, PORT_TEMPERATURE_PATTERN)
+                self.reject(present & (low.isna() | high.isna()), column, raw, 'expected "min-max"')
+                if TEMPERATURE_COLUMNS[column] == 'F':
+                    low, high = ((low - 32) * 5 / 9).round(1), ((high - 32) * 5 / 9).round(1)
+                self.reject(low > high, column, raw, 'minimum above maximum')
+                self._check_range(low, 'temperature_range_c', column, raw)
+                self._check_range(high, 'temperature_range_c', column, raw)
+                out['temperature_range_c'] = np.array(_format_range(low.to_numpy(), high.to_numpy()), dtype=object)
+            else:
+                ignored.append(column)
+        frame = pd.DataFrame(out)
+        if 'average_wind_speed_m_s' in frame and 'maximum_wind_speed_m_s' in frame:
+            self.reject(frame['maximum_wind_speed_m_s'] < frame['average_wind_speed_m_s'], 'maximum_wind_speed_m_s',
+                        frame['maximum_wind_speed_m_s'], 'below the average wind speed')
+        return frame[~self.rejected].reset_index(drop=True), ignored
+
+
+class PortETL:
+    """
+    Upserts validated source rows into the merged port CSV at `output`.
+
+    Ports are keyed by country code and folded name (normalize_port_name),
+    so "Port of Lübeck" and "Lubeck" are one port; `aliases` maps further
+    variant names to a known name, and a new name that closely resembles a
+    known port of the same country is treated as that port. Source digests
+    are kept in `<output>.etl.json` to skip unchanged files.
+    """
+
+    def __init__(self, output=None, aliases=None, chunk_rows=CHUNK_ROWS, fuzzy_cutoff=FUZZY_CUTOFF):
+        self.output = resolve_data_path(output or Config.PORT_DATA_PATH)
+        self.state_path = self.output + '.etl.json'
+        self.chunk_rows = chunk_rows
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.aliases = {}
+        for variant, name in (aliases or {}).items():
+            country, _, variant = variant.rpartition(':')
+            self.aliases[(country.upper(), normalize_port_name(variant))] = normalize_port_name(name)
+        # Folded names, memoized: every source repeats the same port names
+        self._folded = {}
+
+    def _fold(self, name):
+        folded = self._folded.get(name)
+        if folded is None:
+            folded = self._folded[name] = normalize_port_name(name)
+        return folded
+
+    def _load_target(self):
+        if os.path.exists(self.output):
+            target = pd.read_csv(self.output)
+        else:
+            target = pd.DataFrame({column: pd.Series(dtype=object if column in KEY_COLUMNS else float)
+                                   for column in PORT_COLUMNS})
+            target['temperature_range_c'] = target['temperature_range_c'].astype(object)
+        for column in PORT_COLUMNS:
+            if column not in target.columns:
+                target[column] = np.nan
+        extra = [c for c in target.columns if c not in PORT_COLUMNS]
+        return target[PORT_COLUMNS + extra].astype({c: object for c in KEY_COLUMNS + ['temperature_range_c']})
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return {'sources': {}}
+
+    def _read(self, source):
+        """Validated rows of a source file, read in chunks, and its problems."""
+        frames, problems, ignored = [], [], set()
+        line = 2
+        for chunk in pd.read_csv(source, chunksize=self.chunk_rows, dtype=str, keep_default_na=False,
+                                 na_values=['', 'NA', 'N/A', 'NaN', 'nan']):
+            missing = [c for c in KEY_COLUMNS if c not in chunk.columns]
+            if missing:
+                raise ValueError(f'{source}: missing column(s) {", ".join(missing)}')
+            rows = _Chunk(chunk, source, line)
+            frame, skipped = rows.normalize()
+            frames.append(frame)
+            problems += rows.problems
+            ignored.update(skipped)
+            line += len(chunk)
+        frame = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=KEY_COLUMNS)
+        return frame, problems, sorted(ignored)
+
+    def _resolve(self, frame, keys, known):
+        """
+        Key of every incoming row: its folded name, an alias, or a close
+        match among the ports of its country in `known` (ports known before
+        this source was read) that carries the same numbers.
+        """
+        resolved = []
+        for country, name in zip(frame['country_code'], frame['port_name']):
+            fold = self._fold(name)
+            fold = self.aliases.get((country, fold), self.aliases.get(('', fold), fold))
+            key = f'{country}|{fold}'
+            if key not in keys and known.get(country):
+                digits = _DIGITS.findall(fold)
+                for match in difflib.get_close_matches(fold, known[country], n=3, cutoff=self.fuzzy_cutoff):
+                    if _DIGITS.findall(match) == digits:
+                        key = f'{country}|{match}'
+                        break
+            resolved.append(key)
+        return resolved
+
+    def run(self, sources=None, full=False, prune=False):
+        """
+        Ingest `sources` (default DEFAULT_SOURCES) and return a report with
+        per-source counts of inserted, updated, unchanged and rejected rows,
+        the spelling variants resolved and the validation problems.
+        """
+        sources = [os.path.abspath(s) for s in (sources or DEFAULT_SOURCES)]
+        state = self._load_state()
+        target = self._load_target()
+        keys = {}
+        for position, (country, name) in enumerate(zip(target['country_code'], target['port_name'])):
+            keys.setdefault(f'{country}|{self._fold(name)}', position)
+        report = {'output': self.output, 'sources': [], 'problems': [], 'problem_count': 0, 'written': False}
+        seen = set()
+        changed = False
+
+        for source in sources:
+            digest = _file_digest(source)
+            entry = {'source': source, 'skipped': False, 'inserted': 0, 'updated': 0, 'unchanged': 0,
+                     'rejected': 0, 'variants': [], 'ignored_columns': []}
+            report['sources'].append(entry)
+            if not full and not prune and state['sources'].get(source) == digest:
+                entry['skipped'] = True
+                continue
+            incoming, problems, entry['ignored_columns'] = self._read(source)
+            entry['rejected'] = len({p['line'] for p in problems})
+            report['problem_count'] += len(problems)
+            report['problems'] += problems[:MAX_PROBLEMS - len(report['problems'])]
+
+            known = {}
+            for key in keys:
+                country, fold = key.split('|', 1)
+                known.setdefault(country, []).append(fold)
+            incoming['_key'] = self._resolve(incoming, keys, known)
+            incoming = incoming.drop_duplicates('_key', keep='last').reset_index(drop=True)
+            seen.update(incoming['_key'])
+            fields = [c for c in PORT_COLUMNS if c in incoming.columns and c not in KEY_COLUMNS]
+
+            positions = np.array([keys.get(k, -1) for k in incoming['_key']], dtype=np.int64)
+            existing = positions >= 0
+            # Known ports keep their merged name; record the other spellings that matched them
+            names = target['port_name'].to_numpy()[positions[existing]]
+            spelled = incoming['port_name'].to_numpy()[existing]
+            entry['variants'] = [{'source_name': a, 'port_name': b} for a, b in zip(spelled, names) if a != b]
+            incoming.loc[existing, 'port_name'] = names
+            if existing.any() and fields:
+                before = content_hash(target.iloc[positions[existing]], fields)
+                after = content_hash(incoming[existing], fields)
+                differs = np.flatnonzero(existing)[before != after]
+                for column in fields:
+                    target.iloc[positions[differs], target.columns.get_loc(column)] = \
+                        incoming[column].to_numpy()[differs]
+                entry['updated'] = len(differs)
+                entry['unchanged'] = int(existing.sum()) - len(differs)
+            new = incoming[~existing]
+            if len(new):
+                for offset, key in enumerate(new['_key']):
+                    keys[key] = len(target) + offset
+                target = pd.concat([target, new.drop(columns='_key')], ignore_index=True)[target.columns]
+                entry['inserted'] = len(new)
+            changed |= bool(entry['inserted'] or entry['updated'])
+            state['sources'][source] = digest
+
+        if prune:
+            keep = np.array([f'{c}|{self._fold(n)}' in seen
+                             for c, n in zip(target['country_code'], target['port_name'])], dtype=bool)
+            report['pruned'] = int((~keep).sum())
+            if report['pruned']:
+                target = target[keep].reset_index(drop=True)
+                changed = True
+
+        if changed or not os.path.exists(self.output):
+            self._write(target)
+            report['written'] = True
+        with open(self.state_path, 'w') as handle:
+            json.dump(state, handle, indent=2)
+        report['ports'] = len(target)
+        return report
+
+    def _write(self, target):
+        """Replace the merged CSV atomically, then compile the columnar cache the backend loads."""
+        directory = os.path.dirname(self.output) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=directory, suffix='.csv.tmp')
+        try:
+            with os.fdopen(fd, 'w', newline='') as handle:
+                target.to_csv(handle, index=False)
+            os.replace(temporary, self.output)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+            raise
+        system = DroneSelectionSystem()
+        load_cached(self.output, lambda: system._add_port_parsed_columns(pd.read_csv(self.output)),
+                    Config.COLUMNAR_CACHE_DIR or None, Config.COLUMNAR_CACHE)
+
+
+def _read_aliases(path):
+    """variant,name CSV rows (variant optionally prefixed "CC:") as a dict."""
+    aliases = pd.read_csv(path, dtype=str)
+    return dict(zip(aliases['variant'], aliases['name']))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('sources', nargs='*', help='source CSVs (default: the files in "additional resources")')
+    parser.add_argument('--output', help='merged port CSV (default: PORT_DATA_PATH)')
+    parser.add_argument('--aliases', help='CSV of variant,name port-name aliases')
+    parser.add_argument('--full', action='store_true', help='re-read sources even when unchanged')
+    parser.add_argument('--prune', action='store_true', help='drop ports found in none of the sources')
+    parser.add_argument('--strict', action='store_true', help='exit with status 1 when rows were rejected')
+    args = parser.parse_args(argv)
+
+    etl = PortETL(args.output, _read_aliases(args.aliases) if args.aliases else None)
+    report = etl.run(args.sources or None, full=args.full, prune=args.prune)
+    for entry in report['sources']:
+        name = os.path.basename(entry['source'])
+        if entry['skipped']:
+            print(f'{name:36s} unchanged, skipped')
+            continue
+        print(f"{name:36s} {entry['inserted']:7d} inserted {entry['updated']:7d} updated "
+              f"{entry['unchanged']:7d} unchanged {entry['rejected']:5d} rejected {len(entry['variants']):4d} variants")
+    for problem in report['problems'][:20]:
+        print(f"  {problem['source']}:{problem['line']} {problem['port']} {problem['field']}={problem['value']!r}: "
+              f"{problem['reason']}")
+    print(f"{report['ports']} ports; {etl.output} {'written' if report['written'] else 'unchanged'}")
+    return 1 if args.strict and report['problem_count'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Portfolio-wide evaluation: the same purposes, budget and priorities
+evaluated for many ports at once, with a cross-port report.
+
+Ports sharing a compatibility row are evaluated once (see
+DroneSelectionSystem.evaluate_ports), and the distinct evaluations are
+spread over forked worker processes that inherit the loaded catalog
+copy-on-write instead of loading or receiving it.
+
+    python backend/portfolio.py --country BE --purpose "Port Security" --budget 60000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from catalog import get_catalog
+from metrics import REGISTRY
+from ports import normalize_port_name
+from utils import SLIDER_CRITERIA, DroneSelectionSystem
+
+# Fewer distinct evaluations than this run in-process; forking and pickling would cost more
+MIN_PARALLEL = 8
+# Drone models listed in the cross-port report, by default
+REPORT_DRONES = 20
+
+# (system, snapshot) of the pool being forked; workers inherit it
+_shared = None
+
+
+def _after_fork():
+    # Locks held by other threads of the parent at fork time would never be released here
+    system, snapshot = _shared
+    REGISTRY.after_fork()
+    system.query_planner.stats.after_fork()
+    if getattr(snapshot, 'purposes', None) is not None:
+        snapshot.purposes.after_fork()
+
+
+def _evaluate(port_names, top_k, options):
+    system, snapshot = _shared
+    return [system.evaluate_port(name, snapshot, top_k, **options) for name in port_names]
+
+
+class PortfolioPool:
+    """
+    Worker processes forked with one catalog snapshot. The pool is forked
+    on first use and again when the snapshot's version changes; where fork
+    is unavailable, or for a few evaluations, they run in the calling
+    process.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._lock = threading.Lock()
+        self._executor = None
+        self._version = None
+
+    @staticmethod
+    def available():
+        return 'fork' in multiprocessing.get_all_start_methods()
+
+    def executor(self, system, snapshot):
+        """An evaluate_ports executor for the snapshot."""
+        def run(port_names, top_k, options):
+            if self.workers <= 1 or len(port_names) < MIN_PARALLEL or not self.available():
+                return [system.evaluate_port(name, snapshot, top_k, **options) for name in port_names]
+            chunks = [port_names[i::self.workers] for i in range(self.workers)]
+            with self._lock:
+                pool = self._pool(system, snapshot)
+                futures = [pool.submit(_evaluate, chunk, top_k, options) for chunk in chunks if chunk]
+            evaluations = [None] * len(port_names)
+            for i, future in enumerate(futures):
+                evaluations[i::self.workers] = future.result()
+            return evaluations
+        return run
+
+    def _pool(self, system, snapshot):
+        global _shared
+        if self._executor is None or self._version != snapshot.version or _shared[0] is not system:
+            if self._executor is not None:
+                # Submitted evaluations still finish on the previous generation
+                self._executor.shutdown(wait=False)
+            _shared = (system, snapshot)
+            # With fork, every worker is started at the first submit, while _shared is current
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('fork'),
+                                                 initializer=_after_fork)
+            self._version = snapshot.version
+        return self._executor
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+def select_ports(ports_df, ports=None, country=None, port_index=None):
+    """
+    Names of the ports to evaluate: every port for ports='all', those of
+    `country` (an ISO code), or the given names resolved to their catalog
+    spelling. Returns (names, unknown names).
+    """
+    names = ports_df['port_name'].tolist() if ports_df is not None else []
+    if isinstance(ports, str):
+        ports = [ports]
+    if ports and [p.strip().lower() for p in ports] == ['all']:
+        return names, []
+    selected, unknown = [], []
+    if country:
+        countries = ports_df['country_code'].astype(str).str.upper().to_numpy()
+        selected = [names[i] for i in np.flatnonzero(countries == country.strip().upper())]
+    if ports:
+        folded = {normalize_port_name(n): n for n in names}
+        for port in ports:
+            position = port_index.resolve(port) if port_index is not None else None
+            name = names[position] if position is not None else folded.get(normalize_port_name(port))
+            if name is None:
+                unknown.append(port)
+            elif name not in selected:
+                selected.append(name)
+    return selected, unknown
+
+
+def portfolio_report(groups, top_k=10, limit=REPORT_DRONES):
+    """
+    Cross-port summary of evaluate_ports groups: how many ports have any
+    suitable drone, the ports without one, and per drone model the ports
+    where it is deployable (ranked), ranked first and ranked in the top_k,
+    and its best rank; models deployable at the most ports come first.
+    """
+    ports = sum(len(g['ports']) for g in groups)
+    frames = []
+    for group in groups:
+        if group['drones']:
+            frames.append(pd.DataFrame({'drone': group['drones'], 'rank': np.arange(1, len(group['drones']) + 1),
+                                        'ports': len(group['ports'])}))
+    without = [port for g in groups if not g['drones'] for port in g['ports']]
+    report = {'ports': ports, 'ports_with_drones': ports - len(without), 'ports_without_drones': without,
+              'drones': []}
+    if not frames:
+        return report
+    ranks = pd.concat(frames, ignore_index=True)
+    weight = ranks['ports']
+    summary = pd.DataFrame({
+        'deployable_ports': weight.groupby(ranks['drone']).sum(),
+        'top_ranked_ports': weight.where(ranks['rank'] == 1, 0).groupby(ranks['drone']).sum(),
+        'top_k_ports': weight.where(ranks['rank'] <= top_k, 0).groupby(ranks['drone']).sum(),
+        'best_rank': ranks['rank'].groupby(ranks['drone']).min(),
+    })
+    summary = summary.sort_values(['deployable_ports', 'top_ranked_ports', 'best_rank'],
+                                  ascending=[False, False, True], kind='stable').head(limit)
+    report['drones'] = [
+        {'drone': drone, 'deployable_ports': int(row.deployable_ports),
+         'share': round(float(row.deployable_ports) / ports, 4), 'top_ranked_ports': int(row.top_ranked_ports),
+         'top_k_ports': int(row.top_k_ports), 'best_rank': int(row.best_rank)}
+        for drone, row in summary.iterrows()]
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Evaluate drone selections across many ports at once.')
+    parser.add_argument('--ports', nargs='*', help='port names, or "all"')
+    parser.add_argument('--country', help='every port of this ISO country code')
+    parser.add_argument('--purpose', action='append', default=[], help='repeat for several purposes')
+    parser.add_argument('--budget', type=float)
+    parser.add_argument('--maintenance-cost', type=float)
+    parser.add_argument('--priority', action='append', default=[], metavar='CRITERION=VALUE',
+                        help='AHP slider value (1-5), e.g. "Price (EUR)=4"; unset criteria are 3')
+    parser.add_argument('--method', default='wsm')
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--json', help='write the per-port rankings and the report to this file')
+    args = parser.parse_args(argv)
+    if not args.ports and not args.country:
+        parser.error('give --ports (names or "all") or --country')
+
+    catalog = get_catalog()
+    snapshot = catalog.snapshot()
+    system = DroneSelectionSystem()
+    names, unknown = select_ports(snapshot.ports, args.ports, args.country, snapshot.port_index)
+    for port in unknown:
+        print(f'unknown port: {port}', file=sys.stderr)
+    sliders = dict.fromkeys(SLIDER_CRITERIA, 3.0)
+    for item in args.priority:
+        criterion, _, value = item.rpartition('=')
+        sliders[criterion.strip()] = float(value)
+
+    pool = PortfolioPool(args.workers)
+    try:
+        groups = system.evaluate_ports(
+            names, snapshot, args.top_k, executor=pool.executor(system, snapshot),
+            selected_purposes=args.purpose, slider_values=sliders, budget=args.budget,
+            max_maintenance_cost=args.maintenance_cost, method=args.method)
+    finally:
+        pool.shutdown()
+    report = portfolio_report(groups, args.top_k)
+
+    print(f"{report['ports_with_drones']} of {report['ports']} ports have a suitable drone")
+    for entry in report['drones']:
+        print(f"{entry['drone']:<40} deployable at {entry['deployable_ports']:>4} ports, "
+              f"first at {entry['top_ranked_ports']:>4}, best rank {entry['best_rank']}")
+    if args.json:
+        rankings = {port: group['drones'][:args.top_k] for group in groups for port in group['ports']}
+        with open(args.json, 'w') as handle:
+            json.dump({'catalog_version': snapshot.version, 'rankings': rankings, 'report': report}, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
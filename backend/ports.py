@@ -0,0 +1,110 @@
+import re
+import unicodedata
+
+# Letters that Unicode decomposition does not reduce to ASCII
+_FOLD_LETTERS = str.maketrans({
+    'ø': 'o', 'æ': 'ae', 'œ': 'oe', 'ß': 'ss', 'đ': 'd', 'ł': 'l', 'þ': 'th', 'ð': 'd', 'ı': 'i',
+})
+_PORT_PREFIX = re.compile(r'^(the )?(port|porto|puerto) (of|di|de|del) ')
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_port_name(name):
+    """
+    Fold a port name for matching: accents, case and punctuation are ignored
+    and a leading "Port of" is dropped, so "Port of Lübeck", "lubeck" and
+    "LÜBECK" all map to "lubeck".
+    """
+    if not isinstance(name, str):
+        return ''
+    folded = unicodedata.normalize('NFKD', name.casefold().translate(_FOLD_LETTERS))
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    folded = _NON_ALNUM.sub(' ', folded).strip()
+    return _PORT_PREFIX.sub('', folded)
+
+
+class PortIndex:
+    """
+    Exact-match hash index and prefix trie over the port names of a port frame.
+
+    Positions refer to rows of the frame (as used by iloc). The trie holds the
+    normalized full name and every word suffix of it, so "haven" completes
+    both "Havenhafen" and "Milford Haven".
+    """
+
+    _END = ''
+
+    def __init__(self, ports):
+        names = ports['port_name'].tolist() if 'port_name' in ports.columns else []
+        countries = ports['country_code'].tolist() if 'country_code' in ports.columns else [None] * len(names)
+        self.names = names
+        self.countries = [c if isinstance(c, str) else None for c in countries]
+        self._exact = {}
+        self._trie = {}
+        for position, name in enumerate(names):
+            key = normalize_port_name(name)
+            if not key:
+                continue
+            self._exact.setdefault(key, position)
+            words = key.split(' ')
+            for start in range(len(words)):
+                self._insert(' '.join(words[start:]), position)
+
+    def _insert(self, text, position):
+        node = self._trie
+        for ch in text:
+            node = node.setdefault(ch, {})
+        node.setdefault(self._END, []).append(position)
+
+    def lookup(self, name):
+        """Position of the port with exactly this (normalized) name, or None."""
+        return self._exact.get(normalize_port_name(name))
+
+    def resolve(self, name):
+        """
+        Exact lookup, falling back to a prefix only when it names a single port.
+        """
+        position = self.lookup(name)
+        if position is not None:
+            return position
+        candidates = self._prefix_positions(normalize_port_name(name), limit=2)
+        return candidates[0] if len(candidates) == 1 else None
+
+    def _prefix_positions(self, prefix, country=None, limit=10):
+        if not prefix:
+            return []
+        node = self._trie
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return []
+
+        found = []
+        seen = set()
+        stack = [node]
+        # Depth-first in sorted order so that shorter, alphabetically earlier names come first
+        while stack and len(found) < limit:
+            current = stack.pop()
+            for position in current.get(self._END, ()):
+                if position in seen:
+                    continue
+                if country and self.countries[position] != country:
+                    continue
+                seen.add(position)
+                found.append(position)
+                if len(found) >= limit:
+                    break
+            children = [k for k in current if k != self._END]
+            stack.extend(current[k] for k in sorted(children, reverse=True))
+        return found
+
+    def complete(self, prefix, country=None, limit=10):
+        """Autocomplete suggestions as [{'port_name', 'country_code'}] dicts."""
+        country = country.upper() if country else None
+        return [
+            {'port_name': self.names[p], 'country_code': self.countries[p]}
+            for p in self._prefix_positions(normalize_port_name(prefix), country, limit)
+        ]
+
+    def countries_list(self):
+        return sorted({c for c in self.countries if c})
@@ -0,0 +1,131 @@
+import copy
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# One bit per purpose in a uint64 per drone
+MAX_PURPOSES = 64
+
+
+class PurposeIndex:
+    """
+    Per-drone bitmask of the purposes each drone satisfies on its own.
+
+    Bit i of `bits[d]` is set when drone d meets every requirement of
+    `purposes[i]`. Because purpose_based_drone_filtering aggregates several
+    purposes (max of numeric thresholds, first value for other attributes),
+    a combination is only the AND of its single-purpose bits when every
+    shared attribute is numeric or has the same value in all purposes; other
+    combinations are evaluated from their aggregated requirements. The
+    resulting masks are cached per purpose set.
+    """
+
+    def __init__(self, system, drones, cache_size=128):
+        self.system = system
+        self.drones = drones
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self.purposes = []
+        self._requirements = {}
+        self.bits = np.zeros(len(drones), dtype=np.uint64)
+        # Bumped by every change, so a mask computed from older bits is not cached
+        self._generation = 0
+        self.sync(system.purpose_mapping)
+
+    def after_fork(self):
+        """Fresh lock in a forked child (see MetricsRegistry.after_fork)."""
+        self._lock = threading.Lock()
+
+    def _bit(self, purpose):
+        return np.uint64(1) << np.uint64(self.purposes.index(purpose))
+
+    def _set_purpose_bit(self, purpose, requirements):
+        bit = self._bit(purpose)
+        satisfied = self.system.purpose_requirement_mask(self.drones, requirements)
+        # A new array, swapped in whole: readers keep the bits they took
+        bits = self.bits & ~bit
+        bits[satisfied] |= bit
+        self.bits = bits
+
+    def sync(self, purpose_mapping):
+        """
+        Bring the index in line with purpose_mapping: new or changed purposes
+        get their bit (re)computed and only cache entries involving them are
+        dropped. Removing a purpose rebuilds the index.
+        """
+        with self._lock:
+            removed = [p for p in self.purposes if p not in purpose_mapping]
+            if removed:
+                self.purposes = []
+                self._requirements = {}
+                self.bits = np.zeros(len(self.drones), dtype=np.uint64)
+                self._cache.clear()
+                self._generation += 1
+
+            for purpose, requirements in purpose_mapping.items():
+                if self._requirements.get(purpose) == requirements:
+                    continue
+                if purpose not in self.purposes:
+                    if len(self.purposes) >= MAX_PURPOSES:
+                        raise ValueError(f"PurposeIndex supports at most {MAX_PURPOSES} purposes")
+                    self.purposes.append(purpose)
+                self._requirements = dict(self._requirements, **{purpose: copy.deepcopy(requirements)})
+                self._set_purpose_bit(purpose, requirements)
+                self._generation += 1
+                bit = int(self._bit(purpose))
+                for key in [k for k in self._cache if k & bit]:
+                    del self._cache[key]
+
+    def key(self, selected_purposes):
+        """Bitmask for a purpose set; unknown purposes carry no requirements."""
+        key = 0
+        for purpose in selected_purposes:
+            if purpose in self._requirements:
+                key |= int(self._bit(purpose))
+        return key
+
+    def _decomposable(self, selected, requirements):
+        seen = {}
+        for purpose in selected:
+            for attr, value in requirements[purpose].items():
+                if attr in seen:
+                    first = seen[attr]
+                    both_numeric = isinstance(first, (int, float)) and isinstance(value, (int, float))
+                    if not both_numeric and first != value:
+                        return False
+                else:
+                    seen[attr] = value
+        return True
+
+    def mask(self, selected_purposes, purpose_mapping=None):
+        """Boolean mask over drones meeting the aggregated requirements of the purposes."""
+        if purpose_mapping is not None and purpose_mapping != self._requirements:
+            self.sync(purpose_mapping)
+
+        with self._lock:
+            selected = [p for p in dict.fromkeys(selected_purposes) if p in self._requirements]
+            key = self.key(selected)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            generation, bits, requirements = self._generation, self.bits, self._requirements
+        if key == 0:
+            return np.ones(len(self.drones), dtype=bool)
+
+        if self._decomposable(selected, requirements):
+            mask = (bits & np.uint64(key)) == np.uint64(key)
+        else:
+            aggregated = self.system.aggregate_purpose_requirements(selected, requirements)
+            mask = self.system.purpose_requirement_mask(self.drones, aggregated)
+        # Cached masks are shared between requests
+        mask.flags.writeable = False
+
+        with self._lock:
+            # A sync since the bits were taken may have dropped this key already
+            if self._generation == generation:
+                self._cache[key] = mask
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return mask
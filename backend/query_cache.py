@@ -0,0 +1,115 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from ports import normalize_port_name
+
+
+def canonical_query(system, snapshot, port_name, purposes, budget, max_maintenance_cost, slider_values,
+                    top_k=None, offset=0, precision=6, method='wsm', operability=None,
+                    fleet=False):
+    """
+    Reduce a match request to the fields that determine its result.
+
+    Purposes are de-duplicated and sorted, the port is resolved to its catalog
+    name (or folded, if unknown), and slider values are replaced by the AHP
+    weights they produce, rounded, so that e.g. all-3 and all-5 sliders share
+    one entry.
+    """
+    port = None
+    if port_name:
+        port_index = getattr(snapshot, 'port_index', None)
+        position = port_index.resolve(port_name) if port_index is not None else None
+        port = port_index.names[position] if position is not None else normalize_port_name(port_name)
+
+    weights = system.ahp_priority_scaling(slider_values) if slider_values else {}
+    return {
+        'port': port,
+        'purposes': sorted(set(purposes or [])),
+        'budget': None if budget is None else float(budget),
+        'max_maintenance_cost': None if max_maintenance_cost is None else float(max_maintenance_cost),
+        'weights': {k: round(float(v), precision) for k, v in sorted(weights.items())},
+        'method': method,
+        'top_k': None if top_k is None else int(top_k),
+        'offset': int(offset),
+        'operability': None if operability is None else round(float(operability), precision),
+        'fleet': bool(fleet),
+    }
+
+
+def query_key(query):
+    """Stable digest of a canonical query."""
+    encoded = json.dumps(query, sort_keys=True, separators=(',', ':')).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class QueryCache:
+    """
+    Bounded LRU cache with a per-entry TTL, tagged with the catalog version.
+
+    Entries belong to the catalog version they were computed from; the first
+    access with a different version drops everything, so a catalog reload
+    invalidates the cache without any explicit hook.
+    """
+
+    def __init__(self, max_entries=256, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'version': self._version,
+            }
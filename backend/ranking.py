@@ -0,0 +1,298 @@
+import numpy as np
+import pandas as pd
+
+BENEFIT = 1
+COST = -1
+
+# Criteria where a lower value is better; every other criterion is a benefit
+CRITERION_DIRECTIONS = {
+    'Price (EUR)': COST,
+    'Maintenance Cost (EUR)': COST,
+    'Fleet Cost (EUR)': COST,
+}
+
+# Share of the WSM score given to the normalized Cost Effectiveness column
+COST_EFFECTIVENESS_WEIGHT = 0.1
+
+# Points checked against the skyline at once by the skyline engine
+SKYLINE_BLOCK = 1024
+# Strong skyline rows every block is checked against first
+SKYLINE_PIVOTS = 32
+
+
+def rank_order(scores, k=None):
+    """
+    Positions of the k highest scores in descending order (all rows if k is
+    None). Ties keep their original order and NaN scores rank last; for k
+    smaller than the row count, np.argpartition avoids a full sort.
+    """
+    scores = np.where(np.isnan(scores), -np.inf, scores)
+    n = len(scores)
+    if k is None or k >= n:
+        return np.lexsort((np.arange(n), -scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.intp)
+    kth = scores[np.argpartition(-scores, k - 1)[k - 1]]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
+
+
+def criterion_direction(criterion):
+    return CRITERION_DIRECTIONS.get(criterion, BENEFIT)
+
+
+class DecisionMatrix:
+    """
+    The candidates x criteria decision matrix shared by all ranking engines.
+
+    `values` holds the raw criteria (NaN where missing) and `directions` is
+    +1 for benefit and -1 for cost criteria. `normalized` is min-max scaled
+    so that 1 is the best value of a column in either direction; missing
+    values are 0 there and flagged in `missing`. Missing, constant and
+    all-NaN columns are not `valid` and stay zero.
+    """
+
+    def __init__(self, df, criteria, directions=None):
+        self.criteria = list(criteria)
+        directions = directions or {}
+        self.directions = np.array([directions.get(c, criterion_direction(c)) for c in self.criteria])
+        n, k = len(df), len(self.criteria)
+        self.values = np.full((n, k), np.nan)
+        self.normalized = np.zeros((n, k))
+        self.valid = np.zeros(k, dtype=bool)
+        for j, attr in enumerate(self.criteria):
+            if attr not in df.columns:
+                continue
+            values = pd.to_numeric(df[attr], errors='coerce').to_numpy(dtype=float)
+            self.values[:, j] = values
+            if np.isnan(values).all():
+                continue
+            col_min, col_max = np.nanmin(values), np.nanmax(values)
+            # Skip if all values are the same or invalid
+            if col_max == col_min:
+                continue
+            scaled = (values - col_min) / (col_max - col_min)
+            self.normalized[:, j] = np.nan_to_num(scaled if self.directions[j] == BENEFIT else 1 - scaled)
+            self.valid[j] = True
+        self.missing = np.isnan(self.values)
+        self.cost_effectiveness = self._cost_effectiveness(df)
+
+    @staticmethod
+    def _cost_effectiveness(df):
+        if 'Cost Effectiveness' not in df.columns:
+            return None
+        values = df['Cost Effectiveness'].to_numpy(dtype=float)
+        spread = np.nanmax(values) - np.nanmin(values) if len(values) else 0
+        if not spread:
+            return None
+        return (values - np.nanmin(values)) / spread
+
+    def __len__(self):
+        return len(self.values)
+
+    def active(self, weights):
+        """Valid criteria with a positive weight."""
+        return self.valid & (np.asarray(weights, dtype=float) > 0)
+
+
+def weighted_scores(matrix, valid, weights, bonus=None):
+    """WSM scores: weighted sum of the normalized criteria plus the cost-effectiveness bonus."""
+    active = valid & (weights > 0)
+    if not active.any():
+        return np.ones(len(matrix))  # Default score if no valid attributes
+    scores = matrix[:, active] @ weights[active]
+    return scores if bonus is None else scores + bonus
+
+
+def skyline_mask(points):
+    """
+    Non-dominated rows of an (n, d) matrix where larger is better in every
+    column, by sort-filter-skyline: rows are visited in decreasing column
+    sum, so a row can only be dominated by rows seen before it, and each
+    block of rows is checked against the skyline found so far at once.
+
+    Before the full check, a block drops rows whose largest value is below
+    the best smallest value of any skyline row (that row beats them in every
+    column) and rows dominated by a few such strong skyline rows.
+    """
+    n = len(points)
+    if not n or not points.shape[1]:
+        return np.ones(n, dtype=bool)
+    totals = points.sum(axis=1)
+
+    def dominated(candidates, by):
+        found = np.zeros(len(candidates), dtype=bool)
+        for start in range(0, len(by), SKYLINE_BLOCK):
+            other = by[start:start + SKYLINE_BLOCK]
+            # Column by column on 2-D masks; reducing a short last axis is slow
+            at_least = points[other[None, :], 0] >= points[candidates[:, None], 0]
+            for j in range(1, points.shape[1]):
+                at_least &= points[other, j][None, :] >= points[candidates, j][:, None]
+            # At least as good everywhere with a larger sum means dominated;
+            # equal sums need a value-by-value check for a strict difference
+            found |= (at_least & (totals[other][None, :] > totals[candidates][:, None])).any(axis=1)
+            rows, cols = np.nonzero(at_least & (totals[other][None, :] == totals[candidates][:, None]))
+            strict = (points[other[cols]] != points[candidates[rows]]).any(axis=1)
+            found[rows[strict]] = True
+        return found
+
+    order = np.argsort(-totals, kind='stable')
+    largest, smallest = points.max(axis=1), points.min(axis=1)
+    members = np.zeros(0, dtype=np.intp)
+    for start in range(0, n, SKYLINE_BLOCK):
+        block = order[start:start + SKYLINE_BLOCK]
+        if len(members):
+            block = block[largest[block] >= smallest[members].max()]
+            strong = members[np.argsort(-smallest[members], kind='stable')[:SKYLINE_PIVOTS]]
+            block = block[~dominated(block, strong)]
+            block = block[~dominated(block, members)]
+        block = block[~dominated(block, block)]
+        members = np.concatenate([members, block])
+
+    # Rounding can tie the sums of a dominating and a dominated row
+    members = members[~dominated(members, members)]
+    mask = np.zeros(n, dtype=bool)
+    mask[members] = True
+    return mask
+
+
+class RankingEngine:
+    """
+    Base class of the ranking methods: an engine turns a DecisionMatrix and
+    a weight per criterion into one score per candidate (NaN for candidates
+    it does not rank), ordered descending or, with descending = False,
+    ascending.
+    """
+
+    name = None
+    label = None
+    score_column = 'Score'
+    descending = True
+
+    def scores(self, decision, weights):
+        raise NotImplementedError
+
+    def rank(self, decision, weights, top_k=None, offset=0):
+        """
+        Positions of the requested page of candidates in rank order, all
+        scores, and the number of ranked candidates.
+        """
+        weights = np.asarray(weights, dtype=float)
+        scores = self.scores(decision, weights)
+        ranked = int(np.count_nonzero(~np.isnan(scores)))
+        limit = ranked if top_k is None else min(ranked, offset + top_k)
+        order = rank_order(scores if self.descending else -scores, limit)[offset:]
+        return order, scores, ranked
+
+
+class WSMEngine(RankingEngine):
+    """Weighted sum of min-max normalized criteria plus a cost-effectiveness bonus."""
+
+    name = 'wsm'
+    label = 'Weighted Sum (WSM)'
+    score_column = 'WSM Score'
+
+    def __init__(self, bonus_weight=COST_EFFECTIVENESS_WEIGHT):
+        self.bonus_weight = bonus_weight
+
+    def bonus(self, decision):
+        if decision.cost_effectiveness is None or not self.bonus_weight:
+            return None
+        return decision.cost_effectiveness * self.bonus_weight
+
+    def scores(self, decision, weights):
+        return weighted_scores(decision.normalized, decision.valid, weights, self.bonus(decision))
+
+
+class TOPSISEngine(RankingEngine):
+    """
+    Relative closeness to the ideal solution: criteria are vector normalized
+    and weighted, and each candidate's distance to the best and worst value
+    of every criterion gives closeness = d_worst / (d_best + d_worst).
+    """
+
+    name = 'topsis'
+    label = 'TOPSIS'
+    score_column = 'TOPSIS Score'
+
+    def scores(self, decision, weights):
+        active = decision.active(weights)
+        if not active.any():
+            return np.ones(len(decision))
+        values = decision.values[:, active]
+        directions = decision.directions[active]
+        # Missing values count as the worst value of their criterion
+        worst = np.where(directions == BENEFIT, np.nanmin(values, axis=0), np.nanmax(values, axis=0))
+        values = np.where(np.isnan(values), worst, values)
+
+        norms = np.sqrt((values ** 2).sum(axis=0))
+        weighted = values / np.where(norms > 0, norms, 1) * (weights[active] / weights[active].sum())
+        best = np.where(directions == BENEFIT, weighted.max(axis=0), weighted.min(axis=0))
+        worst = np.where(directions == BENEFIT, weighted.min(axis=0), weighted.max(axis=0))
+        to_best = np.sqrt(((weighted - best) ** 2).sum(axis=1))
+        to_worst = np.sqrt(((weighted - worst) ** 2).sum(axis=1))
+        total = to_best + to_worst
+        return np.divide(to_worst, total, out=np.ones(len(decision)), where=total > 0)
+
+
+class VIKOREngine(RankingEngine):
+    """
+    Compromise ranking: Q mixes the weighted group regret S and the largest
+    individual regret R (v is the weight of S); lower Q ranks first.
+    """
+
+    name = 'vikor'
+    label = 'VIKOR'
+    score_column = 'VIKOR Q'
+    descending = False
+
+    def __init__(self, v=0.5):
+        self.v = v
+
+    def scores(self, decision, weights):
+        active = decision.active(weights)
+        if not active.any():
+            return np.zeros(len(decision))
+        # With min-max normalization (1 = best), (f* - f) / (f* - f-) is 1 - normalized
+        regret = (1 - decision.normalized[:, active]) * (weights[active] / weights[active].sum())
+        group, individual = regret.sum(axis=1), regret.max(axis=1)
+
+        def scaled(values):
+            spread = values.max() - values.min()
+            return (values - values.min()) / spread if spread else np.zeros(len(values))
+
+        return self.v * scaled(group) + (1 - self.v) * scaled(individual)
+
+
+class SkylineEngine(RankingEngine):
+    """
+    Pareto skyline: only candidates that no other candidate matches or beats
+    on every weighted criterion are ranked, ordered by their WSM score.
+    """
+
+    name = 'skyline'
+    label = 'Pareto Skyline'
+    score_column = 'Skyline WSM Score'
+
+    def __init__(self, bonus_weight=COST_EFFECTIVENESS_WEIGHT):
+        self.wsm = WSMEngine(bonus_weight)
+
+    def scores(self, decision, weights):
+        active = decision.active(weights)
+        # Missing values rank below every present value
+        points = np.where(decision.missing[:, active], -1.0, decision.normalized[:, active])
+        scores = self.wsm.scores(decision, weights)
+        return np.where(skyline_mask(points), scores, np.nan)
+
+
+RANKING_ENGINES = {engine.name: engine for engine in (WSMEngine, TOPSISEngine, VIKOREngine, SkylineEngine)}
+
+
+def get_engine(name):
+    """Ranking engine instance for a method name ('wsm', 'topsis', 'vikor', 'skyline')."""
+    engine = RANKING_ENGINES.get((name or 'wsm').lower())
+    if engine is None:
+        raise ValueError(f"Unknown ranking method '{name}'; choose one of {', '.join(RANKING_ENGINES)}")
+    return engine()
@@ -0,0 +1,300 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+from ahp import batch_ahp
+from pdf import PDFDocument
+
+# Ranked drones listed in a report
+REPORT_ROWS = 50
+# Seconds a failed report job is reported before it is forgotten
+FAILED_JOB_TTL = 300
+# Columns of the ranked table after rank, name and score: (column, header, relative width)
+REPORT_COLUMNS = [
+    ('Category', 'Category', 2.2),
+    ('Price (EUR)', 'Price (EUR)', 1.3),
+    ('Maintenance Cost (EUR)', 'Maint. (EUR)', 1.3),
+    ('Battery Life (minutes)', 'Battery (min)', 1.2),
+    ('Wind Resistance (m/s)', 'Wind (m/s)', 1.1),
+    ('Camera Resolution (MP)', 'Camera (MP)', 1.2),
+]
+
+
+def report_key(query, catalog_version):
+    """Content address of a report: digest of the canonical query and the catalog version."""
+    payload = json.dumps({'query': query, 'catalog': catalog_version}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _plain(value):
+    """JSON- and pickle-friendly Python value for a NumPy/pandas scalar."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def build_report(query, catalog_version, selection, slider_values, score_column):
+    """
+    Everything a report shows, as plain Python data so it is cheap to send
+    to a worker process: the query, the ranked table, port constraints, AHP
+    weights with their consistency ratio, and the rows each filter removed.
+    """
+    criteria = list(slider_values)
+    ahp = batch_ahp(np.array([[slider_values[c] for c in criteria]], dtype=float), memoize=False)
+    plan = selection['plan']
+    results = selection['results']
+
+    columns = [c for c in REPORT_COLUMNS if c[0] in results.columns]
+    rows = []
+    for rank, (_, drone) in enumerate(results.head(REPORT_ROWS).iterrows(), 1):
+        score = drone.get(score_column)
+        rows.append([rank, drone.get('Drone Name'), None if score is None else _plain(score)]
+                    + [_plain(drone[column]) for column, _, _ in columns])
+
+    return {
+        'catalog_version': catalog_version,
+        'query': query,
+        'summary': selection['summary'],
+        'total': int(selection['total']),
+        'port_constraints': {k: _plain(v) for k, v in selection['port_constraints'].items()},
+        'weights': [{
+            'criterion': criterion,
+            'slider': float(slider_values[criterion]),
+            'geometric': float(ahp.geometric[0, j]),
+            'eigenvector': float(ahp.eigenvector[0, j]),
+        } for j, criterion in enumerate(criteria)],
+        'consistency_ratio': _plain(ahp.consistency_ratio[0]),
+        'elimination': [{
+            'predicate': step['predicate'],
+            'stage': step['stage'],
+            'rows_in': int(step['rows_in']),
+            'rows_out': int(step['rows_out']),
+        } for step in (plan.explain() if plan is not None else []) if 'rows_in' in step],
+        'score_column': score_column,
+        'headers': ['#', 'Drone Name', score_column] + [header for _, header, _ in columns],
+        'widths': [0.5, 3, 1.3] + [width for _, _, width in columns],
+        'rows': rows,
+    }
+
+
+def _cell(value):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return f'{value:,.4f}' if abs(value) < 10 else f'{value:,.0f}'
+    return str(value)
+
+
+def render_report(report):
+    """PDF bytes for a report built by build_report; runs in the worker processes."""
+    query = report['query']
+    doc = PDFDocument('Drone Selection Report')
+    doc.heading('Drone Selection Report', size=18)
+    doc.line(f"Port: {query.get('port') or 'any'}    Purposes: {', '.join(query.get('purposes') or []) or 'any'}")
+    doc.line(f"Budget: {_cell(query.get('budget'))} EUR    "
+             f"Max maintenance: {_cell(query.get('max_maintenance_cost'))} EUR    "
+             f"Ranking: {query.get('method', 'wsm')}")
+    doc.line(f"Catalog version {report['catalog_version']}", size=8)
+    doc.paragraph(report['summary'])
+
+    doc.heading('Port Constraints')
+    if report['port_constraints']:
+        doc.table(['Constraint', 'Value'],
+                  [[k.replace('_', ' ').capitalize(), _cell(v)] for k, v in report['port_constraints'].items()],
+                  widths=[2, 3], size=9)
+    else:
+        doc.line('No port selected or the port is not in the catalog.')
+
+    doc.heading('AHP Weights')
+    doc.table(['Criterion', 'Slider', 'Weight (geometric mean)', 'Weight (eigenvector)'],
+              [[w['criterion'], _cell(w['slider']), _cell(w['geometric']), _cell(w['eigenvector'])]
+               for w in report['weights']], widths=[3, 1, 2, 2], size=9)
+    ratio = report['consistency_ratio']
+    doc.line('Consistency ratio: ' + ('n/a' if ratio is None else f'{ratio:.4f}'))
+
+    doc.heading('Elimination Breakdown')
+    if report['elimination']:
+        doc.table(['Filter', 'Stage', 'Drones in', 'Eliminated', 'Remaining'],
+                  [[step['predicate'], step['stage'], step['rows_in'], step['rows_in'] - step['rows_out'],
+                    step['rows_out']] for step in report['elimination']],
+                  widths=[4, 1.2, 1, 1, 1], size=9)
+    else:
+        doc.line('No filters were applied.')
+
+    doc.heading('Ranked Drones')
+    if report['rows']:
+        doc.table(report['headers'], [[_cell(v) for v in row] for row in report['rows']], widths=report['widths'])
+        if report['total'] > len(report['rows']):
+            doc.line(f"Top {len(report['rows'])} of {report['total']} ranked drones.", size=8)
+    else:
+        doc.line('No drones meet the constraints.')
+    return doc.render()
+
+
+class ArtifactCache:
+    """
+    Files on disk addressed by the key of their content, so an artifact is
+    written once (atomically) and every later request only reads it.
+    """
+
+    def __init__(self, directory, suffix='.pdf'):
+        self.directory = directory
+        self.suffix = suffix
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    def get(self, key):
+        """Path of the artifact for key, or None if it has not been written."""
+        path = self.path(key)
+        return path if os.path.exists(path) else None
+
+    def put(self, key, data):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp, path)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        return path
+
+
+class ReportQueueFull(Exception):
+    """Too many report jobs are waiting; the client should retry later."""
+
+
+class ReportJobs:
+    """
+    Report building and rendering off the request threads, on a bounded
+    process pool.
+
+    A job's id is its report key, so identical requests share one job and,
+    once it has finished, the cached artifact. At most `max_pending` jobs
+    wait or run at once; further submissions raise ReportQueueFull. A job
+    builds its report (the selection pipeline) on a thread and renders it
+    on the process pool. The pool is started on first use with the spawn
+    method, so workers do not inherit the server's threads or catalog (app.py
+    skips its setup when a worker re-imports it as __mp_main__). A failed
+    job is replaced by the next submission of its request right away;
+    `failed_ttl` only bounds how long status() still reports the failure.
+    """
+
+    def __init__(self, cache, max_workers=2, max_pending=16, failed_ttl=FAILED_JOB_TTL):
+        self.cache = cache
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.failed_ttl = failed_ttl
+        self._jobs = {}
+        self._executor = None
+        self._builders = None
+        self._lock = threading.Lock()
+
+    def _pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def _expire(self):
+        cutoff = time.time() - self.failed_ttl
+        for job_id in [k for k, j in self._jobs.items() if j['status'] == 'failed' and j['finished'] < cutoff]:
+            del self._jobs[job_id]
+
+    def _describe(self, job_id, job=None):
+        if self.cache.get(job_id):
+            return {'id': job_id, 'status': 'done'}
+        if job is None:
+            return None
+        status = job['status']
+        if status == 'queued' and job['render'] is not None and job['render'].running():
+            status = 'running'
+        described = {'id': job_id, 'status': status, 'submitted': job['submitted']}
+        if 'error' in job:
+            described['error'] = job['error']
+        return described
+
+    def submit(self, job_id, build):
+        """
+        Queue the report job_id unless it is cached or already queued.
+        `build` is called only when the job is actually queued, on a builder
+        thread, and returns the report passed to render_report.
+        """
+        with self._lock:
+            self._expire()
+            if self.cache.get(job_id):
+                return self._describe(job_id)
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] == 'queued':
+                return self._describe(job_id, job)
+            if sum(1 for j in self._jobs.values() if j['status'] == 'queued') >= self.max_pending:
+                raise ReportQueueFull(f"{self.max_pending} reports are already being prepared")
+            # The slot is reserved before the report is built
+            job = {'status': 'queued', 'submitted': time.time(), 'render': None, 'done': threading.Event()}
+            self._jobs[job_id] = job
+            if self._builders is None:
+                self._builders = ThreadPoolExecutor(self.max_workers, thread_name_prefix='report-build')
+            builders = self._builders
+        builders.submit(self._build, job_id, job, build)
+        return self._describe(job_id, job)
+
+    def _build(self, job_id, job, build):
+        try:
+            report = build()
+            with self._lock:
+                job['render'] = self._pool().submit(render_report, report)
+        except Exception as e:
+            self._fail(job, e)
+            return
+        job['render'].add_done_callback(lambda f: self._finish(job_id, job, f))
+
+    def _finish(self, job_id, job, future):
+        try:
+            self.cache.put(job_id, future.result())
+        except Exception as e:
+            self._fail(job, e)
+            return
+        with self._lock:
+            # The artifact now answers for the job
+            if self._jobs.get(job_id) is job:
+                del self._jobs[job_id]
+        job['done'].set()
+
+    def _fail(self, job, error):
+        with self._lock:
+            job.update(status='failed', error=str(error) or type(error).__name__, finished=time.time())
+        job['done'].set()
+
+    def status(self, job_id):
+        """Status dict of a job ('queued', 'running', 'done' or 'failed'), or None if unknown."""
+        with self._lock:
+            self._expire()
+            return self._describe(job_id, self._jobs.get(job_id))
+
+    def wait(self, job_id, timeout=None):
+        """Block until the job has finished; returns its status."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            job['done'].wait(timeout)
+        return self.status(job_id)
+
+    def shutdown(self, wait=True):
+        if self._builders is not None:
+            self._builders.shutdown(wait=wait)
+            self._builders = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,211 @@
+import numpy as np
+
+from utils import rank_order
+
+# Upper bound on the (samples x candidates) score block held in memory at once
+DEFAULT_CHUNK_BYTES = 32 * 2**20
+# Samples drawn at once; after grouping they are scored in chunks of at
+# least CHUNK_SAMPLES rows and about CHUNK_SCORES scores
+BATCH_SAMPLES = 16384
+CHUNK_SAMPLES = 256
+CHUNK_SCORES = 2**18
+# Cells per criterion used to group similar weight vectors
+GRID_LEVELS = 8
+# Consecutive chunks sharing one candidate pool, pruned once for all of them
+POOL_CHUNKS = 8
+# Candidates best for a chunk's mean weight whose scores bound each sample's top-th score, per rank
+SEED_FACTOR = 4
+
+
+def sample_weights(rng, size, base_weights, concentration=100.0):
+    """
+    Draw `size` weight vectors on the simplex, Dirichlet-distributed around
+    base_weights: their mean is the normalized base_weights and a larger
+    concentration gives a tighter cloud. Criteria with zero base weight stay
+    at zero; equal base weights with concentration equal to their number
+    sample uniformly over the simplex.
+    """
+    base = np.asarray(base_weights, dtype=float)
+    weights = np.zeros((size, len(base)))
+    support = np.flatnonzero(base > 0)
+    if not len(support):
+        return weights
+    alpha = base[support] / base[support].sum() * concentration
+    weights[:, support] = rng.dirichlet(alpha, size)
+    return weights
+
+
+class WeightSensitivity:
+    """
+    Monte Carlo rank stability of a WSM ranking under perturbed weights.
+
+    Works on the normalized criteria matrix and cost-effectiveness bonus used
+    by DroneSelectionSystem.rank_precomputed. Samples are grouped by weight
+    region, and each chunk of them is scored against the candidates with one
+    matrix product; ranks 1..top of every sample are counted, ties keeping
+    catalog order as in rank_order. Candidates whose best possible score in a
+    chunk is below the top-th best guaranteed score cannot reach the top there
+    and are skipped, so the counts are exact up to float32 rounding.
+    """
+
+    def __init__(self, matrix, valid, bonus=None, top=10):
+        self.matrix = np.asarray(matrix, dtype=float)
+        self.valid = np.asarray(valid, dtype=bool)
+        self.bonus = np.zeros(len(self.matrix)) if bonus is None else np.nan_to_num(bonus)
+        self.top = max(1, min(int(top), len(self.matrix)))
+        # Scores are computed in float32 from a criteria-major copy
+        self._columns = np.ascontiguousarray(self.matrix.T, dtype=np.float32)
+        self._bonus = self.bonus.astype(np.float32)
+        self._sorted = {}
+
+    def base_ranks(self, weights):
+        """1-based rank of every candidate under the given weights."""
+        scores = self.matrix @ np.where(self.valid, weights, 0.0) + self.bonus
+        ranks = np.empty(len(scores), dtype=int)
+        ranks[rank_order(scores)] = np.arange(1, len(scores) + 1)
+        return ranks
+
+    def _chunk_candidates(self, weights, pool=None):
+        """
+        Candidates (of `pool`, all by default) that can reach the top for
+        some sample of the chunk. A pool pruned for a superset of the
+        samples only drops candidates that cannot reach the top here either.
+        """
+        support = np.flatnonzero(weights.any(axis=0))
+        if pool is None:
+            pool = np.arange(len(self.matrix))
+        if len(pool) <= self.top or not len(support):
+            return pool
+        columns, order, ordered = (a[pool] for a in self._sorted_columns(support))
+        low, high = weights[:, support].min(axis=0), weights[:, support].max(axis=0)
+        # Every sample lies in the box [low, high] and sums to 1, so a score
+        # is bounded by putting the weight left above `low` on the candidate's
+        # best (for the upper bound) or worst (lower bound) criteria first,
+        # each up to its `high`.
+        lower = self._box_bound(columns, order, ordered, low, high) + self.bonus[pool]
+        upper = self._box_bound(columns, order[:, ::-1], ordered[:, ::-1], low, high) + self.bonus[pool]
+        threshold = np.partition(lower, len(lower) - self.top)[len(lower) - self.top]
+        return pool[upper >= threshold]
+
+    def _sorted_columns(self, support):
+        """The supported criteria columns with each candidate's criteria in ascending order."""
+        key = support.tobytes()
+        if key not in self._sorted:
+            columns = self.matrix[:, support]
+            order = np.argsort(columns, axis=1)
+            self._sorted[key] = (columns, order, np.take_along_axis(columns, order, axis=1))
+        return self._sorted[key]
+
+    @staticmethod
+    def _box_bound(columns, order, ordered, low, high):
+        room = (high - low)[order]
+        spare = 1.0 - low.sum()
+        filled = np.minimum(room, np.maximum(spare - (np.cumsum(room, axis=1) - room), 0.0))
+        return columns @ low + (ordered * filled).sum(axis=1)
+
+    def _count_chunk(self, weights, pool=None):
+        candidates = self._chunk_candidates(weights, pool)
+        scores = weights.astype(np.float32) @ self._columns[:, candidates]
+        scores += self._bonus[candidates]
+        top = min(self.top, len(candidates))
+        # The best candidates for the mean weight of the chunk give every
+        # sample a lower bound on its top-th best score (the top-th best of
+        # theirs), so only the few candidates at or above it need ordering.
+        seeds = rank_order(scores.mean(axis=0), min(SEED_FACTOR * top, len(candidates)))
+        seeded = scores[:, seeds]
+        threshold = np.partition(seeded, seeded.shape[1] - top, axis=1)[:, seeded.shape[1] - top]
+        rows, cols = np.nonzero(scores >= threshold[:, None])
+        slots = np.arange(len(rows)) - np.searchsorted(rows, rows)
+        hits = np.full((len(scores), slots.max() + 1), -np.inf, dtype=np.float32)
+        hits[rows, slots] = scores[rows, cols]
+        # Stable, so ties keep catalog order as in rank_order
+        order = np.argsort(-hits, axis=1, kind='stable')[:, :top]
+        starts = np.searchsorted(rows, np.arange(len(scores)))
+        best = candidates[cols[starts[:, None] + order]]
+        return (best * self.top + np.arange(top)).ravel()
+
+    def run(self, base_weights=None, samples=10000, concentration=100.0, seed=None,
+            chunk_bytes=DEFAULT_CHUNK_BYTES):
+        """
+        Sample weights around base_weights (uniformly over the simplex of the
+        valid criteria when None) and count how often each candidate lands
+        at each of the first `top` ranks. Returns a SensitivityResult.
+        """
+        if not len(self.matrix) or samples <= 0:
+            return SensitivityResult(np.zeros(0, dtype=np.int64), np.zeros((0, self.top), dtype=np.int64),
+                                     max(0, samples), self.top)
+
+        rng = np.random.default_rng(seed)
+        if base_weights is None:
+            base, concentration = self.valid.astype(float), float(self.valid.sum())
+        else:
+            base = np.where(self.valid, np.asarray(base_weights, dtype=float), 0.0)
+
+        n = len(self.matrix)
+        chunk = max(1, min(max(CHUNK_SAMPLES, CHUNK_SCORES // n), BATCH_SAMPLES, chunk_bytes // (4 * n)))
+        counts = np.zeros(0, dtype=np.int64)
+        for start in range(0, samples, BATCH_SAMPLES):
+            weights = sample_weights(rng, min(BATCH_SAMPLES, samples - start), base, concentration)
+            # Group similar weight vectors so each chunk's score bounds are tight
+            cells = np.floor(weights * GRID_LEVELS).astype(np.int64)
+            weights = weights[np.lexsort(cells.T[::-1])]
+            for offset in range(0, len(weights), chunk):
+                if offset % (chunk * POOL_CHUNKS) == 0:
+                    # Candidates for the next few (neighbouring) chunks, pruned once against all
+                    pool = self._chunk_candidates(weights[offset:offset + chunk * POOL_CHUNKS])
+                codes = self._count_chunk(weights[offset:offset + chunk], pool)
+                chunk_counts = np.bincount(codes)
+                if len(chunk_counts) > len(counts):
+                    chunk_counts[:len(counts)] += counts
+                    counts = chunk_counts
+                else:
+                    counts[:len(chunk_counts)] += chunk_counts
+
+        codes = np.flatnonzero(counts)
+        positions, slots = np.unique(codes // self.top, return_inverse=True)
+        rank_counts = np.zeros((len(positions), self.top), dtype=np.int64)
+        rank_counts[slots, codes % self.top] = counts[codes]
+        return SensitivityResult(positions, rank_counts, samples, self.top)
+
+
+class SensitivityResult:
+    """Per-candidate counts of ranks 1..top over all samples."""
+
+    def __init__(self, positions, rank_counts, samples, top):
+        self.positions = positions
+        self.rank_counts = rank_counts
+        self.samples = samples
+        self.top = top
+
+    def rank_quantile(self, q):
+        """
+        Rank at quantile q for every listed candidate, or None where that
+        quantile lies beyond `top`.
+        """
+        cumulative = np.cumsum(self.rank_counts, axis=1)
+        reached = cumulative >= q * self.samples
+        ranks = np.where(reached.any(axis=1), reached.argmax(axis=1) + 1, 0)
+        return [int(r) if r else None for r in ranks]
+
+    def records(self, names=None, base_ranks=None, interval=(0.05, 0.95)):
+        """
+        One dict per candidate that reached the top at least once, ordered by
+        probability of ranking first, then of reaching the top.
+        """
+        p_first = self.rank_counts[:, 0] / self.samples if self.samples else np.zeros(len(self.positions))
+        p_top = self.rank_counts.sum(axis=1) / self.samples if self.samples else np.zeros(len(self.positions))
+        low, median, high = (self.rank_quantile(q) for q in (interval[0], 0.5, interval[1]))
+        records = []
+        for i, position in enumerate(self.positions):
+            records.append({
+                'position': int(position),
+                'name': None if names is None else names[position],
+                'base_rank': None if base_ranks is None else int(base_ranks[position]),
+                'p_first': float(p_first[i]),
+                'p_top': float(p_top[i]),
+                'rank_low': low[i],
+                'rank_median': median[i],
+                'rank_high': high[i],
+            })
+        records.sort(key=lambda r: (-r['p_first'], -r['p_top'], r['base_rank'] or 0))
+        return records
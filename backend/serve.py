@@ -0,0 +1,259 @@
+"""
+Pre-fork production server.
+
+    python backend/serve.py
+
+The parent process loads the catalog and its indexes, binds the listening
+socket and forks WORKERS processes that serve it with THREADS threads each,
+so the workers share the parent's catalog pages copy-on-write instead of
+loading one copy each. The parent polls the data files every
+CATALOG_CHECK_INTERVAL seconds (or on SIGHUP); when they changed it builds
+the new catalog, forks a new generation of workers and lets the old ones
+finish their requests. SIGTERM or SIGINT drains the workers and exits.
+/metrics on any worker reports the totals of all workers, past generations
+included (each writes its metrics to a shared directory every
+METRICS_FLUSH_INTERVAL seconds, so other workers' values may lag by that).
+Settings come from config_by_name[DSS_CONFIG] (default 'production').
+Needs os.fork, so it does not run on Windows.
+"""
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+from config import config_by_name
+from metrics import METRICS_FLUSH_INTERVAL, REGISTRY, WorkerMetrics, format_fields
+
+logger = logging.getLogger('dss.serve')
+
+# Seconds between the parent's checks for exited workers and signals
+SUPERVISE_INTERVAL = 0.2
+
+
+class RequestHandler(WSGIRequestHandler):
+    # One request per connection, so an idle keep-alive client never holds a worker thread
+    protocol_version = 'HTTP/1.0'
+
+
+class PooledWSGIServer(BaseWSGIServer):
+    """WSGI server on an inherited listening socket, handling connections on a fixed thread pool."""
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, host, port, app, fd, threads):
+        super().__init__(host, port, app, handler=RequestHandler, fd=fd)
+        # Workers share the socket: one whose accept() lost the race gets EAGAIN instead of blocking
+        self.socket.setblocking(False)
+        self.pool = ThreadPoolExecutor(threads, thread_name_prefix='dss-worker')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        pool = getattr(self, 'pool', None)
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+
+class PreforkServer:
+    """
+    Supervises generations of forked workers that serve `app` from one
+    listening socket and share the parent's `catalog` snapshot.
+    """
+
+    def __init__(self, app, catalog, config):
+        self.app = app
+        self.catalog = catalog
+        self.config = config
+        self.socket = None
+        self.metrics = None
+        self.workers = {}
+        self.retiring = {}
+        self.generation = 0
+        self.version = None
+        self._stopping = False
+        self._reload_requested = False
+
+    def bind(self):
+        self.socket = socket.create_server((self.config.HOST, self.config.PORT), backlog=1024, reuse_port=False)
+        self.socket.setblocking(False)
+        return self.socket.getsockname()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                self._serve()
+                code = 0
+            except BaseException:
+                logger.exception('worker failed')
+            finally:
+                os._exit(code)
+        self.workers[pid] = self.generation
+        return pid
+
+    def _serve(self):
+        """Worker process: serve until SIGTERM, then finish the requests in flight."""
+        for sig in (signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_IGN)
+        # The parent owns catalog reloads; a worker keeps the snapshot it was forked with
+        self.catalog.check_interval = float('inf')
+        self.app.config['DRAINING'] = False
+        # Metrics the parent recorded before forking are not this worker's
+        REGISTRY.reset()
+        self.app.config['METRICS_DIR'] = self.metrics.directory
+        host, port = self.socket.getsockname()[:2]
+        server = PooledWSGIServer(host, port, self.app, self.socket.fileno(), self.config.THREADS)
+        stopped = threading.Event()
+
+        def flush():
+            while not stopped.wait(METRICS_FLUSH_INTERVAL):
+                self.metrics.write()
+
+        def drain(signum, frame):
+            self.app.config['DRAINING'] = True
+            threading.Thread(target=server.shutdown, daemon=True).start()
+
+        signal.signal(signal.SIGTERM, drain)
+        threading.Thread(target=flush, daemon=True).start()
+        try:
+            server.serve_forever()
+        finally:
+            stopped.set()
+            self.metrics.write()
+
+    def _spawn_generation(self):
+        """Fork a full set of workers from the current catalog snapshot."""
+        snapshot = self.catalog.snapshot()
+        self.version = snapshot.version
+        self.generation += 1
+        # Keep the collector from writing to (and so copying) the shared objects' pages.
+        # Unfreeze first, so cycles left by the previous generation's snapshot are collected.
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.config.WORKERS):
+            self._spawn()
+        logger.info(format_fields(event='generation', generation=self.generation, workers=self.config.WORKERS,
+                                  threads=self.config.THREADS, catalog_version=self.version))
+
+    def _retire(self, pids):
+        deadline = time.monotonic() + self.config.GRACEFUL_TIMEOUT
+        for pid in pids:
+            self.workers.pop(pid, None)
+            self.retiring[pid] = deadline
+            self._signal(pid, signal.SIGTERM)
+
+    @staticmethod
+    def _signal(pid, sig):
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self):
+        """Forget exited workers; replace those of the current generation that died."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            self.retiring.pop(pid, None)
+            self.metrics.retire(pid)
+            generation = self.workers.pop(pid, None)
+            if generation == self.generation and not self._stopping:
+                logger.warning(format_fields(event='worker_exit', pid=pid, status=status))
+                self._spawn()
+
+    def _kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self.retiring.items()):
+            if now >= deadline:
+                self._signal(pid, signal.SIGKILL)
+
+    def reload(self, force=False):
+        """Rebuild the catalog if its files changed and roll the workers onto it."""
+        self._reload_requested = False
+        try:
+            snapshot = self.catalog.reload(force=force)
+        except Exception:
+            logger.exception('catalog reload failed; workers keep the previous catalog')
+            return False
+        if snapshot.version == self.version and not force:
+            return False
+        old = list(self.workers)
+        self._spawn_generation()
+        self._retire(old)
+        return True
+
+    def stop(self, *args):
+        self._stopping = True
+
+    def _request_reload(self, *args):
+        self._reload_requested = True
+
+    def run(self):
+        """Bind (unless already bound), fork the workers and supervise them until stopped."""
+        if self.socket is None:
+            self.bind()
+        # Workers combine their /metrics through files here; see metrics.WorkerMetrics
+        self.metrics = WorkerMetrics(tempfile.mkdtemp(prefix='dss-metrics-'))
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGHUP, self._request_reload)
+        host, port = self.socket.getsockname()[:2]
+        logger.info(format_fields(event='listening', host=host, port=port, pid=os.getpid()))
+        self._spawn_generation()
+        next_check = time.monotonic() + self.config.CATALOG_CHECK_INTERVAL
+        while not self._stopping:
+            time.sleep(SUPERVISE_INTERVAL)
+            self._reap()
+            self._kill_overdue()
+            if self._reload_requested:
+                self.reload(force=True)
+            elif time.monotonic() >= next_check:
+                self.reload()
+            if time.monotonic() >= next_check:
+                next_check = time.monotonic() + self.config.CATALOG_CHECK_INTERVAL
+
+        self._retire(list(self.workers))
+        while self.retiring:
+            time.sleep(SUPERVISE_INTERVAL)
+            self._reap()
+            self._kill_overdue()
+        self.socket.close()
+        shutil.rmtree(self.metrics.directory, ignore_errors=True)
+        logger.info(format_fields(event='stopped', pid=os.getpid()))
+
+
+def main():
+    config = config_by_name[os.environ.get('DSS_CONFIG', 'production')]
+    # Importing the app loads the catalog and its indexes, once, in this parent process
+    from app import app, catalog
+    app.config.from_object(config)
+    PreforkServer(app, catalog, config).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,54 @@
 import pandas as pd
 import numpy as np
 import warnings
+import logging
 import os
+from ahp import slider_priorities
+from columnar import load_cached
+from config import Config
+from diagnostics import EliminationDiagnostics
+from fleet import COVERAGE_HOURS, FLEET_COST, FLEET_YEARS, fleet_costs
+from metrics import record_stage, span
+from mixed_fleet import MAX_MODELS, TIME_LIMIT, MixedFleetOptimizer
+from planner import Predicate, QueryPlanner
+from ports import PortIndex
+from ranking import COST_EFFECTIVENESS_WEIGHT, DecisionMatrix, get_engine, rank_order, weighted_scores
+from weather import operability_fraction
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_DRONE_DATA_PATH = os.path.join(DATA_DIR, 'droneType002.csv')
+DEFAULT_PORT_DATA_PATH = os.path.join(DATA_DIR, 'merged_ports_data.csv')
+
+# Simple IP rating comparison (could be enhanced with proper IP rating logic)
+IP_HIERARCHY = {
+    'Not rated': 0, 'IP20': 20, 'IP43': 43, 'IP44': 44,
+    'IP45': 45, 'IP53': 53, 'IP54': 54, 'IP65': 65, 'IP67': 67
+}
+
+# Range formats found in the data files, e.g. "-20°C to 50°C", "5-95% RH", "-1-16"
+_NUMBER = r'(-?\d+(?:\.\d+)?)'
+DRONE_TEMPERATURE_PATTERN = _NUMBER + r'\s*°?C?\s+to\s+' + _NUMBER + r'\s*°?C?'
+HUMIDITY_PATTERN = _NUMBER + r'\s*%?\s*-\s*' + _NUMBER + r'\s*%'
+PORT_TEMPERATURE_PATTERN = r'^\s*' + _NUMBER + r'\s*-\s*' + _NUMBER + r'\s*$'
+
+# Slider criteria, ranked with equal priority when no slider values are given
+SLIDER_CRITERIA = ['Battery Life (minutes)', 'Wind Resistance (m/s)', 'Camera Resolution (MP)', 'Price (EUR)']
+
+
+def parse_range_column(series, pattern):
+    """
+    Parse a column of range strings into float (min, max) Series in one pass.
+    Values that do not match the pattern become NaN.
+    """
+    parts = series.astype('string').str.extract(pattern)
+    low = pd.to_numeric(parts[0], errors='coerce').astype(float)
+    high = pd.to_numeric(parts[1], errors='coerce').astype(float)
+    return low, high
+
+
 class DroneSelectionSystem:
     """
     Comprehensive drone selection system with enhanced filtering, ranking, and optimization.
@@ -76,11 +121,19 @@ class DroneSelectionSystem:
                 "Temperature Resistance": "-10°C to 40°C"
             }
         }
+        self.query_planner = QueryPlanner()
     
     def load_and_normalize_drone_data(self, filepath):
         """
         Load drone data from CSV and normalize columns with adaptive missing value handling.
+        The normalized frame is served from the compiled columnar cache while it
+        is fresh (see columnar.load_cached), so only a changed CSV is parsed.
         """
+        return load_cached(filepath, lambda: self._read_drone_csv(filepath),
+                           Config.COLUMNAR_CACHE_DIR or None, Config.COLUMNAR_CACHE)
+    
+    def _read_drone_csv(self, filepath):
+        """Parse and normalize the drone CSV."""
         try:
             df = pd.read_csv(filepath, encoding='utf-8-sig')
         except FileNotFoundError:
@@ -106,6 +159,9 @@ class DroneSelectionSystem:
         # Normalize categorical columns
         df = self._normalize_categorical_columns(df)
         
+        # Parse range and rating strings into typed columns once
+        df = self._add_parsed_columns(df)
+        
         return df
     
     def _handle_missing_values(self, df, numeric_cols):
@@ -165,31 +221,60 @@ class DroneSelectionSystem:
         
         return df
     
-    def extract_port_environmental_constraints(self, port_data_df, port_name):
+    def _add_parsed_columns(self, df):
+        """
+        Add numeric columns derived from string attributes so that filters can
+        compare arrays instead of re-parsing strings on every request.
+        """
+        df = df.copy()
+        
+        if 'Temperature Resistance' in df.columns:
+            df['temp_min_c'], df['temp_max_c'] = parse_range_column(
+                df['Temperature Resistance'], DRONE_TEMPERATURE_PATTERN)
+        
+        if 'Humidity Resistance' in df.columns:
+            df['humidity_min_pct'], df['humidity_max_pct'] = parse_range_column(
+                df['Humidity Resistance'], HUMIDITY_PATTERN)
+        
+        if 'IP Rating' in df.columns:
+            df['ip_level'] = df['IP Rating'].map(IP_HIERARCHY).fillna(0).astype(int)
+        
+        return df
+    
+    def load_port_data(self, filepath):
+        """
+        Load port data from CSV and parse the temperature range into numeric columns.
+        """
+        return load_cached(filepath, lambda: self._add_port_parsed_columns(pd.read_csv(filepath)),
+                           Config.COLUMNAR_CACHE_DIR or None, Config.COLUMNAR_CACHE)
+    
+    def _add_port_parsed_columns(self, df):
+        """Add temp_min_c/temp_max_c parsed from strings like "2-18" or "-1-16"."""
+        df = df.copy()
+        if 'temperature_range_c' in df.columns:
+            df['temp_min_c'], df['temp_max_c'] = parse_range_column(
+                df['temperature_range_c'], PORT_TEMPERATURE_PATTERN)
+        return df
+    
+    def extract_port_environmental_constraints(self, port_data_df, port_name, port_lookup=None):
         """
         Extract comprehensive environmental constraints for a given port.
         """
         if port_data_df is None or port_data_df.empty:
             return self._get_default_port_constraints()
         
-        port_row = port_data_df[port_data_df['port_name'].str.contains(port_name, case=False, na=False)]
+        port_index = self.find_port_index(port_data_df, port_name, port_lookup)
         
-        if port_row.empty:
+        if port_index is None:
             return self._get_default_port_constraints()
         
-        port_row = port_row.iloc[0]
+        port_row = port_data_df.iloc[port_index]
         
-        # Parse temperature range string like "2-18" into min and max
-        temp_range_str = port_row.get('temperature_range_c', None)
-        temp_min = -10
-        temp_max = 45
-        if isinstance(temp_range_str, str) and '-' in temp_range_str:
-            try:
-                parts = temp_range_str.split('-')
-                temp_min = float(parts[0])
-                temp_max = float(parts[1])
-            except:
-                pass
+        # Temperature range is parsed once at load time into temp_min_c/temp_max_c
+        if 'temp_min_c' not in port_row.index:
+            port_row = self._add_port_parsed_columns(port_row.to_frame().T).iloc[0]
+        temp_min = self._safe_get_value(port_row, 'temp_min_c', -10)
+        temp_max = self._safe_get_value(port_row, 'temp_max_c', 45)
         
         constraints = {
             'humidity_percent': self._safe_get_value(port_row, 'humidity_percent', 80),
@@ -204,6 +289,43 @@ class DroneSelectionSystem:
         
         return constraints
     
+    def find_port_index(self, port_data_df, port_name, port_lookup=None):
+        """
+        Positional index of the port named port_name, or None.
+
+        Names are compared after accent, case and punctuation folding (see
+        ports.normalize_port_name), and a prefix naming a single port is
+        accepted (see PortIndex.resolve). Pass the PortIndex built for
+        port_data_df to make this a hash lookup; without one it is built here.
+        """
+        if port_data_df is None or port_data_df.empty or not port_name:
+            return None
+        if port_lookup is None:
+            port_lookup = PortIndex(port_data_df)
+        return port_lookup.resolve(port_name)
+    
+    def port_constraint_arrays(self, port_data_df):
+        """
+        Environmental constraints for every port as aligned arrays, with the same
+        defaults extract_port_environmental_constraints applies to missing values.
+        """
+        defaults = self._get_default_port_constraints()
+        if 'temp_min_c' not in port_data_df.columns:
+            port_data_df = self._add_port_parsed_columns(port_data_df)
+        
+        def column(name, default):
+            if name not in port_data_df.columns:
+                return np.full(len(port_data_df), float(default))
+            return pd.to_numeric(port_data_df[name], errors='coerce').fillna(default).to_numpy(dtype=float)
+        
+        return {
+            'maximum_wind_speed_m_s': column('maximum_wind_speed_m_s', defaults['maximum_wind_speed_m_s']),
+            'temperature_range_min': column('temp_min_c', defaults['temperature_range_min']),
+            'temperature_range_max': column('temp_max_c', defaults['temperature_range_max']),
+            'coverage_area_sq_km': column('coverage_area_sq_km', defaults['coverage_area_sq_km']),
+            'environmental_durability': np.full(len(port_data_df), defaults['environmental_durability'], dtype=object),
+        }
+    
     def _safe_get_value(self, row, column, default):
         """Safely extract value from dataframe row with fallback."""
         try:
@@ -226,19 +348,32 @@ class DroneSelectionSystem:
             'integration_capability': 'Moderate'
         }
     
-    def filter_drones_by_port_constraints(self, df, port_constraints):
+    def filter_drones_by_port_constraints(self, df, port_constraints, operability_threshold=None, weather=None):
         """
         Filter drones based on port environmental constraints.
+
+        With an operability_threshold and the port's hourly weather series
+        (see WeatherStore.series), drones must be flyable in at least that
+        fraction of the recorded hours instead of withstanding the worst-case
+        wind and the full temperature range.
         """
         filtered_df = df.copy()
+        operability = False
+        if operability_threshold is not None and weather is not None:
+            fractions = operability_fraction(filtered_df, weather)
+            # No recorded hour: the worst-case cutoffs apply as without weather
+            operability = not np.isnan(fractions).all()
+            if operability:
+                filtered_df = filtered_df[fractions >= operability_threshold]
         
         # Wind resistance filtering
-        if 'maximum_wind_speed_m_s' in port_constraints:
+        if not operability and 'maximum_wind_speed_m_s' in port_constraints:
             max_wind = port_constraints['maximum_wind_speed_m_s']
             filtered_df = filtered_df[filtered_df['Wind Resistance (m/s)'] >= max_wind * 0.8]  # 80% safety margin
         
         # Temperature resistance filtering
-        if 'temperature_range_min' in port_constraints and 'temperature_range_max' in port_constraints:
+        if (not operability and 'temperature_range_min' in port_constraints
+                and 'temperature_range_max' in port_constraints):
             filtered_df = self._filter_by_temperature_range(
                 filtered_df, 
                 port_constraints['temperature_range_min'], 
@@ -258,58 +393,43 @@ class DroneSelectionSystem:
     
     def _filter_by_temperature_range(self, df, min_temp, max_temp):
         """Filter drones by temperature resistance capability."""
-        def temperature_compatible(temp_range_str):
-            if pd.isna(temp_range_str) or temp_range_str == 'Not specified':
-                return False
-            
-            try:
-                # Extract temperature ranges like "-20°C to 50°C"
-                parts = temp_range_str.replace('°C', '').split(' to ')
-                if len(parts) == 2:
-                    drone_min = float(parts[0])
-                    drone_max = float(parts[1])
-                    return drone_min <= min_temp and drone_max >= max_temp
-            except:
-                pass
-            return False
-        
-        if 'Temperature Resistance' in df.columns:
-            mask = df['Temperature Resistance'].apply(temperature_compatible)
-            return df[mask]
+        if 'temp_min_c' in df.columns and 'temp_max_c' in df.columns:
+            drone_min = df['temp_min_c'].to_numpy(dtype=float)
+            drone_max = df['temp_max_c'].to_numpy(dtype=float)
+        elif 'Temperature Resistance' in df.columns:
+            # Frames not produced by the loader: parse the strings vectorized
+            drone_min, drone_max = parse_range_column(df['Temperature Resistance'], DRONE_TEMPERATURE_PATTERN)
+            drone_min, drone_max = drone_min.to_numpy(), drone_max.to_numpy()
+        else:
+            return df
         
-        return df
+        # NaN bounds ("Not specified" or unparseable) compare False and are excluded
+        mask = (drone_min <= min_temp) & (drone_max >= max_temp)
+        return df[mask]
     
     def _filter_by_ip_rating(self, df, required_ip):
         """Filter drones by IP rating requirement."""
-        if 'IP Rating' not in df.columns:
+        if 'ip_level' in df.columns:
+            levels = df['ip_level'].to_numpy()
+        elif 'IP Rating' in df.columns:
+            levels = df['IP Rating'].map(IP_HIERARCHY).fillna(0).to_numpy()
+        else:
             return df
         
-        # Simple IP rating comparison (could be enhanced with proper IP rating logic)
-        ip_hierarchy = {
-            'Not rated': 0, 'IP20': 20, 'IP43': 43, 'IP44': 44, 
-            'IP45': 45, 'IP53': 53, 'IP54': 54, 'IP65': 65, 'IP67': 67
-        }
-        
-        required_level = ip_hierarchy.get(required_ip, 0)
-        
-        def ip_sufficient(ip_rating):
-            return ip_hierarchy.get(ip_rating, 0) >= required_level
-        
-        mask = df['IP Rating'].apply(ip_sufficient)
-        return df[mask]
+        required_level = IP_HIERARCHY.get(required_ip, 0)
+        return df[levels >= required_level]
     
-    def purpose_based_drone_filtering(self, df, selected_purposes):
+    def aggregate_purpose_requirements(self, selected_purposes, purpose_mapping=None):
         """
-        Filter drones based on selected purposes with enhanced attribute matching.
+        Combine the requirements of several purposes, keeping the strictest
+        numeric threshold for attributes that appear more than once.
         """
-        if not selected_purposes:
-            return df
-        
-        # Aggregate requirements from all selected purposes
+        if purpose_mapping is None:
+            purpose_mapping = self.purpose_mapping
         aggregated_requirements = {}
         
         for purpose in selected_purposes:
-            requirements = self.purpose_mapping.get(purpose, {})
+            requirements = purpose_mapping.get(purpose, {})
             for attr, value in requirements.items():
                 if attr not in aggregated_requirements:
                     aggregated_requirements[attr] = value
@@ -318,6 +438,35 @@ class DroneSelectionSystem:
                     if isinstance(value, (int, float)) and isinstance(aggregated_requirements[attr], (int, float)):
                         aggregated_requirements[attr] = max(aggregated_requirements[attr], value)
         
+        return aggregated_requirements
+    
+    def purpose_requirement_mask(self, df, requirements):
+        """
+        Boolean mask of the rows meeting a requirements dict, with the same
+        matching rules as purpose_based_drone_filtering.
+        """
+        mask = np.ones(len(df), dtype=bool)
+        for attr, required_value in requirements.items():
+            if attr not in df.columns:
+                continue
+            if isinstance(required_value, str):
+                if required_value in ['Yes', 'No']:
+                    mask &= (df[attr] == required_value).to_numpy(dtype=bool)
+                elif 'capable' in required_value.lower():
+                    mask &= df[attr].str.contains('capable', case=False, na=False).to_numpy(dtype=bool)
+            else:
+                mask &= (df[attr] >= required_value).to_numpy(dtype=bool)
+        return mask
+    
+    def purpose_based_drone_filtering(self, df, selected_purposes):
+        """
+        Filter drones based on selected purposes with enhanced attribute matching.
+        """
+        if not selected_purposes:
+            return df
+        
+        aggregated_requirements = self.aggregate_purpose_requirements(selected_purposes)
+        
         # Apply filters
         filtered_df = df.copy()
         
@@ -337,45 +486,18 @@ class DroneSelectionSystem:
     
     def ahp_priority_scaling(self, slider_values):
         """
-        Enhanced AHP priority scaling with consistency checking.
+        AHP priority weights (geometric-mean method) for one set of slider values.
+
+        Slider values are compared as ratios; non-positive values fall back to
+        simple normalization. See ahp.batch_ahp for eigenvector weights,
+        consistency ratios and many slider settings at once.
         """
         if not slider_values:
             return {}
         
         criteria = list(slider_values.keys())
-        size = len(criteria)
-        
-        if size == 1:
-            return {criteria[0]: 1.0}
-        
-        # Create pairwise comparison matrix
-        matrix = np.ones((size, size))
-        
-        for i in range(size):
-            for j in range(i+1, size):
-                val_i = slider_values[criteria[i]]
-                val_j = slider_values[criteria[j]]
-                
-                if val_i == val_j:
-                    ratio = 1.0
-                else:
-                    ratio = val_i / val_j
-                
-                matrix[i, j] = ratio
-                matrix[j, i] = 1.0 / ratio
-        
-        # Calculate priority weights using geometric mean method
-        try:
-            geometric_means = np.power(np.prod(matrix, axis=1), 1.0/size)
-            priority_weights = geometric_means / np.sum(geometric_means)
-            
-            # Map back to criteria
-            return {criteria[i]: priority_weights[i] for i in range(size)}
-        
-        except:
-            # Fallback to simple normalization
-            total_weight = sum(slider_values.values())
-            return {k: v/total_weight for k, v in slider_values.items()}
+        result = slider_priorities(tuple(float(slider_values[c]) for c in criteria))
+        return {criteria[i]: result.geometric[0, i] for i in range(len(criteria))}
     
     def cost_and_maintenance_filtering(self, df, budget, max_maintenance_cost):
         """
@@ -389,145 +511,562 @@ class DroneSelectionSystem:
         
         filtered_df = df.copy()
         
-        # Debug print maintenance costs before filtering
-        print("Maintenance costs before filtering:", filtered_df['Maintenance Cost (EUR)'].tolist())
+        with span('cost', rows_in=len(filtered_df)) as stage:
+            if budget is not None:
+                filtered_df = filtered_df[filtered_df['Price (EUR)'] <= budget]
+            
+            if max_maintenance_cost is not None:
+                filtered_df = filtered_df[filtered_df['Maintenance Cost (EUR)'] <= max_maintenance_cost]
+            stage.rows_out = len(filtered_df)
         
-        # Commenting out budget and maintenance cost filtering to test other filters
-        if budget is not None:
-            filtered_df = filtered_df[filtered_df['Price (EUR)'] <= budget]
+        # Calculate cost-effectiveness score
+        return self._add_cost_effectiveness(filtered_df)
+    
+    def _add_cost_effectiveness(self, df):
+        """Add the Cost Effectiveness column used as a ranking bonus."""
+        if df.empty:
+            return df
+        df = df.copy()
+        # In float64: cached catalogs may hold these columns as int16/float32
+        numeric = lambda column: df[column].astype(float)
+        df['Cost Effectiveness'] = (
+            numeric('Battery Life (minutes)') * numeric('Flight Radius (km)') * 
+            numeric('Camera Resolution (MP)')
+        ) / (numeric('Price (EUR)') + numeric('Maintenance Cost (EUR)'))
+        return df
+    
+    def fleet_sizing(self, df, port_constraints, coverage_hours=COVERAGE_HOURS, years=FLEET_YEARS):
+        """
+        Add the units each drone needs for continuous coverage of the port
+        area, and the fleet's capex, maintenance over `years` and total cost
+        (see fleet.fleet_costs). Returns df unchanged without a coverage area.
+        """
+        area = port_constraints.get('coverage_area_sq_km')
+        if area is None or df.empty:
+            return df
+        return df.assign(**fleet_costs(df, area, coverage_hours, years))
+    
+    def build_query_plan(self, df, port_constraints, selected_purposes, budget, max_maintenance_cost,
+                         port_mask=None, purpose_mask=None, operability=None):
+        """
+        Compile port, purpose and cost constraints into a single fused-mask plan.
+
+        Each constraint mirrors the corresponding stage method
+        (filter_drones_by_port_constraints, purpose_based_drone_filtering,
+        cost_and_maintenance_filtering) but is evaluated as a boolean mask over
+        the catalog columns instead of producing an intermediate DataFrame.
+        A precomputed port_mask (a row of the catalog's compatibility matrix)
+        replaces the individual port predicates, and a purpose_mask (from the
+        catalog's purpose index) replaces the per-attribute purpose predicates.
+        An operability pair (per-drone flyable-hour fractions, threshold)
+        replaces the wind and temperature predicates and cannot be combined
+        with a port_mask, which encodes them.
+        """
+        columns = set(df.columns)
+        predicates = []
         
-        if max_maintenance_cost is not None:
-            filtered_df = filtered_df[filtered_df['Maintenance Cost (EUR)'] <= max_maintenance_cost]
+        # Port environmental constraints
+        if port_mask is not None:
+            predicates.append(Predicate(
+                'Compatible with port (precomputed)', 'port', [], lambda mask: mask,
+                key='port:compatibility', arrays=[port_mask]))
+            port_constraints = {}
+        if operability is not None:
+            fractions, threshold = operability
+            predicates.append(Predicate(
+                f'Flyable in >= {threshold:.0%} of recorded hours', 'port', [],
+                lambda fraction, t=threshold: fraction >= t, key='port:operability', arrays=[fractions],
+                gap=lambda fraction, t=threshold: t - fraction))
+            port_constraints = {k: v for k, v in port_constraints.items()
+                                if k not in ('maximum_wind_speed_m_s', 'temperature_range_min', 'temperature_range_max')}
+        if 'maximum_wind_speed_m_s' in port_constraints:
+            min_wind = port_constraints['maximum_wind_speed_m_s'] * 0.8  # 80% safety margin
+            predicates.append(Predicate(
+                f'Wind Resistance (m/s) >= {min_wind:g}', 'port', ['Wind Resistance (m/s)'],
+                lambda wind, t=min_wind: wind >= t, key='port:wind', gap=lambda wind, t=min_wind: t - wind))
         
-        # Debug print maintenance costs after filtering
-        print("Maintenance costs after filtering:", filtered_df['Maintenance Cost (EUR)'].tolist())
+        if ('temperature_range_min' in port_constraints and 'temperature_range_max' in port_constraints
+                and 'temp_min_c' in columns):
+            t_min = port_constraints['temperature_range_min']
+            t_max = port_constraints['temperature_range_max']
+            predicates.append(Predicate(
+                f'Temperature Resistance covers {t_min:g}..{t_max:g} °C', 'port', ['temp_min_c', 'temp_max_c'],
+                lambda lo, hi, a=t_min, b=t_max: (lo <= a) & (hi >= b), key='port:temperature', cost=2.0,
+                gap=lambda lo, hi, a=t_min, b=t_max: np.maximum(lo - a, b - hi)))
         
-        # Calculate cost-effectiveness score
-        if not filtered_df.empty:
-            filtered_df = filtered_df.copy()
-            filtered_df['Cost Effectiveness'] = (
-                filtered_df['Battery Life (minutes)'] * filtered_df['Flight Radius (km)'] * 
-                filtered_df['Camera Resolution (MP)']
-            ) / (filtered_df['Price (EUR)'] + filtered_df['Maintenance Cost (EUR)'])
+        if 'coverage_area_sq_km' in port_constraints:
+            min_radius = np.sqrt(port_constraints['coverage_area_sq_km'] / np.pi) * 0.7
+            predicates.append(Predicate(
+                f'Flight Radius (km) >= {min_radius:.2f}', 'port', ['Flight Radius (km)'],
+                lambda radius, t=min_radius: radius >= t, key='port:radius',
+                gap=lambda radius, t=min_radius: t - radius))
         
-        return filtered_df
+        if 'environmental_durability' in port_constraints and 'ip_level' in columns:
+            required_ip = port_constraints['environmental_durability']
+            required_level = IP_HIERARCHY.get(required_ip, 0)
+            predicates.append(Predicate(
+                f'IP Rating >= {required_ip}', 'port', ['ip_level'],
+                lambda level, t=required_level: level >= t, key='port:ip',
+                gap=lambda level, t=required_level: t - level))
+        
+        # Purpose requirements
+        if purpose_mask is not None:
+            predicates.append(Predicate(
+                'Meets selected purposes (indexed)', 'purpose', [], lambda mask: mask,
+                key='purpose:index', arrays=[purpose_mask]))
+        elif selected_purposes:
+            for attr, required_value in self.aggregate_purpose_requirements(selected_purposes).items():
+                if attr not in columns:
+                    continue
+                if isinstance(required_value, str):
+                    if required_value in ['Yes', 'No']:
+                        predicates.append(Predicate(
+                            f'{attr} == {required_value}', 'purpose', [attr],
+                            lambda values, v=required_value: values == v, key=f'purpose:{attr}', cost=3.0))
+                    elif 'capable' in required_value.lower():
+                        predicates.append(Predicate(
+                            f'{attr} contains "capable"', 'purpose', [attr],
+                            lambda values: pd.Series(values).str.contains('capable', case=False, na=False).to_numpy(),
+                            key=f'purpose:{attr}', cost=20.0))
+                else:
+                    predicates.append(Predicate(
+                        f'{attr} >= {required_value:g}', 'purpose', [attr],
+                        lambda values, t=required_value: values >= t, key=f'purpose:{attr}',
+                        gap=lambda values, t=required_value: t - values))
+        
+        # Cost constraints
+        if budget is not None:
+            predicates.append(Predicate(
+                f'Price (EUR) <= {budget:g}', 'cost', ['Price (EUR)'],
+                lambda price, t=budget: price <= t, key='cost:budget', gap=lambda price, t=budget: price - t))
+        if max_maintenance_cost is not None:
+            predicates.append(Predicate(
+                f'Maintenance Cost (EUR) <= {max_maintenance_cost:g}', 'cost', ['Maintenance Cost (EUR)'],
+                lambda cost, t=max_maintenance_cost: cost <= t, key='cost:maintenance',
+                gap=lambda cost, t=max_maintenance_cost: cost - t))
+        
+        return self.query_planner.plan(predicates)
     
-    def weighted_sum_model_ranking(self, df, priority_weights):
+    def wsm_criteria_matrix(self, df, criteria):
+        """
+        Min-max normalized criteria as an (n_drones, n_criteria) matrix, oriented
+        so that 1 is best (cost criteria such as price are inverted).
+
+        Columns that are missing, constant or all-NaN contribute nothing and are
+        zero, as are individual NaN values; `valid` flags the usable columns.
+        """
+        decision = DecisionMatrix(df, criteria)
+        return decision.normalized, decision.valid
+    
+    def _cost_effectiveness_bonus(self, df):
+        """Normalized Cost Effectiveness scaled to its share of the WSM score, or None."""
+        values = DecisionMatrix._cost_effectiveness(df)
+        return None if values is None else values * COST_EFFECTIVENESS_WEIGHT
+    
+    def weighted_sum_model_ranking(self, df, priority_weights, top_k=None, offset=0):
         """
         Enhanced WSM ranking with normalized scoring.
+
+        With top_k, only the rows at ranks offset..offset+top_k are selected
+        (by partial selection rather than a full sort) and returned.
         """
         if df.empty or not priority_weights:
-            return df
+            return df if top_k is None else df.iloc[offset:offset + top_k]
         
         # Normalize attributes for fair comparison
-        df_normalized = df.copy()
-        score_columns = []
-        
-        for attr, weight in priority_weights.items():
-            if attr in df.columns and weight > 0:
-                col_values = df[attr]
-                
-                # Skip if all values are the same or invalid
-                if col_values.nunique() <= 1 or col_values.isna().all():
-                    continue
-                
-                # Normalize to 0-1 range
-                col_min = col_values.min()
-                col_max = col_values.max()
-                
-                if col_max != col_min:
-                    normalized_col = (col_values - col_min) / (col_max - col_min)
-                    df_normalized[f'{attr}_normalized'] = normalized_col * weight
-                    score_columns.append(f'{attr}_normalized')
-        
-        # Calculate weighted sum score
-        if score_columns:
-            df_normalized['WSM Score'] = df_normalized[score_columns].sum(axis=1)
-            
-            # Add cost-effectiveness bonus if available
-            if 'Cost Effectiveness' in df_normalized.columns:
-                cost_eff_normalized = (df_normalized['Cost Effectiveness'] - df_normalized['Cost Effectiveness'].min()) / \
-                                    (df_normalized['Cost Effectiveness'].max() - df_normalized['Cost Effectiveness'].min())
-                df_normalized['WSM Score'] += cost_eff_normalized * 0.1  # 10% weight for cost-effectiveness
-        else:
-            df_normalized['WSM Score'] = 1.0  # Default score if no valid attributes
+        criteria = [attr for attr, weight in priority_weights.items() if weight > 0]
+        weights = np.array([priority_weights[attr] for attr in criteria], dtype=float)
+        matrix, valid = self.wsm_criteria_matrix(df, criteria)
+        bonus = self._cost_effectiveness_bonus(df)
+        return self.rank_precomputed(df, criteria, matrix, valid, bonus, weights, top_k, offset)
+    
+    def rank_precomputed(self, df, criteria, matrix, valid, bonus, weights, top_k=None, offset=0):
+        """
+        WSM ranking from an already normalized criteria matrix (see
+        wsm_criteria_matrix), so re-weighting a fixed candidate set only costs
+        one matrix-vector product. Criteria with zero weight are ignored.
+        """
+        scores = weighted_scores(matrix, valid, weights, bonus)
         
-        # Sort by WSM Score
-        ranked_df = df_normalized.sort_values(by='WSM Score', ascending=False)
+        # Rank by WSM Score, materializing only the requested rows
+        order = rank_order(scores, None if top_k is None else offset + top_k)[offset:]
+        return self.wsm_rows(df, criteria, matrix, valid, weights, scores, order)
+    
+    def wsm_rows(self, df, criteria, matrix, valid, weights, scores, rows):
+        """The given rows of df with their weighted normalized criteria and WSM Score."""
+        ranked_df = df.iloc[rows].copy()
+        for j in np.flatnonzero(valid & (weights > 0)):
+            ranked_df[f'{criteria[j]}_normalized'] = matrix[rows, j] * weights[j]
+        ranked_df['WSM Score'] = scores[rows]
         
         return ranked_df
     
+    def rank_candidates(self, df, priority_weights, method='wsm', top_k=None, offset=0):
+        """
+        Rank candidates with one of the ranking engines ('wsm', 'topsis',
+        'vikor', 'skyline'). Returns the ranked page and the number of ranked
+        candidates, which the skyline engine reduces to the non-dominated set.
+        """
+        engine = get_engine(method)
+        if engine.name == 'wsm' or df.empty or not priority_weights:
+            return self.weighted_sum_model_ranking(df, priority_weights, top_k, offset), len(df)
+        
+        criteria = [attr for attr, weight in priority_weights.items() if weight > 0]
+        decision = DecisionMatrix(df, criteria)
+        order, scores, ranked = engine.rank(decision, [priority_weights[attr] for attr in criteria], top_k, offset)
+        ranked_df = df.iloc[order].copy()
+        ranked_df[engine.score_column] = scores[order]
+        return ranked_df, ranked
+    
     def select_drones(self, drone_data_path=None, port_data_path=None, port_name=None, 
-                     selected_purposes=None, slider_values=None, budget=None, max_maintenance_cost=None):
+                     selected_purposes=None, slider_values=None, budget=None, max_maintenance_cost=None,
+                     catalog=None, top_k=None, offset=0, method='wsm'):
         """
         Complete drone selection pipeline with all enhancements.
+
+        When a preloaded catalog snapshot is given, its normalized drone and
+        port frames are used instead of reading the CSV files again. top_k and
+        offset return a single page of the ranking.
         """
-        try:
-            # Load and normalize drone data
-            if drone_data_path is None:
-                drone_data_path = r"D:/PROJECTS/project_DSS/backend/data/droneType002.csv"
-            df = self.load_and_normalize_drone_data(drone_data_path)
+        selection = self.run_selection(
+            drone_data_path, port_data_path, port_name, selected_purposes,
+            slider_values, budget, max_maintenance_cost, catalog=catalog, top_k=top_k, offset=offset,
+            method=method
+        )
+        return selection['results'], selection['summary']
+    
+    def run_selection(self, drone_data_path=None, port_data_path=None, port_name=None,
+                      selected_purposes=None, slider_values=None, budget=None, max_maintenance_cost=None,
+                      catalog=None, top_k=None, offset=0, method='wsm', diagnostics=False,
+                      operability_threshold=None, fleet=False):
+        """
+        Run the selection pipeline and return a dict with the ranked 'results'
+        (only the requested page when top_k is given), the 'total' number of
+        suitable (for the skyline method: non-dominated) drones, the 'summary'
+        message, the executed query 'plan' (see QueryPlan.explain) and the
+        resolved 'port_constraints'. `method` picks the ranking engine.
 
-            if df.empty:
-                return pd.DataFrame(), "No drone data available"
+        'diagnostics' is an EliminationDiagnostics when the result is empty or
+        when diagnostics=True; in that mode every individual constraint is
+        evaluated once over the catalog and the candidates are taken from
+        the same masks, instead of running the fused plan.
 
-            original_count = len(df)
+        With an operability_threshold and a catalog holding hourly weather for
+        the port, the wind and temperature cutoffs are replaced by a minimum
+        fraction of flyable hours, added to the results as 'Operability'.
+        'operability' then describes the weather used ({'threshold', 'hours'});
+        it stays None when the port has no weather, or no hour with both wind
+        and temperature recorded, and the cutoffs apply.
 
-            # Load port data
-            port_data_df = None
-            if port_data_path is None:
-                port_data_path = r"D:/PROJECTS/project_DSS/backend/data/merged_ports_data.csv"
-            try:
-                port_data_df = pd.read_csv(port_data_path)
-            except FileNotFoundError:
+        With fleet=True the candidates are sized for continuous coverage of
+        the port (see fleet_sizing) and ranked by fleet cost instead of unit
+        price: the price slider weighs 'Fleet Cost (EUR)', and without
+        sliders the cheapest fleet comes first. 'fleet' then holds the
+        sizing assumptions.
+        """
+        selection = {'results': pd.DataFrame(), 'total': 0, 'summary': '', 'plan': None, 'port_constraints': {},
+                     'diagnostics': None, 'operability': None, 'fleet': None}
+        try:
+            with span('load') as stage:
+                # Load and normalize drone data
+                if catalog is not None:
+                    df = catalog.drones
+                else:
+                    if drone_data_path is None:
+                        drone_data_path = DEFAULT_DRONE_DATA_PATH
+                    df = self.load_and_normalize_drone_data(drone_data_path)
+                
+                if df.empty:
+                    selection['summary'] = "No drone data available"
+                    return selection
+                if 'ip_level' not in df.columns:
+                    df = self._add_parsed_columns(df)
+                
+                original_count = stage.rows_out = len(df)
+                
+                # Load port data
                 port_data_df = None
+                if catalog is not None:
+                    port_data_df = catalog.ports
+                else:
+                    if port_data_path is None:
+                        port_data_path = DEFAULT_PORT_DATA_PATH
+                    try:
+                        port_data_df = self.load_port_data(port_data_path)
+                    except FileNotFoundError:
+                        port_data_df = None
             
             # Extract port environmental constraints
             port_constraints = {}
-            if port_data_df is not None and port_name:
-                port_constraints = self.extract_port_environmental_constraints(port_data_df, port_name)
-                
-            # Filter by port constraints
-            df = self.filter_drones_by_port_constraints(df, port_constraints)
-            print(f"After port constraints filtering: {len(df)} drones")
-            if df.empty:
-                return pd.DataFrame(), "No drones meet the port environmental requirements"
+            port_mask = None
+            operability = None
+            port_index = None
+            with span('port_constraints'):
+                if port_data_df is not None and port_name:
+                    port_lookup = getattr(catalog, 'port_index', None) or PortIndex(port_data_df)
+                    port_constraints = self.extract_port_environmental_constraints(
+                        port_data_df, port_name, port_lookup)
+                    compatibility = getattr(catalog, 'compatibility', None)
+                    port_index = self.find_port_index(port_data_df, port_name, port_lookup)
+                    weather = getattr(catalog, 'weather', None)
+                    series = None
+                    if operability_threshold is not None and weather is not None and port_index is not None:
+                        port_row = port_data_df.iloc[port_index]
+                        series = weather.series(port_row.get('country_code', ''), port_row['port_name'])
+                    if series is not None:
+                        with span('operability', rows_in=len(df)):
+                            fractions = operability_fraction(df, series)
+                        # A port without any recorded hour keeps the worst-case cutoffs
+                        if not np.isnan(fractions).all():
+                            operability = (fractions, operability_threshold)
+                            selection['operability'] = {'threshold': operability_threshold,
+                                                        'hours': int(len(series['wind_speed_m_s']))}
+                    if operability is None and compatibility is not None and port_index is not None:
+                        # Port filtering is a row lookup in the precomputed matrix
+                        port_mask = compatibility.port_mask(port_index)
+            selection['port_constraints'] = port_constraints
+            port_note = ''
+            if port_name and port_index is None:
+                port_note = f" (port '{port_name}' not found; default port constraints applied)"
             
-            # Filter by purposes
-            if selected_purposes:
-                df = self.purpose_based_drone_filtering(df, selected_purposes)
-                print(f"After purpose-based filtering: {len(df)} drones")
-                if df.empty:
-                    return pd.DataFrame(), "No drones meet the selected purpose requirements"
+            # Purpose filtering is a bitmask lookup when the catalog is indexed
+            purpose_mask = None
+            purpose_index = getattr(catalog, 'purposes', None)
+            if purpose_index is not None and selected_purposes:
+                purpose_mask = purpose_index.mask(selected_purposes, self.purpose_mapping)
             
-            # Filter by cost constraints
-            df = self.cost_and_maintenance_filtering(df, budget, max_maintenance_cost)
-            print(f"After cost and maintenance filtering: {len(df)} drones")
-            if df.empty:
-                # Check if budget filtering is the cause
-                if budget is not None:
-                    # Check if any drones meet all other filters except budget
-                    df_no_budget = self.cost_and_maintenance_filtering(df, None, max_maintenance_cost)
-                    if df_no_budget.empty:
-                        return pd.DataFrame(), "No drones meet the other constraints"
-                    else:
-                        return pd.DataFrame(), "No drones meet the budget constraints"
-                else:
-                    return pd.DataFrame(), "No drones meet the constraints"
+            report = None
+            if diagnostics:
+                plan, report = self.diagnose(df, port_constraints, selected_purposes, budget, max_maintenance_cost,
+                                             operability)
+                candidates = df.iloc[np.flatnonzero(report.passing)]
+            else:
+                # Port, purpose and cost constraints as one fused-mask plan
+                plan = self.build_query_plan(df, port_constraints, selected_purposes, budget, max_maintenance_cost,
+                                             port_mask=port_mask, purpose_mask=purpose_mask, operability=operability)
+                candidates = plan.execute(df)
+            selection['plan'] = plan
+            self._record_plan_stages(plan)
+            if candidates.empty:
+                if report is None:
+                    _, report = self.diagnose(df, port_constraints, selected_purposes, budget, max_maintenance_cost,
+                                              operability)
+                selection['diagnostics'] = report
+                selection['summary'] = self._empty_result_message(report, selected_purposes, budget) + port_note
+                # No rows, but the catalog's columns
+                selection['results'] = candidates
+                return selection
+            selection['diagnostics'] = report
+            
+            if operability is not None:
+                candidates = candidates.assign(
+                    Operability=pd.Series(operability[0], index=df.index).loc[candidates.index].round(4))
+            
+            if budget is not None or max_maintenance_cost is not None:
+                candidates = self._add_cost_effectiveness(candidates)
+            
+            filtered_count = len(candidates)
+            
+            sized = fleet and 'coverage_area_sq_km' in port_constraints
+            if sized:
+                with span('fleet', rows_in=filtered_count):
+                    candidates = self.fleet_sizing(candidates, port_constraints)
+                selection['fleet'] = {'coverage_area_sq_km': port_constraints['coverage_area_sq_km'],
+                                      'coverage_hours': COVERAGE_HOURS, 'years': FLEET_YEARS}
             
             # Calculate priority weights and rank
             if slider_values:
-                priority_weights = self.ahp_priority_scaling(slider_values)
-                df = self.weighted_sum_model_ranking(df, priority_weights)
+                with span('ahp'):
+                    priority_weights = self.ahp_priority_scaling(slider_values)
+                if sized:
+                    priority_weights = {FLEET_COST if c == 'Price (EUR)' else c: w
+                                        for c, w in priority_weights.items()}
+                with span('ranking', rows_in=filtered_count) as stage:
+                    candidates, ranked_count = self.rank_candidates(
+                        candidates, priority_weights, method, top_k, offset)
+                    stage.rows_out = len(candidates)
+            else:
+                ranked_count = filtered_count
+                if sized:
+                    candidates = candidates.iloc[np.argsort(candidates[FLEET_COST].to_numpy(), kind='stable')]
+                if top_k is not None:
+                    candidates = candidates.iloc[offset:offset + top_k]
             
             # Add selection summary
-            filtered_count = len(df)
-            summary = f"Filtered {original_count} drones down to {filtered_count} suitable options"
-            
-            return df, summary
+            selection['results'] = candidates
+            selection['total'] = ranked_count
+            selection['summary'] = (f"Filtered {original_count} drones down to {filtered_count} suitable options"
+                                    + port_note)
+            return selection
             
         except Exception as e:
-            return pd.DataFrame(), f"Error in drone selection: {str(e)}"
+            logger.exception("Error in drone selection")
+            selection['results'] = pd.DataFrame()
+            selection['summary'] = f"Error in drone selection: {str(e)}"
+            return selection
+    
+    def evaluate_port(self, port_name, catalog=None, top_k=10, **options):
+        """
+        One port of a batch: run_selection with the shared options. Returns
+        the 'summary', the 'total', every ranked drone name in rank order
+        ('drones') and the first top_k ranked rows ('results').
+        """
+        selection = self.run_selection(port_name=port_name, catalog=catalog, **options)
+        results = selection['results']
+        return {
+            'summary': selection['summary'],
+            'total': selection['total'],
+            'drones': results['Drone Name'].tolist() if not results.empty else [],
+            'results': results.iloc[:top_k],
+        }
+    
+    def evaluate_ports(self, port_names, catalog=None, top_k=10, executor=None, **options):
+        """
+        Batch mode: evaluate many ports with the same purposes, budget,
+        sliders and ranking options (keyword arguments of run_selection).
+
+        Ports with the same row in the catalog's compatibility matrix get
+        the same candidates, so each distinct row is evaluated once for all
+        of them (with fleet sizing, once per row and coverage area), unless
+        an operability threshold on hourly weather makes every port differ.
+        `executor(port_names, top_k, options)` evaluates the representative
+        ports (see portfolio.PortfolioPool); without one they are evaluated
+        here. Returns the groups as dicts of evaluate_port plus their 'ports'.
+        """
+        compatibility = getattr(catalog, 'compatibility', None)
+        ports_df = getattr(catalog, 'ports', None)
+        port_lookup = getattr(catalog, 'port_index', None)
+        if port_lookup is None and ports_df is not None:
+            port_lookup = PortIndex(ports_df)
+        per_port = options.get('operability_threshold') is not None and getattr(catalog, 'weather', None) is not None
+        groups = {}
+        for name in port_names:
+            position = self.find_port_index(ports_df, name, port_lookup)
+            if compatibility is None or position is None or per_port:
+                key = name
+            elif options.get('fleet'):
+                key = (compatibility.bits[position].tobytes(), ports_df['coverage_area_sq_km'].iat[position])
+            else:
+                key = compatibility.bits[position].tobytes()
+            groups.setdefault(key, []).append(name)
+        members = list(groups.values())
+        
+        with span('portfolio', rows_in=len(port_names)) as stage:
+            representatives = [ports[0] for ports in members]
+            if executor is None:
+                evaluations = [self.evaluate_port(name, catalog, top_k, **options) for name in representatives]
+            else:
+                evaluations = executor(representatives, top_k, options)
+            stage.rows_out = len(members)
+        return [dict(evaluation, ports=ports) for evaluation, ports in zip(evaluations, members)]
+    
+    def select_mixed_fleet(self, port_name=None, selected_purposes=None, slider_values=None, budget=None,
+                           max_maintenance_cost=None, catalog=None, max_models=MAX_MODELS, time_limit=TIME_LIMIT,
+                           operability_threshold=None, fleet=False):
+        """
+        The smallest set of port-compatible drone models that together cover
+        every selected purpose, one unit each, with their total price within
+        the budget and total maintenance cost within max_maintenance_cost,
+        and the highest total WSM score among sets of that size (see
+        MixedFleetOptimizer). Returns a dict with the chosen 'models' (one
+        row each, with the purposes it covers), the 'summary', the
+        'uncoverable' purposes no compatible drone meets alone, and the
+        optimizer's totals and statistics.
+
+        The candidates come from run_selection with the same sliders,
+        operability_threshold and fleet options; without sliders every model
+        scores the same. With fleet sizing each model counts with the units
+        it needs for continuous coverage, so its fleet capex and yearly fleet
+        maintenance are totalled instead of one unit's price and maintenance.
+        """
+        selected = [p for p in dict.fromkeys(selected_purposes or []) if p in self.purpose_mapping]
+        mix = {'models': pd.DataFrame(), 'summary': '', 'uncoverable': [], 'score': None, 'price': None,
+               'maintenance': None, 'optimal': True, 'candidates': 0, 'nodes': 0}
+        selection = self.run_selection(
+            port_name=port_name, slider_values=slider_values, budget=budget,
+            max_maintenance_cost=max_maintenance_cost, catalog=catalog,
+            operability_threshold=operability_threshold, fleet=fleet)
+        candidates = selection['results']
+        if not selected or candidates.empty:
+            mix['summary'] = selection['summary'] if candidates.empty else "No purposes selected"
+            return mix
+        
+        scores = (candidates['WSM Score'].to_numpy(dtype=float) if 'WSM Score' in candidates.columns
+                  else np.zeros(len(candidates)))
+        if selection['fleet'] is not None:
+            units = candidates['Fleet Units'].to_numpy(dtype=float)
+            prices = candidates['Fleet Capex (EUR)'].to_numpy(dtype=float)
+        else:
+            units = 1.0
+            prices = candidates['Price (EUR)'].to_numpy(dtype=float)
+        maintenance = units * candidates['Maintenance Cost (EUR)'].to_numpy(dtype=float)
+        with span('mixed_fleet', rows_in=len(candidates)) as stage:
+            # Bit i: the drone meets selected[i] on its own
+            masks = np.zeros(len(candidates), dtype=np.uint64)
+            for i, purpose in enumerate(selected):
+                masks[self.purpose_requirement_mask(candidates, self.purpose_mapping[purpose])] |= np.uint64(1 << i)
+            covered = int(np.bitwise_or.reduce(masks))
+            mix['uncoverable'] = [p for i, p in enumerate(selected) if not covered >> i & 1]
+            if mix['uncoverable']:
+                mix['summary'] = f"No compatible drone meets {', '.join(mix['uncoverable'])}"
+                return mix
+            
+            result = MixedFleetOptimizer(masks, scores, prices, maintenance, budget, max_maintenance_cost,
+                                         max_models, time_limit).solve((1 << len(selected)) - 1)
+            stage.rows_out = len(result['models'])
+        
+        models = candidates.iloc[result['models']].copy()
+        models['Purposes Covered'] = ['; '.join(p for i, p in enumerate(selected) if int(m) >> i & 1)
+                                      for m in masks[result['models']]]
+        mix.update({k: result[k] for k in ('score', 'price', 'maintenance', 'optimal', 'candidates', 'nodes')})
+        mix['models'] = models
+        if models.empty:
+            mix['summary'] = (f"No fleet of up to {max_models} models covers the selected purposes within the limits"
+                              + ("" if result['optimal'] else " (search stopped at the time limit)"))
+        else:
+            mix['summary'] = (f"{len(models)} drone model{'s cover' if len(models) > 1 else ' covers'} "
+                              f"{len(selected)} purposes for {result['price']:g} EUR"
+                              + ("" if result['optimal'] else " (best found within the time limit)"))
+        return mix
+    
+    def _record_plan_stages(self, plan):
+        """Record the port, purpose and cost filters of an executed plan as pipeline stages."""
+        stages = {}
+        for step in plan.explain():
+            if step['stage'] not in stages:
+                stages[step['stage']] = [0.0, step['rows_in'], step['rows_out']]
+            stage = stages[step['stage']]
+            stage[0] += step['elapsed_ms'] / 1000
+            stage[2] = step['rows_out']
+        for name, (seconds, rows_in, rows_out) in stages.items():
+            record_stage(name, seconds, rows_in, rows_out)
+    
+    def diagnose(self, df, port_constraints, selected_purposes, budget, max_maintenance_cost, operability=None):
+        """
+        Evaluate each port, purpose and cost constraint separately over the
+        whole catalog, once. Returns the (unfused) plan and its
+        EliminationDiagnostics.
+        """
+        plan = self.build_query_plan(df, port_constraints, selected_purposes, budget, max_maintenance_cost,
+                                     operability=operability)
+        with span('diagnostics', rows_in=len(df)) as stage:
+            passes, gaps = plan.evaluate(df)
+            report = EliminationDiagnostics(plan.predicates, passes, gaps, df['Drone Name'].to_numpy())
+            stage.rows_out = int(report.passing.sum())
+        return plan, report
+    
+    def _empty_result_message(self, report, selected_purposes, budget):
+        """Name the first pipeline stage (port, purpose, cost) that leaves no drones."""
+        if not report.survivors(stages=['port']):
+            return "No drones meet the port environmental requirements"
+        if selected_purposes and not report.survivors(stages=['port', 'purpose']):
+            return "No drones meet the selected purpose requirements"
+        if budget is not None:
+            # Check if any drones meet all other filters except budget
+            if report.survivors(exclude_keys=['cost:budget']):
+                return "No drones meet the budget constraints"
+            return "No drones meet the other constraints"
+        return "No drones meet the constraints"
 
 # Convenience functions for backward compatibility
 def load_drone_data(file_path="backend/data/droneType.csv"):
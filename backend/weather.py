@@ -0,0 +1,248 @@
+"""
+Hourly weather per port, compiled from local CSV exports into memory-mapped
+arrays, and the share of hours in which each drone can fly.
+
+A compiled store is a directory with one float32 (ports x hours) .npy file
+per variable (NaN where an hour is missing) and a manifest listing the
+ports and the first hour. Compile one with
+
+    python backend/weather.py hourly_2023.csv hourly_2024.csv --output backend/data/weather
+
+from long-format CSVs with the columns country_code, port_name, timestamp
+and any of wind_speed_m_s, temperature_c and humidity_percent.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from ports import normalize_port_name
+
+WEATHER_FORMAT = 1
+MANIFEST = 'manifest.json'
+# Hourly variables a store may hold
+VARIABLES = ('wind_speed_m_s', 'temperature_c', 'humidity_percent')
+# Source rows read per chunk while compiling
+CHUNK_ROWS = 500000
+# Hours per block and profile x hour cells per comparison when counting flyable hours
+HOUR_BLOCK = 8760
+MAX_CELLS = 1 << 22
+HOUR = pd.Timedelta(hours=1)
+EPOCH = pd.Timestamp(0, tz='UTC')
+
+
+def port_key(country_code, port_name):
+    return f'{str(country_code).strip().upper()}|{normalize_port_name(port_name)}'
+
+
+def _hours(timestamps):
+    """Timestamps floored to whole UTC hours, as integer hours since the epoch."""
+    stamps = pd.to_datetime(timestamps, utc=True, errors='coerce').dt.floor('h')
+    return (stamps - EPOCH) // HOUR
+
+
+def compile_weather(sources, directory, chunk_rows=CHUNK_ROWS):
+    """
+    Compile hourly CSVs into a store in `directory` with two chunked passes:
+    the first collects the ports and the time span, the second writes the
+    values straight into memory-mapped arrays, so no source is held in
+    memory. Later sources win for repeated (port, hour) readings. The
+    manifest is replaced last and atomically. Returns the manifest.
+    """
+    ports = {}
+    first = last = None
+    variables = set()
+    for path in sources:
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, dtype={'country_code': str, 'port_name': str}):
+            variables.update(v for v in VARIABLES if v in chunk.columns)
+            hours = _hours(chunk['timestamp']).dropna()
+            if hours.empty:
+                continue
+            first = int(hours.min()) if first is None else min(first, int(hours.min()))
+            last = int(hours.max()) if last is None else max(last, int(hours.max()))
+            for country, name in chunk[['country_code', 'port_name']].drop_duplicates().itertuples(index=False):
+                ports.setdefault(port_key(country, name), (country, name))
+    if first is None or not variables:
+        raise ValueError('no hourly weather readings in the sources')
+
+    os.makedirs(directory, exist_ok=True)
+    generation = uuid.uuid4().hex[:12]
+    keys = list(ports)
+    positions = {key: i for i, key in enumerate(keys)}
+    shape = (len(keys), last - first + 1)
+    files = {v: f'{generation}-{v}.npy' for v in VARIABLES if v in variables}
+    arrays = {}
+    for variable, name in files.items():
+        arrays[variable] = np.lib.format.open_memmap(
+            os.path.join(directory, name), mode='w+', dtype=np.float32, shape=shape)
+        arrays[variable][:] = np.nan
+
+    for path in sources:
+        for chunk in pd.read_csv(path, chunksize=chunk_rows, dtype={'country_code': str, 'port_name': str}):
+            hours = _hours(chunk['timestamp'])
+            rows = pd.Series([port_key(c, n) for c, n in zip(chunk['country_code'], chunk['port_name'])],
+                             index=chunk.index).map(positions)
+            keep = hours.notna().to_numpy() & rows.notna().to_numpy()
+            rows = rows.to_numpy()[keep].astype(np.int64)
+            columns = hours.to_numpy()[keep].astype(np.int64) - first
+            for variable in arrays:
+                if variable in chunk.columns:
+                    values = pd.to_numeric(chunk[variable], errors='coerce').to_numpy(dtype=np.float32)[keep]
+                    arrays[variable][rows, columns] = values
+
+    digest = hashlib.sha256()
+    for variable, array in arrays.items():
+        array.flush()
+        digest.update(variable.encode())
+        for row in range(0, shape[0], 64):
+            digest.update(array[row:row + 64].tobytes())
+    del arrays
+
+    manifest = {
+        'format': WEATHER_FORMAT,
+        'start': (EPOCH + first * HOUR).isoformat(),
+        'hours': shape[1],
+        'ports': [{'key': key, 'country_code': ports[key][0], 'port_name': ports[key][1]} for key in keys],
+        'files': files,
+        'digest': digest.hexdigest()[:16],
+    }
+    temp = os.path.join(directory, f'{MANIFEST}.{generation}.tmp')
+    with open(temp, 'w') as handle:
+        json.dump(manifest, handle)
+    os.replace(temp, os.path.join(directory, MANIFEST))
+
+    # Files of older generations; open memory maps keep their data until unmapped
+    for name in os.listdir(directory):
+        if name.endswith('.npy') and name not in files.values():
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass
+    return manifest
+
+
+class WeatherStore:
+    """
+    A compiled store opened read-only. Each variable is a memory map, so a
+    port's series is only paged in when it is used and the pages are shared
+    by every process that opens the same files.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, MANIFEST)) as handle:
+            manifest = json.load(handle)
+        if manifest.get('format') != WEATHER_FORMAT:
+            raise ValueError(f'unsupported weather store format in {directory}')
+        self.directory = directory
+        self.start = pd.Timestamp(manifest['start'])
+        self.hours = manifest['hours']
+        self.version = manifest['digest']
+        self.variables = {variable: np.load(os.path.join(directory, name), mmap_mode='r', allow_pickle=False)
+                          for variable, name in manifest['files'].items()}
+        self._positions = {port['key']: i for i, port in enumerate(manifest['ports'])}
+
+    @classmethod
+    def open(cls, directory):
+        """The store in `directory`, or None when there is none (or it cannot be read)."""
+        try:
+            return cls(directory)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __len__(self):
+        return len(self._positions)
+
+    def series(self, country_code, port_name):
+        """The port's hourly series as {variable: 1-D memory map}, or None for an unknown port."""
+        position = self._positions.get(port_key(country_code, port_name))
+        if position is None:
+            return None
+        return {variable: array[position] for variable, array in self.variables.items()}
+
+
+def drone_profiles(drones, wind_margin=1.0):
+    """
+    The distinct (wind, temperature min, temperature max, humidity max)
+    limits of the drones and each drone's profile index. Missing wind or
+    temperature limits never pass; a missing humidity limit is not checked.
+    """
+    def column(name, missing):
+        if name not in drones.columns:
+            return np.full(len(drones), missing)
+        values = pd.to_numeric(drones[name], errors='coerce').to_numpy(dtype=float)
+        return np.where(np.isnan(values), missing, values)
+
+    limits = np.column_stack([
+        column('Wind Resistance (m/s)', -np.inf) * wind_margin,
+        column('temp_min_c', np.inf),
+        column('temp_max_c', -np.inf),
+        column('humidity_max_pct', np.inf),
+    ])
+    profiles, inverse = np.unique(limits, axis=0, return_inverse=True)
+    return profiles, inverse.reshape(-1)
+
+
+def operability_fraction(drones, series, wind_margin=1.0, hour_block=HOUR_BLOCK):
+    """
+    Fraction of the port's recorded hours in which each drone can fly: wind
+    at most its wind resistance (times wind_margin), temperature within its
+    operating range and, where the series has it, humidity within its limit.
+    Hours without a wind or temperature reading are not counted. Drones
+    sharing the same limits are evaluated once, and the series are read in
+    blocks of hours. NaN for every drone when no hour is recorded.
+    """
+    profiles, inverse = drone_profiles(drones, wind_margin)
+    wind_limit, low, high, humidity_limit = (profiles[:, i:i + 1] for i in range(4))
+    wind_series = series.get('wind_speed_m_s')
+    temperature_series = series.get('temperature_c')
+    humidity_series = series.get('humidity_percent')
+    if wind_series is None or temperature_series is None:
+        return np.full(len(drones), np.nan)
+
+    flyable = np.zeros(len(profiles), dtype=np.int64)
+    recorded = 0
+    for start in range(0, len(wind_series), hour_block):
+        wind = np.asarray(wind_series[start:start + hour_block], dtype=float)
+        temperature = np.asarray(temperature_series[start:start + hour_block], dtype=float)
+        valid = ~np.isnan(wind) & ~np.isnan(temperature)
+        if not valid.any():
+            continue
+        wind, temperature = wind[valid], temperature[valid]
+        humidity = None
+        if humidity_series is not None:
+            humidity = np.asarray(humidity_series[start:start + hour_block], dtype=float)[valid]
+        recorded += len(wind)
+        step = max(1, MAX_CELLS // len(wind))
+        for p in range(0, len(profiles), step):
+            ok = ((wind <= wind_limit[p:p + step]) & (temperature >= low[p:p + step])
+                  & (temperature <= high[p:p + step]))
+            if humidity is not None:
+                # NaN humidity compares False and is treated as within limits
+                ok &= ~(humidity > humidity_limit[p:p + step])
+            flyable[p:p + step] += ok.sum(axis=1)
+    if not recorded:
+        return np.full(len(drones), np.nan)
+    return (flyable / recorded)[inverse]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compile hourly port weather CSVs into a memory-mapped store.')
+    parser.add_argument('sources', nargs='+', help='CSV files with country_code, port_name, timestamp and '
+                                                   'wind_speed_m_s / temperature_c / humidity_percent')
+    parser.add_argument('--output', default=os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         'data', 'weather'))
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    manifest = compile_weather(args.sources, args.output, args.chunk_rows)
+    print(f"{len(manifest['ports'])} ports x {manifest['hours']} hours from {manifest['start']} "
+          f"({', '.join(manifest['files'])}) -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
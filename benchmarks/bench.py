@@ -0,0 +1,238 @@
+"""
+Benchmarks of every DroneSelectionSystem stage and the full selection path
+on seeded synthetic catalogs.
+
+    python benchmarks/bench.py run --scale small --output results.json
+    python benchmarks/bench.py run --drones 100,10000 --ports 1000 --save-baseline main
+    python benchmarks/bench.py compare benchmarks/baselines/main.json results.json --threshold 0.2
+
+`run` writes the timings as JSON (and, with --save-baseline NAME, to
+benchmarks/baselines/NAME.json); `compare` lists every case's change and
+exits with status 1 when a case got slower than the threshold allows.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+for path in (ROOT, os.path.join(ROOT, 'backend')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.synthetic import write_catalog  # noqa: E402
+from catalog import DroneCatalog  # noqa: E402
+from columnar import load_cached  # noqa: E402
+from utils import DroneSelectionSystem  # noqa: E402
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines')
+# Catalog sizes as (drones, ports)
+SCALES = {
+    'small': [(100, 1000)],
+    'medium': [(100, 1000), (10000, 10000)],
+    'large': [(100, 1000), (10000, 10000), (1000000, 100000)],
+}
+# The compatibility matrix is only built up to this many drone x port pairs (1 bit each)
+MAX_COMPATIBILITY_PAIRS = 2 * 10 ** 9
+# Changes smaller than this many seconds are noise, whatever their ratio
+MIN_DELTA = 0.0005
+
+QUERY = {
+    'purposes': ['Port Security'],
+    'slider_values': {
+        'Battery Life (minutes)': 4,
+        'Wind Resistance (m/s)': 5,
+        'Camera Resolution (MP)': 3,
+        'Price (EUR)': 2,
+    },
+    'budget': 60000,
+    'max_maintenance_cost': 1500,
+    'top_k': 25,
+}
+
+
+def _cases(drone_path, port_path, cache_root):
+    """(name, callable) for every benchmarked stage on one synthetic catalog."""
+    system = DroneSelectionSystem()
+    drones = system._read_drone_csv(drone_path)
+    ports = system._add_port_parsed_columns(pd.read_csv(port_path))
+    port_name = ports['port_name'].iloc[0]
+    constraints = system.extract_port_environmental_constraints(ports, port_name)
+    at_port = system.filter_drones_by_port_constraints(drones, constraints)
+    # Rank the budget-feasible drones so that ranking cost grows with the catalog
+    candidates = system.cost_and_maintenance_filtering(drones, QUERY['budget'], QUERY['max_maintenance_cost'])
+    weights = system.ahp_priority_scaling(QUERY['slider_values'])
+    load_cached(drone_path, lambda: drones, cache_root)
+
+    cases = [
+        ('load_drones_csv', lambda: system._read_drone_csv(drone_path)),
+        ('load_drones_columnar', lambda: load_cached(drone_path, None, cache_root)),
+        ('load_ports_csv', lambda: system._add_port_parsed_columns(pd.read_csv(port_path))),
+        ('port_constraints', lambda: system.extract_port_environmental_constraints(ports, port_name)),
+        ('port_filter', lambda: system.filter_drones_by_port_constraints(drones, constraints)),
+        ('purpose_filter', lambda: system.purpose_based_drone_filtering(at_port, QUERY['purposes'])),
+        ('cost_filter', lambda: system.cost_and_maintenance_filtering(
+            drones, QUERY['budget'], QUERY['max_maintenance_cost'])),
+        ('ahp', lambda: system.ahp_priority_scaling(QUERY['slider_values'])),
+        ('wsm_ranking', lambda: system.weighted_sum_model_ranking(candidates, weights, QUERY['top_k'])),
+    ]
+    for method in ('topsis', 'vikor', 'skyline'):
+        cases.append((f'{method}_ranking', lambda m=method: system.rank_candidates(
+            candidates, weights, m, QUERY['top_k'])))
+    cases.append(('select_drones', lambda: system.select_drones(
+        drone_path, port_path, port_name, QUERY['purposes'], QUERY['slider_values'],
+        QUERY['budget'], QUERY['max_maintenance_cost'], top_k=QUERY['top_k'])))
+
+    if len(drones) * len(ports) <= MAX_COMPATIBILITY_PAIRS:
+        catalog = DroneCatalog(drone_path, port_path, check_interval=3600)
+        snapshot = catalog.reload()
+        cases.append(('catalog_build', lambda: catalog.reload(force=True)))
+        cases.append(('run_selection_catalog', lambda: system.run_selection(
+            port_name=port_name, selected_purposes=QUERY['purposes'], slider_values=QUERY['slider_values'],
+            budget=QUERY['budget'], max_maintenance_cost=QUERY['max_maintenance_cost'],
+            catalog=snapshot, top_k=QUERY['top_k'])))
+    return cases
+
+
+def time_case(function, repeat=5, min_time=0.05):
+    """Seconds per call for `repeat` runs of enough calls to take at least min_time each."""
+    function()  # warm-up, e.g. lazily built indexes and caches
+    timer = timeit.Timer(function)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    runs = [elapsed / number] + [t / number for t in timer.repeat(repeat - 1, number)]
+    return {'min': min(runs), 'median': float(np.median(runs)), 'mean': float(np.mean(runs)),
+            'number': number, 'runs': runs}
+
+
+def _revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, seed=0, repeat=5, data_dir=None, only=None, log=print):
+    """Benchmark results for each (drones, ports) size, keyed '<drones>x<ports>/<case>'."""
+    data_dir = data_dir or os.path.join(tempfile.gettempdir(), 'dss-bench')
+    results = {}
+    for drones, ports in sizes:
+        started = time.perf_counter()
+        drone_path, port_path = write_catalog(data_dir, drones, ports, seed)
+        log(f'catalog {drones} drones x {ports} ports ready in {time.perf_counter() - started:.1f}s')
+        cache_root = os.path.join(data_dir, f'columnar-{drones}-{ports}-{seed}')
+        for name, function in _cases(drone_path, port_path, cache_root):
+            if only and not any(pattern in name for pattern in only):
+                continue
+            timing = time_case(function, repeat)
+            results[f'{drones}x{ports}/{name}'] = dict(timing, drones=drones, ports=ports, case=name)
+            log(f'  {name:24s} {timing["median"] * 1000:12.3f} ms')
+    return {
+        'meta': {
+            'revision': _revision(),
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=0.2, min_delta=MIN_DELTA):
+    """
+    Rows (key, baseline s, current s, ratio, status) for cases in both runs,
+    where status is 'regression' when the median grew by more than threshold
+    (and min_delta seconds), 'improvement' for the reverse, else 'ok'.
+    """
+    rows = []
+    for key in sorted(set(baseline['results']) & set(current['results'])):
+        before = baseline['results'][key]['median']
+        after = current['results'][key]['median']
+        ratio = after / before if before else float('inf')
+        status = 'ok'
+        if ratio > 1 + threshold and after - before > min_delta:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold) and before - after > min_delta:
+            status = 'improvement'
+        rows.append((key, before, after, ratio, status))
+    return rows
+
+
+def _sizes(args):
+    if args.drones or args.ports:
+        drones = [int(n) for n in (args.drones or '100').split(',')]
+        ports = [int(n) for n in (args.ports or '1000').split(',')]
+        return [(d, p) for d in drones for p in ports]
+    return SCALES[args.scale]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    run_parser.add_argument('--drones', help='comma-separated drone counts (overrides --scale)')
+    run_parser.add_argument('--ports', help='comma-separated port counts (overrides --scale)')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--repeat', type=int, default=5)
+    run_parser.add_argument('--only', action='append', help='only cases whose name contains this')
+    run_parser.add_argument('--data-dir', help='where synthetic catalogs are generated and reused')
+    run_parser.add_argument('--output', help='write results to this JSON file')
+    run_parser.add_argument('--save-baseline', metavar='NAME', help='also save as benchmarks/baselines/NAME.json')
+    run_parser.add_argument('--compare', metavar='BASELINE', help='compare against this results file')
+    run_parser.add_argument('--threshold', type=float, default=0.2)
+
+    compare_parser = commands.add_parser('compare', help='compare two results files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.2, help='allowed slowdown, e.g. 0.2 = 20%%')
+
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        current = run(_sizes(args), args.seed, args.repeat, args.data_dir, args.only)
+        outputs = [args.output] if args.output else []
+        if args.save_baseline:
+            outputs.append(os.path.join(BASELINE_DIR, f'{args.save_baseline}.json'))
+        for output in outputs:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            with open(output, 'w') as handle:
+                json.dump(current, handle, indent=2)
+            print(f'wrote {output}')
+        if not args.compare:
+            return 0
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+    else:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        with open(args.current) as handle:
+            current = json.load(handle)
+
+    rows = compare(baseline, current, args.threshold)
+    for key, before, after, ratio, status in rows:
+        print(f'{key:44s} {before * 1000:12.3f} ms {after * 1000:12.3f} ms {ratio:7.2f}x  {status}')
+    regressions = [row for row in rows if row[4] == 'regression']
+    print(f'{len(rows)} cases compared, {len(regressions)} regressions beyond {args.threshold:.0%}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,390 @@
+"""
+Load-testing harness that replays /match-drones form submissions.
+
+Requests are generated (seeded: port, purpose set, budget, maintenance cost
+and the four slider priorities) or replayed from a JSON Lines file, and sent
+with a number of concurrent workers, either in-process through the Flask
+test client or to a running server. The report gives throughput, latency
+percentiles and error rate per endpoint.
+
+    python benchmarks/loadtest.py generate --count 500 --output requests.jsonl
+    python benchmarks/loadtest.py run --requests requests.jsonl --concurrency 8 --output report.json
+    python benchmarks/loadtest.py run --url http://127.0.0.1:5000 --mode asyncio --duration 30
+    python benchmarks/loadtest.py compare before.json after.json
+    python benchmarks/loadtest.py revisions HEAD~1 HEAD --requests requests.jsonl
+
+Each request line is {"method": "POST", "path": "/match-drones", "form": {...}}
+(or "json": {...} instead of "form").
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PORT_SOURCE = os.path.join(ROOT, 'backend', 'data', 'merged_ports_data.csv')
+
+PURPOSES = [
+    'Reconnaissance', 'Port Security', 'Ship Inspection', 'Environmental Monitoring', 'Search & Rescue',
+    'Cargo & Logistics Monitoring', 'Harbor Traffic Management', 'Emergency Response & Fire Detection',
+    'Infrastructure & Structural Inspection', 'Agricultural',
+]
+SLIDER_FIELDS = ['battery_life_priority', 'wind_resistance_priority', 'camera_resolution_priority', 'price_priority']
+PERCENTILES = (50, 90, 99)
+
+
+def generate_requests(count, seed=0, ports_path=PORT_SOURCE):
+    """`count` seeded /match-drones form submissions."""
+    rng = np.random.default_rng(seed)
+    ports = pd.read_csv(ports_path)['port_name'].dropna().tolist()
+    requests = []
+    for _ in range(count):
+        purposes = rng.choice(PURPOSES, size=int(rng.integers(1, 4)), replace=False).tolist()
+        form = {
+            'port': ports[int(rng.integers(len(ports)))],
+            'purpose': purposes,
+            'budget': str(int(rng.integers(10, 101)) * 1000),
+            'maintenance_cost': str(int(rng.integers(2, 31)) * 100),
+        }
+        for field in SLIDER_FIELDS:
+            form[field] = str(float(rng.integers(2, 11)) / 2)
+        requests.append({'method': 'POST', 'path': '/match-drones', 'form': form})
+    return requests
+
+
+def read_requests(path):
+    with open(path) as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def write_requests(path, requests):
+    with open(path, 'w') as handle:
+        for entry in requests:
+            handle.write(json.dumps(entry) + '\n')
+
+
+def _body(entry):
+    if 'json' in entry:
+        return json.dumps(entry['json']).encode(), 'application/json'
+    return urllib.parse.urlencode(entry.get('form', {}), doseq=True).encode(), 'application/x-www-form-urlencoded'
+
+
+class InProcessTarget:
+    """Sends requests through the Flask test client of the app in app_dir (one client per thread)."""
+
+    def __init__(self, app_dir=None):
+        app_dir = os.path.abspath(app_dir or os.path.join(ROOT, 'backend'))
+        if app_dir not in sys.path:
+            sys.path.insert(0, app_dir)
+        import app as app_module
+        self.app = app_module.app
+        self._local = threading.local()
+
+    def send(self, entry):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        body, content_type = _body(entry)
+        response = client.open(entry['path'], method=entry.get('method', 'POST'), data=body,
+                               content_type=content_type)
+        response.close()
+        return response.status_code
+
+
+class HTTPTarget:
+    """Sends requests to a running server."""
+
+    def __init__(self, url, timeout=30):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def send(self, entry):
+        body, content_type = _body(entry)
+        request = urllib.request.Request(self.url + entry['path'], data=body, method=entry.get('method', 'POST'),
+                                         headers={'Content-Type': content_type})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    async def send_async(self, entry):
+        """The same request over a plain asyncio connection."""
+        url = urllib.parse.urlsplit(self.url + entry['path'])
+        body, content_type = _body(entry)
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(url.hostname, url.port or 80), self.timeout)
+        try:
+            path = url.path + (f'?{url.query}' if url.query else '')
+            writer.write((f"{entry.get('method', 'POST')} {path} HTTP/1.1\r\nHost: {url.netloc}\r\n"
+                          f"Content-Type: {content_type}\r\nContent-Length: {len(body)}\r\n"
+                          f"Connection: close\r\n\r\n").encode() + body)
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), self.timeout)
+            await asyncio.wait_for(reader.read(), self.timeout)
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
+
+
+class Recorder:
+    """Thread-safe latency and status samples per endpoint."""
+
+    def __init__(self):
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, endpoint, seconds, status):
+        with self._lock:
+            self.samples.setdefault(endpoint, []).append((seconds, status))
+
+    def report(self, elapsed):
+        endpoints = {}
+        for endpoint, samples in sorted(self.samples.items()):
+            latencies = np.array([s[0] for s in samples]) * 1000
+            errors = sum(1 for _, status in samples if status is None or status >= 400)
+            endpoints[endpoint] = {
+                'requests': len(samples),
+                'errors': errors,
+                'error_rate': errors / len(samples),
+                'throughput_rps': len(samples) / elapsed if elapsed else 0.0,
+                'latency_ms': dict({f'p{p}': float(np.percentile(latencies, p)) for p in PERCENTILES},
+                                   mean=float(latencies.mean()), max=float(latencies.max())),
+            }
+        return endpoints
+
+
+def _timed(recorder, entry, send):
+    start = time.perf_counter()
+    try:
+        status = send(entry)
+    except Exception:
+        status = None
+    recorder.add(entry['path'], time.perf_counter() - start, status)
+
+
+def run_threads(target, requests, concurrency, duration=None):
+    """Replay requests with `concurrency` threads, once or cycling for `duration` seconds."""
+    recorder = Recorder()
+    source = itertools.cycle(requests) if duration else iter(requests)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration if duration else None
+
+    def worker():
+        while deadline is None or time.perf_counter() < deadline:
+            with lock:
+                entry = next(source, None)
+            if entry is None:
+                return
+            _timed(recorder, entry, target.send)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    return recorder, time.perf_counter() - start
+
+
+def run_asyncio(target, requests, concurrency, duration=None):
+    """
+    Replay requests with `concurrency` asyncio tasks. Against a server each
+    task holds its own connection; in-process the synchronous test client
+    runs in worker threads.
+    """
+    recorder = Recorder()
+    source = itertools.cycle(requests) if duration else iter(requests)
+
+    async def worker(deadline):
+        send_async = getattr(target, 'send_async', None)
+        while deadline is None or time.perf_counter() < deadline:
+            entry = next(source, None)
+            if entry is None:
+                return
+            start = time.perf_counter()
+            try:
+                if send_async is not None:
+                    status = await send_async(entry)
+                else:
+                    status = await asyncio.to_thread(target.send, entry)
+            except Exception:
+                status = None
+            recorder.add(entry['path'], time.perf_counter() - start, status)
+
+    async def main():
+        deadline = time.perf_counter() + duration if duration else None
+        await asyncio.gather(*(worker(deadline) for _ in range(concurrency)))
+
+    start = time.perf_counter()
+    asyncio.run(main())
+    return recorder, time.perf_counter() - start
+
+
+def load_test(requests, url=None, app_dir=None, mode='threads', concurrency=4, duration=None, warmup=5):
+    """Run a load test and return its report (meta and per-endpoint statistics)."""
+    target = HTTPTarget(url) if url else InProcessTarget(app_dir)
+    for entry in requests[:warmup]:
+        target.send(entry)
+    runner = run_asyncio if mode == 'asyncio' else run_threads
+    recorder, elapsed = runner(target, requests, concurrency, duration)
+    return {
+        'meta': {
+            'target': url or 'in-process',
+            'revision': _revision(app_dir or ROOT),
+            'mode': mode,
+            'concurrency': concurrency,
+            'duration_s': elapsed,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'endpoints': recorder.report(elapsed),
+    }
+
+
+def _revision(directory):
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=directory, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before, after):
+    """Per endpoint: (endpoint, metric, before, after, relative change) for latency, throughput and errors."""
+    rows = []
+    for endpoint in sorted(set(before['endpoints']) & set(after['endpoints'])):
+        a, b = before['endpoints'][endpoint], after['endpoints'][endpoint]
+        metrics = [(f'{p} ms', a['latency_ms'][p], b['latency_ms'][p]) for p in ('p50', 'p90', 'p99')]
+        metrics += [('throughput rps', a['throughput_rps'], b['throughput_rps']),
+                    ('error rate', a['error_rate'], b['error_rate'])]
+        for metric, x, y in metrics:
+            rows.append((endpoint, metric, x, y, (y - x) / x if x else None))
+    return rows
+
+
+def format_report(report):
+    lines = [f"{report['meta']['target']} ({report['meta']['mode']}, concurrency {report['meta']['concurrency']}, "
+             f"revision {report['meta']['revision']})"]
+    for endpoint, stats in report['endpoints'].items():
+        latency = stats['latency_ms']
+        lines.append(f"{endpoint:24s} {stats['requests']:7d} req {stats['throughput_rps']:9.1f} rps  "
+                     f"p50 {latency['p50']:8.2f} ms  p90 {latency['p90']:8.2f} ms  p99 {latency['p99']:8.2f} ms  "
+                     f"errors {stats['error_rate']:.2%}")
+    return '\n'.join(lines)
+
+
+def format_comparison(rows):
+    lines = []
+    for endpoint, metric, x, y, change in rows:
+        delta = '' if change is None else f'{change:+8.1%}'
+        lines.append(f'{endpoint:24s} {metric:15s} {x:12.3f} {y:12.3f} {delta}')
+    return '\n'.join(lines)
+
+
+def compare_revisions(revisions, requests_path, options):
+    """
+    Load-test each git revision in a temporary worktree, in-process and with
+    the same requests, each in its own interpreter so no module is shared.
+    """
+    reports = []
+    for revision in revisions:
+        worktree = tempfile.mkdtemp(prefix='dss-loadtest-')
+        subprocess.run(['git', 'worktree', 'add', '--detach', worktree, revision], cwd=ROOT, check=True,
+                       capture_output=True)
+        try:
+            output = os.path.join(worktree, 'loadtest-report.json')
+            subprocess.run([sys.executable, os.path.abspath(__file__), 'run', '--requests', requests_path,
+                            '--app-dir', os.path.join(worktree, 'backend'), '--output', output] + options,
+                           cwd=worktree, check=True)
+            with open(output) as handle:
+                reports.append(json.load(handle))
+        finally:
+            subprocess.run(['git', 'worktree', 'remove', '--force', worktree], cwd=ROOT, capture_output=True)
+    return reports
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generate = commands.add_parser('generate', help='write generated requests as JSON Lines')
+    generate.add_argument('--count', type=int, default=500)
+    generate.add_argument('--seed', type=int, default=0)
+    generate.add_argument('--output', required=True)
+
+    def load_options(command):
+        command.add_argument('--requests', help='JSON Lines requests to replay (default: generated)')
+        command.add_argument('--count', type=int, default=200, help='generated requests when --requests is not given')
+        command.add_argument('--seed', type=int, default=0)
+        command.add_argument('--mode', choices=['threads', 'asyncio'], default='threads')
+        command.add_argument('--concurrency', type=int, default=4)
+        command.add_argument('--duration', type=float, help='cycle through the requests for this many seconds')
+
+    run = commands.add_parser('run', help='run a load test')
+    load_options(run)
+    run.add_argument('--url', help='base URL of a running server (default: in-process test client)')
+    run.add_argument('--app-dir', help='backend directory of the app to test in-process')
+    run.add_argument('--output', help='write the report to this JSON file')
+
+    compare_parser = commands.add_parser('compare', help='compare two reports')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+
+    revisions = commands.add_parser('revisions', help='load-test two git revisions with the same requests')
+    load_options(revisions)
+    revisions.add_argument('before')
+    revisions.add_argument('after')
+    revisions.add_argument('--output', help='write both reports to this JSON file')
+
+    args = parser.parse_args(argv)
+    if args.command == 'generate':
+        write_requests(args.output, generate_requests(args.count, args.seed))
+        return 0
+    if args.command == 'compare':
+        with open(args.before) as handle:
+            before = json.load(handle)
+        with open(args.after) as handle:
+            after = json.load(handle)
+        print(format_comparison(compare(before, after)))
+        return 0
+
+    requests_path = args.requests
+    if requests_path is None:
+        requests_path = os.path.join(tempfile.mkdtemp(prefix='dss-requests-'), 'requests.jsonl')
+        write_requests(requests_path, generate_requests(args.count, args.seed))
+    if args.command == 'revisions':
+        options = ['--mode', args.mode, '--concurrency', str(args.concurrency)]
+        if args.duration:
+            options += ['--duration', str(args.duration)]
+        before, after = compare_revisions([args.before, args.after], os.path.abspath(requests_path), options)
+        print(format_report(before))
+        print(format_report(after))
+        print(format_comparison(compare(before, after)))
+        if args.output:
+            with open(args.output, 'w') as handle:
+                json.dump({'before': before, 'after': after}, handle, indent=2)
+        return 0
+
+    report = load_test(read_requests(requests_path), args.url, args.app_dir, args.mode, args.concurrency,
+                       args.duration)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
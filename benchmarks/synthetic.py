@@ -0,0 +1,118 @@
+"""
+Seeded synthetic drone and port catalogs with the schema and value
+distributions of backend/data/droneType002.csv and merged_ports_data.csv.
+
+Rows are bootstrapped from the real catalogs, so categorical values and the
+joint distribution of a drone's attributes are kept, and numeric cells are
+then jittered (in the source's own format and precision) so that large
+catalogs do not consist of exact duplicates. Names get a numeric suffix to
+stay unique.
+
+    python benchmarks/synthetic.py --drones 10000 --ports 1000 --out /tmp/catalog
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+DRONE_SOURCE = os.path.join(ROOT, 'backend', 'data', 'droneType002.csv')
+PORT_SOURCE = os.path.join(ROOT, 'backend', 'data', 'merged_ports_data.csv')
+
+# Relative spread of the multiplicative jitter applied to numeric drone cells
+DRONE_JITTER = 0.1
+# Absolute spread of port weather values and the port temperature shift in degrees
+PORT_JITTER = {'humidity_percent': 2.0, 'average_wind_speed_m_s': 0.3, 'maximum_wind_speed_m_s': 0.5}
+PORT_TEMPERATURE_SHIFT = 2
+
+
+def _decimals(text):
+    text = str(text)
+    return len(text.split('.', 1)[1]) if '.' in text else 0
+
+
+def _jitter_text_column(values, rng, spread):
+    """
+    Jitter the numeric strings of a column multiplicatively, keeping each
+    value's number of decimals; non-numeric values ('Variable', ...) stay.
+    """
+    # Parsing and precision per distinct source value; rows are bootstrapped, so there are few
+    codes, uniques = pd.factorize(np.asarray(values, dtype=object))
+    numbers = pd.to_numeric(pd.Series(uniques), errors='coerce').to_numpy(dtype=float)[codes]
+    numeric = ~np.isnan(numbers)
+    out = np.asarray(values, dtype=object).copy()
+    if not numeric.any():
+        return out
+    jittered = numbers[numeric] * np.exp(rng.normal(0.0, spread, numeric.sum()))
+    decimals = np.array([_decimals(v) for v in uniques], dtype=int)[codes[numeric]]
+    formatted = np.empty(len(jittered), dtype=object)
+    for d in np.unique(decimals):
+        chosen = decimals == d
+        rounded = np.round(jittered[chosen], d)
+        # Rounded floats print in their shortest form, and whole numbers as integers
+        formatted[chosen] = (rounded.astype(np.int64) if d == 0 else rounded).astype(object)
+    out[numeric] = formatted
+    return out
+
+
+def generate_drones(n, seed=0, source=DRONE_SOURCE):
+    """n synthetic drones as raw CSV-style values (a DataFrame of the source's columns)."""
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(source, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+    df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    for column in df.columns:
+        if column == 'Drone Name':
+            df[column] = df[column] + ' #' + pd.RangeIndex(n).astype(str)
+        else:
+            df[column] = _jitter_text_column(df[column].to_numpy(), rng, DRONE_JITTER)
+    return df
+
+
+def generate_ports(n, seed=0, source=PORT_SOURCE):
+    """n synthetic ports with the port catalog's columns and formats."""
+    rng = np.random.default_rng(seed + 1)
+    base = pd.read_csv(source)
+    df = base.iloc[rng.integers(0, len(base), n)].reset_index(drop=True)
+    df['port_name'] = df['port_name'] + ' ' + pd.RangeIndex(n).astype(str)
+    for column, spread in PORT_JITTER.items():
+        df[column] = (df[column] + rng.normal(0.0, spread, n)).round(1)
+    df['humidity_percent'] = df['humidity_percent'].clip(0, 100)
+    df['maximum_wind_speed_m_s'] = np.maximum(df['maximum_wind_speed_m_s'], df['average_wind_speed_m_s'])
+    df['coverage_area_sq_km'] = (df['coverage_area_sq_km'] * np.exp(rng.normal(0.0, 0.2, n))).round(1)
+
+    bounds = df['temperature_range_c'].str.extract(r'^\s*(-?\d+)\s*-\s*(-?\d+)\s*$').astype(float)
+    shift = rng.integers(-PORT_TEMPERATURE_SHIFT, PORT_TEMPERATURE_SHIFT + 1, n)
+    low, high = bounds[0] + shift, bounds[1] + shift
+    ranges = low.astype('Int64').astype(str) + '-' + high.astype('Int64').astype(str)
+    df['temperature_range_c'] = ranges.where(low.notna() & high.notna(), None)
+    return df
+
+
+def write_catalog(directory, drones, ports, seed=0):
+    """Write synthetic drone and port CSVs into directory; returns their paths."""
+    os.makedirs(directory, exist_ok=True)
+    drone_path = os.path.join(directory, f'drones-{drones}-{seed}.csv')
+    port_path = os.path.join(directory, f'ports-{ports}-{seed}.csv')
+    if not os.path.exists(drone_path):
+        generate_drones(drones, seed).to_csv(drone_path, index=False)
+    if not os.path.exists(port_path):
+        generate_ports(ports, seed).to_csv(port_path, index=False)
+    return drone_path, port_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--drones', type=int, default=10000)
+    parser.add_argument('--ports', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='.')
+    args = parser.parse_args(argv)
+    for path in write_catalog(args.out, args.drones, args.ports, args.seed):
+        print(path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
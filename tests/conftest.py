@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The backend modules import each other by bare name, exactly as they do when
+# the app is started with `python backend/app.py`.
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
@@ -0,0 +1,49 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from ahp import batch_ahp, pairwise_matrices
+from utils import DroneSelectionSystem
+
+
+def test_matches_per_call_scaling():
+    system = DroneSelectionSystem()
+    criteria = ["a", "b", "c", "d"]
+    rows = np.array(list(itertools.product([1, 2.5, 5], repeat=4)) * 3, dtype=float)
+    result = batch_ahp(rows)
+    for row, weights in zip(rows, result.geometric):
+        expected = system.ahp_priority_scaling(dict(zip(criteria, row)))
+        assert weights == pytest.approx([expected[c] for c in criteria])
+    # Ratio judgements are perfectly consistent
+    assert np.allclose(result.eigenvector, result.geometric)
+    assert np.allclose(result.consistency_ratio, 0, atol=1e-12)
+
+
+def test_eigenvector_and_consistency_ratio_of_pairwise_matrices():
+    saaty = np.array([[1, 3, 5], [1 / 3, 1, 3], [1 / 5, 1 / 3, 1]])
+    rng = np.random.default_rng(0)
+    upper = np.triu(rng.choice([1 / 5, 1 / 3, 1, 3, 5, 7], size=(50, 4, 4)), 1)
+    random = upper + np.transpose(np.where(upper > 0, 1 / np.where(upper > 0, upper, 1), 0), (0, 2, 1)) + np.eye(4)
+
+    result = batch_ahp(saaty[None])
+    assert result.lambda_max[0] == pytest.approx(3.0385, abs=1e-4)
+    assert result.consistency_ratio[0] == pytest.approx(0.0332, abs=1e-3)
+    assert result.consistent[0]
+
+    result = batch_ahp(random)
+    for matrix, weights, lambda_max in zip(random, result.eigenvector, result.lambda_max):
+        values, vectors = np.linalg.eig(matrix)
+        principal = np.abs(vectors[:, np.argmax(values.real)].real)
+        assert weights == pytest.approx(principal / principal.sum(), abs=1e-9)
+        assert lambda_max == pytest.approx(values.real.max(), abs=1e-9)
+
+
+def test_memoized_rows_and_invalid_input():
+    rows = np.array([[3, 3, 0], [1, 2, 3], [1, 2, 3], [np.nan, 1, 1]])
+    result = batch_ahp(rows)
+    assert np.array_equal(result.geometric[1], result.geometric[2])
+    assert result.geometric[0] == pytest.approx([0.5, 0.5, 0])
+    assert result.geometric[3] == pytest.approx([1 / 3] * 3)
+    assert np.isnan(result.consistency_ratio[[0, 3]]).all()
+    assert pairwise_matrices(rows[1:2])[0, 2, 0] == 3
@@ -0,0 +1,222 @@
+import gzip
+import io
+import json
+
+import pandas as pd
+import pytest
+
+import app as app_module
+
+
+@pytest.fixture
+def client():
+    app_module.match_cache.clear()
+    return app_module.app.test_client()
+
+
+MATCH = {
+    "port": "Hamburg",
+    "purposes": ["Port Security"],
+    "budget": 60000,
+    "maintenance_cost": 1500,
+    "battery_life_priority": 4,
+    "wind_resistance_priority": 5,
+    "camera_resolution_priority": 3,
+    "price_priority": 2,
+}
+
+
+def test_match_drones_form(client):
+    response = client.post("/match-drones", data={
+        "port": "Hamburg", "purpose": ["Port Security"], "budget": "60000", "maintenance_cost": "1500",
+    })
+    assert response.status_code == 200
+    assert b"Drone Selection Results" in response.data
+
+
+def test_api_match_matches_select_drones(client):
+    response = client.post("/api/v1/match", json=MATCH)
+    assert response.status_code == 200
+    body = response.get_json()
+    results, summary = app_module.drone_system.select_drones(
+        port_name="Hamburg", selected_purposes=["Port Security"],
+        slider_values=app_module._slider_values(MATCH), budget=60000, max_maintenance_cost=1500,
+        catalog=app_module.catalog.snapshot())
+    assert body["summary"] == summary
+    assert body["total"] == len(results)
+    assert [d["Drone Name"] for d in body["drones"]] == list(results["Drone Name"])
+
+
+def test_diagnostics_explain_an_empty_match(client):
+    response = client.post("/api/v1/match/diagnostics", json=dict(MATCH, budget=10, near_misses=2))
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["summary"] == "No drones meet the budget constraints"
+    diagnostics = body["diagnostics"]
+    assert diagnostics["passing"] == 0 and len(diagnostics["failed_constraints"]) == diagnostics["total"]
+    budget = next(c for c in diagnostics["constraints"] if c["key"] == "cost:budget")
+    assert budget["eliminated"] == diagnostics["total"] and budget["only_blocker"] == 4
+    assert len(budget["near_misses"]) == 2 and budget["near_misses"][0]["other_failures"] == 0
+
+    page = client.post("/match-drones", data={
+        "port": "Hamburg", "purpose": ["Port Security"], "budget": "10", "maintenance_cost": "1500",
+    })
+    assert b"Drones eliminated" in page.data and b"short by" in page.data
+
+
+def test_api_match_cache_and_etag(client):
+    before = client.get("/api/v1/match/cache").get_json()
+    first = client.post("/api/v1/match", json=MATCH)
+    # Same query in another spelling: reordered purposes, folded port, scaled sliders
+    variant = dict(MATCH, port="port of HAMBURG", purposes=["Port Security", "Port Security"],
+                   battery_life_priority=2, wind_resistance_priority=2.5,
+                   camera_resolution_priority=1.5, price_priority=1)
+    second = client.post("/api/v1/match", json=variant)
+    assert second.data == first.data
+    assert second.headers["ETag"] == first.headers["ETag"]
+
+    stats = client.get("/api/v1/match/cache").get_json()
+    assert stats["hits"] - before["hits"] == 1
+    assert stats["misses"] - before["misses"] == 1
+
+    not_modified = client.post("/api/v1/match", json=MATCH,
+                               headers={"If-None-Match": first.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+
+
+def test_api_match_rejects_bad_numbers(client):
+    assert client.post("/api/v1/match", json=dict(MATCH, budget="lots")).status_code == 400
+    assert client.post("/api/v1/match", json=dict(MATCH, operability=1.5)).status_code == 400
+
+
+def test_api_fleet_mix(client):
+    fields = dict(MATCH, port="", purposes=["Reconnaissance", "Port Security"], budget=15000)
+    assert client.post("/api/v1/match", json=fields).get_json()["total"] == 0
+    mix = client.post("/api/v1/fleet-mix", json=fields).get_json()
+    assert len(mix["models"]) == 2 and mix["optimal"] and mix["price"] <= 15000
+    assert client.post("/api/v1/fleet-mix", json=dict(fields, max_models="two")).status_code == 400
+
+
+def test_api_portfolio(client):
+    fields = dict(MATCH, ports=["Hamburg", "Atlantis"], country="BE", top_k=3)
+    portfolio = client.post("/api/v1/portfolio", json=fields).get_json()
+    assert [p["port"] for p in portfolio["ports"]] == ["Antwerpen", "Gent", "Oostende", "Zeebrugge", "Hamburg"]
+    assert portfolio["unknown_ports"] == ["Atlantis"]
+    hamburg = client.post("/api/v1/match", json=dict(MATCH, top_k=3)).get_json()
+    assert portfolio["ports"][-1]["drones"] == hamburg["drones"]
+    assert portfolio["report"]["ports"] == 5
+    assert client.post("/api/v1/portfolio", json=dict(MATCH, ports=["Atlantis"])).status_code == 400
+
+
+def test_api_match_fleet_sizing(client):
+    plain = client.post("/api/v1/match", json=MATCH).get_json()
+    sized = client.post("/api/v1/match", json=dict(MATCH, fleet=True)).get_json()
+    assert plain["fleet"] is None and not plain["query"]["fleet"]
+    assert sized["query"]["fleet"] and sized["fleet"]["years"] == 3
+    assert all(d["Fleet Units"] >= 1 for d in sized["drones"])
+
+
+def test_api_match_paging(client):
+    full = client.post("/api/v1/match", json=dict(MATCH, port="", purposes=[])).get_json()
+    page = client.post("/api/v1/match", json=dict(MATCH, port="", purposes=[], top_k=3, offset=2)).get_json()
+    assert page["total"] == full["total"]
+    assert [d["Drone Name"] for d in page["drones"]] == [d["Drone Name"] for d in full["drones"][2:5]]
+
+
+def test_results_page_renders_one_page(client):
+    response = client.post("/match-drones", data={
+        "budget": "1000000", "maintenance_cost": "100000", "top_k": "5", "offset": "5",
+    })
+    assert b"Showing 6&ndash;10 of" in response.data
+    assert response.data.count(b"show-more-btn") == 5
+    assert b"Previous" in response.data and b"Next" in response.data
+
+
+def test_rerank_matches_full_match(client):
+    filters = {k: MATCH[k] for k in ("port", "purposes", "budget", "maintenance_cost")}
+    created = client.post("/api/v1/candidates", json=filters).get_json()
+    assert created["total"] > 0
+
+    for sliders in [(4, 5, 3, 2), (1, 1, 5, 5), (5, 1, 1, 1)]:
+        priorities = dict(zip(["battery_life_priority", "wind_resistance_priority",
+                               "camera_resolution_priority", "price_priority"], sliders))
+        reranked = client.post("/api/v1/rerank", json=dict(priorities, token=created["token"])).get_json()
+        matched = client.post("/api/v1/match", json=dict(filters, **priorities)).get_json()
+        assert reranked["total"] == matched["total"]
+        assert [d["Drone Name"] for d in reranked["drones"]] == [d["Drone Name"] for d in matched["drones"]]
+        assert [d["WSM Score"] for d in reranked["drones"]] == pytest.approx(
+            [d["WSM Score"] for d in matched["drones"]])
+
+
+def test_rerank_unknown_token(client):
+    assert client.post("/api/v1/rerank", json={"token": "nope"}).status_code == 410
+
+
+def test_analysis_reports_rank_stability(client):
+    payload = dict(MATCH, samples=2000, top=3, seed=1)
+    result = client.post("/api/v1/analysis", json=payload).get_json()
+    assert result["samples"] == 2000 and result["top"] == min(3, result["total"])
+    assert sum(d["p_first"] for d in result["drones"]) == pytest.approx(1.0)
+    leader = max(result["drones"], key=lambda d: d["p_first"])
+    assert leader["rank_low"] == 1
+
+    uniform = client.post("/api/v1/analysis", json=dict(payload, token=result["token"], mode="uniform")).get_json()
+    assert uniform["total"] == result["total"]
+    assert client.post("/api/v1/analysis", json=dict(payload, mode="bogus")).status_code == 400
+    assert client.get("/analysis?port=Hamburg").status_code == 200
+
+
+def test_match_with_ranking_methods(client):
+    wsm = client.post("/api/v1/match", json=MATCH).get_json()
+    for method, column in [("topsis", "TOPSIS Score"), ("vikor", "VIKOR Q"), ("skyline", "Skyline WSM Score")]:
+        result = client.post("/api/v1/match", json=dict(MATCH, method=method)).get_json()
+        assert result["query"]["method"] == method
+        assert all(column in drone for drone in result["drones"])
+        assert 0 < result["total"] <= wsm["total"]
+    assert client.post("/api/v1/match", json=dict(MATCH, method="nope")).status_code == 400
+
+
+def test_export_follows_the_query(client):
+    matched = client.post("/api/v1/match", json=dict(MATCH, method="topsis")).get_json()
+    response = client.post("/export/csv", json=dict(MATCH, method="topsis"))
+    assert response.headers["Content-Disposition"] == "attachment; filename=drones.csv"
+    exported = pd.read_csv(io.BytesIO(response.data))
+    assert list(exported["Drone Name"]) == [d["Drone Name"] for d in matched["drones"]]
+    assert "TOPSIS Score" in exported.columns
+
+    best = client.post("/api/v1/match", json=MATCH).get_json()["drones"][0]["Drone Name"]
+    token = client.post("/api/v1/candidates", json=MATCH).get_json()["token"]
+    response = client.get(f"/export/jsonl?token={token}&gzip=1&top_k=2")
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert len(lines) == 2 and json.loads(lines[0])["Drone Name"] == best
+
+    assert client.get("/export/xlsx").status_code == 400
+    assert client.get("/export/csv").status_code == 200
+
+
+def test_export_of_an_empty_result_keeps_the_columns(client):
+    query = "port=Hamburg&budget=1&purpose=Port+Security"
+    exported = pd.read_csv(io.BytesIO(client.get(f"/export/csv?{query}").data))
+    assert exported.empty and "Drone Name" in exported.columns
+
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    table = pq.read_table(io.BytesIO(client.get(f"/export/parquet?{query}").data))
+    assert table.num_rows == 0 and "Drone Name" in table.column_names
+    with pa.ipc.open_stream(client.get(f"/export/arrow?{query}").data) as reader:
+        assert reader.read_all().num_rows == 0
+
+
+def test_mixed_fleet_table_shows_fleet_costs_when_sized():
+    mix = {"summary": "2 drone models cover 2 purposes", "models": [
+        {"Drone Name": "A", "Purposes Covered": "Reconnaissance", "Price (EUR)": 5000,
+         "Maintenance Cost (EUR)": 300, "Fleet Units": 4, "Fleet Capex (EUR)": 20000, "Fleet Maintenance (EUR)": 3600},
+    ]}
+    fields = dict(drones=[], summary="", total=0, offset=0, page_size=10, form_fields=[], score_column="WSM Score",
+                  constraints=[], mix=mix)
+    with app_module.app.test_request_context():
+        plain = app_module.render_template("results.html", fleet=None, **fields)
+        sized = app_module.render_template("results.html", fleet={"years": 3}, **fields)
+    assert "<td>5000</td>" in plain and "Fleet Capex" not in plain
+    assert "<td>20000</td>" in sized and "<td>5000</td>" not in sized and "<td>-</td>" in sized
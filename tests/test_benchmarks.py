@@ -0,0 +1,40 @@
+import pandas as pd
+
+from benchmarks.bench import compare, run
+from benchmarks.synthetic import DRONE_SOURCE, PORT_SOURCE, generate_drones, generate_ports
+from utils import DroneSelectionSystem
+
+
+def test_synthetic_catalogs_keep_the_schema_and_are_seeded():
+    source = pd.read_csv(DRONE_SOURCE, encoding="utf-8-sig")
+    drones = generate_drones(500, seed=3)
+    assert list(drones.columns) == list(source.columns)
+    assert drones["Drone Name"].is_unique
+    assert set(drones["IP Rating"]) <= set(source["IP Rating"])
+    pd.testing.assert_frame_equal(drones, generate_drones(500, seed=3))
+    assert not drones.equals(generate_drones(500, seed=4))
+
+    ports = generate_ports(800, seed=3)
+    assert list(ports.columns) == list(pd.read_csv(PORT_SOURCE).columns)
+    assert ports["port_name"].is_unique
+    assert (ports["maximum_wind_speed_m_s"] >= ports["average_wind_speed_m_s"]).all()
+
+
+def test_synthetic_catalogs_load_like_the_real_ones(tmp_path):
+    path = tmp_path / "drones.csv"
+    generate_drones(300, seed=1).to_csv(path, index=False)
+    drones = DroneSelectionSystem()._read_drone_csv(str(path))
+    assert drones["Price (EUR)"].dtype.kind in "if"
+    assert drones["temp_min_c"].notna().all()
+
+
+def test_run_and_compare(tmp_path):
+    results = run([(20, 50)], repeat=2, data_dir=str(tmp_path), only=["ahp", "select_drones"], log=lambda _: None)
+    assert set(results["results"]) == {"20x50/ahp", "20x50/select_drones"}
+
+    slower = {"results": {key: dict(value, median=value["median"] * 3 + 0.01)
+                          for key, value in results["results"].items()}}
+    statuses = {row[0]: row[4] for row in compare(results, slower, threshold=0.2)}
+    assert set(statuses.values()) == {"regression"}
+    assert {row[4] for row in compare(results, results)} == {"ok"}
+    assert {row[4] for row in compare(slower, results)} == {"improvement"}
@@ -0,0 +1,67 @@
+import os
+import shutil
+
+from catalog import DroneCatalog
+from utils import DEFAULT_DRONE_DATA_PATH, DEFAULT_PORT_DATA_PATH, DroneSelectionSystem
+
+
+def _copy_catalog(tmp_path):
+    drone_path = tmp_path / "drones.csv"
+    port_path = tmp_path / "ports.csv"
+    shutil.copy(DEFAULT_DRONE_DATA_PATH, drone_path)
+    shutil.copy(DEFAULT_PORT_DATA_PATH, port_path)
+    return str(drone_path), str(port_path)
+
+
+def test_catalog_loads_once_and_reuses_snapshot(tmp_path):
+    drone_path, port_path = _copy_catalog(tmp_path)
+    catalog = DroneCatalog(drone_path, port_path, check_interval=0)
+
+    first = catalog.snapshot()
+    assert not first.drones.empty
+    assert first.ports is not None and not first.ports.empty
+    assert catalog.snapshot() is first
+
+
+def test_catalog_rebuilds_on_content_change_only(tmp_path):
+    drone_path, port_path = _copy_catalog(tmp_path)
+    catalog = DroneCatalog(drone_path, port_path, check_interval=0)
+    first = catalog.snapshot()
+
+    # Touching the file without changing it keeps the snapshot
+    stat = os.stat(drone_path)
+    os.utime(drone_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert catalog.snapshot() is first
+
+    with open(drone_path, encoding="utf-8-sig") as handle:
+        lines = handle.readlines()
+    with open(drone_path, "w", encoding="utf-8") as handle:
+        handle.writelines(lines[:-1])
+    os.utime(drone_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+
+    second = catalog.snapshot()
+    assert second is not first
+    assert second.version != first.version
+    assert len(second.drones) == len(first.drones) - 1
+    # The old snapshot is left intact for requests still using it
+    assert len(first.drones) == len(lines) - 1
+
+
+def test_select_drones_with_catalog_matches_file_load(tmp_path):
+    drone_path, port_path = _copy_catalog(tmp_path)
+    catalog = DroneCatalog(drone_path, port_path)
+    system = DroneSelectionSystem()
+    kwargs = dict(
+        port_name="Hamburg",
+        selected_purposes=["Port Security"],
+        slider_values={"Battery Life (minutes)": 4, "Wind Resistance (m/s)": 5,
+                       "Camera Resolution (MP)": 3, "Price (EUR)": 2},
+        budget=60000,
+        max_maintenance_cost=1500,
+    )
+
+    from_files, summary_files = system.select_drones(drone_path, port_path, **kwargs)
+    from_catalog, summary_catalog = system.select_drones(catalog=catalog.snapshot(), **kwargs)
+
+    assert summary_files == summary_catalog
+    assert list(from_files["Drone Name"]) == list(from_catalog["Drone Name"])
@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from columnar import cache_directory, load_cached, narrow_numeric, read_columnar, write_columnar
+from utils import DEFAULT_DRONE_DATA_PATH, DroneSelectionSystem
+
+
+def test_narrow_numeric_only_when_exact():
+    assert narrow_numeric(np.array([1, -300, 32000])).dtype == np.int16
+    assert narrow_numeric(np.array([1, 70000])).dtype == np.int32
+    assert narrow_numeric(np.array([0.5, 12.25, np.nan])).dtype == np.float32
+    assert narrow_numeric(np.array([2.7, 1.0])).dtype == np.float64
+
+
+def test_round_trip_is_memory_mapped_and_shares_dictionaries(tmp_path):
+    source = tmp_path / "drones.csv"
+    source.write_text("placeholder")
+    df = pd.DataFrame({
+        "Drone Name": ["a", "b", "c", "d"],
+        "Category": ["x", "y", "x", None],
+        "Real-Time Data Streaming": ["Yes", "No", "Yes", "Yes"],
+        "Infrared/Night Vision Capability": ["No", "No", "Yes", "No"],
+        "Price (EUR)": [16000, 6500, 900, 60000],
+        "Wind Resistance (m/s)": [12.5, 10.0, 8.0, np.nan],
+        "temp_min_c": [-20.0, -10.0, 0.0, 2.7],
+    })
+    manifest = write_columnar(df, str(tmp_path / "cache"), str(source))
+    loaded = read_columnar(str(tmp_path / "cache"), str(source))
+
+    pd.testing.assert_frame_equal(loaded.astype(object), df.astype(object))
+    kinds = {c["name"]: c for c in manifest["columns"]}
+    assert kinds["Category"]["kind"] == "category" and kinds["Drone Name"]["kind"] == "text"
+    assert kinds["Real-Time Data Streaming"]["dictionary"] == kinds["Infrared/Night Vision Capability"]["dictionary"]
+    assert loaded["Price (EUR)"].dtype == np.int32
+    assert loaded["Wind Resistance (m/s)"].dtype == np.float32
+    assert loaded["temp_min_c"].dtype == np.float64
+    # Read-only: the column is the mapped file, not a parsed copy
+    assert not loaded["Price (EUR)"].to_numpy().flags.writeable
+
+
+def test_loader_rebuilds_stale_cache(tmp_path):
+    source = tmp_path / "drones.csv"
+    lines = open(DEFAULT_DRONE_DATA_PATH, encoding="utf-8-sig").read().splitlines()
+    source.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    system = DroneSelectionSystem()
+    calls = []
+
+    def build():
+        calls.append(1)
+        return system._read_drone_csv(str(source))
+
+    cold = load_cached(str(source), build, str(tmp_path / "cache"))
+    warm = load_cached(str(source), build, str(tmp_path / "cache"))
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(cold, warm)
+    pd.testing.assert_frame_equal(warm.astype(object), build().astype(object))
+
+    # A changed source is parsed again and recompiled
+    calls.clear()
+    with open(source, "a", encoding="utf-8") as handle:
+        handle.write(lines[1] + "\n")
+    assert len(load_cached(str(source), build, str(tmp_path / "cache"))) == len(warm) + 1
+    assert len(calls) == 1
+    assert os.path.isdir(cache_directory(str(source), str(tmp_path / "cache")))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from compat import CompatibilityMatrix
+from utils import DEFAULT_DRONE_DATA_PATH, DEFAULT_PORT_DATA_PATH, DroneSelectionSystem
+
+
+@pytest.fixture(scope="module")
+def data():
+    system = DroneSelectionSystem()
+    drones = system.load_and_normalize_drone_data(DEFAULT_DRONE_DATA_PATH)
+    ports = system.load_port_data(DEFAULT_PORT_DATA_PATH)
+    return system, drones, ports
+
+
+def _reference(system, drones, ports, i):
+    port = ports.iloc[[i]]
+    constraints = system.extract_port_environmental_constraints(port, port.iloc[0]["port_name"])
+    return system.filter_drones_by_port_constraints(drones, constraints)
+
+
+def test_matrix_rows_match_port_filter(data):
+    system, drones, ports = data
+    matrix = CompatibilityMatrix(system, drones, ports)
+    assert matrix.bits.shape == (len(ports), (len(drones) + 7) // 8)
+    for i in range(len(ports)):
+        expected = list(_reference(system, drones, ports, i)["Drone Name"])
+        assert list(drones[matrix.port_mask(i)]["Drone Name"]) == expected
+
+
+def test_ports_for_drone_reads_a_column(data):
+    system, drones, ports = data
+    matrix = CompatibilityMatrix(system, drones, ports)
+    for d in range(len(drones)):
+        expected = [p for p in range(len(ports)) if matrix.port_mask(p)[d]]
+        assert list(matrix.drone_ports(d)) == expected
+    assert list(matrix.deployable_counts()) == [len(matrix.drone_ports(d)) for d in range(len(drones))]
+    name = drones.iloc[0]["Drone Name"]
+    assert len(matrix.ports_for_drone(name, drones, ports)) == len(matrix.drone_ports(0))
+
+
+def test_incremental_rebuild_matches_full_build(data):
+    system, drones, ports = data
+    matrix = CompatibilityMatrix(system, drones, ports)
+
+    drones2 = drones.copy()
+    drones2.loc[drones2.index[3], "Wind Resistance (m/s)"] = 30
+    ports2 = ports.copy()
+    ports2.loc[ports2.index[5], "maximum_wind_speed_m_s"] = 40
+
+    rebuilt = CompatibilityMatrix.rebuild(matrix, system, drones2, ports2)
+    fresh = CompatibilityMatrix(system, drones2, ports2)
+    assert np.array_equal(rebuilt.bits, fresh.bits)
+    assert np.array_equal(rebuilt.drone_hashes, fresh.drone_hashes)
+    # The previous matrix may belong to a published snapshot and is left as it was
+    assert np.array_equal(matrix.bits, CompatibilityMatrix(system, drones, ports).bits)
@@ -0,0 +1,52 @@
+import gzip
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from export import export_stream
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        "Drone Name": [f"D{i}" for i in range(2500)],
+        "Price (EUR)": np.arange(2500, dtype=float),
+        # Missing throughout the first chunk
+        "Notes": pd.Series([None if i < 1000 or i % 7 else "ok, \"quoted\"" for i in range(2500)], dtype=object),
+    })
+
+
+def _chunks(frame, rows=1000):
+    return (frame.iloc[i:i + rows] for i in range(0, len(frame), rows))
+
+
+def test_csv_and_jsonl_stream_chunk_by_chunk(frame):
+    parts = list(export_stream(_chunks(frame), "csv"))
+    assert len(parts) == 3
+    assert b"".join(parts).decode() == frame.to_csv(index=False)
+
+    lines = b"".join(export_stream(_chunks(frame), "jsonl")).decode().splitlines()
+    assert len(lines) == 2500
+    assert json.loads(lines[1]) == {"Drone Name": "D1", "Price (EUR)": 1.0, "Notes": None}
+
+
+def test_gzip_round_trip(frame):
+    compressed = b"".join(export_stream(_chunks(frame), "csv", compress=True))
+    assert gzip.decompress(compressed).decode() == frame.to_csv(index=False)
+
+
+def test_arrow_formats(frame):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+    table = pq.read_table(io.BytesIO(b"".join(export_stream(_chunks(frame), "parquet"))))
+    assert table.num_rows == 2500 and table.schema.field("Notes").type == pa.string()
+    with pa.ipc.open_stream(b"".join(export_stream(_chunks(frame), "arrow"))) as reader:
+        assert reader.read_all().num_rows == 2500
+
+
+def test_unknown_format(frame):
+    with pytest.raises(ValueError):
+        export_stream(_chunks(frame), "xlsx")
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from utils import (DEFAULT_DRONE_DATA_PATH, DEFAULT_PORT_DATA_PATH, DRONE_TEMPERATURE_PATTERN,
+                   PORT_TEMPERATURE_PATTERN, DroneSelectionSystem, parse_range_column)
+
+
+def test_parse_range_column_handles_negative_bounds():
+    low, high = parse_range_column(pd.Series(["-20°C to 50°C", "0°C to 40°C", "Not specified", None]),
+                                   DRONE_TEMPERATURE_PATTERN)
+    assert list(low[:2]) == [-20.0, 0.0] and list(high[:2]) == [50.0, 40.0]
+    assert low[2:].isna().all() and high[2:].isna().all()
+
+    low, high = parse_range_column(pd.Series(["2-18", "-1-16", "-3--1"]), PORT_TEMPERATURE_PATTERN)
+    assert list(low) == [2.0, -1.0, -3.0]
+    assert list(high) == [18.0, 16.0, -1.0]
+
+
+def test_loader_adds_typed_columns():
+    system = DroneSelectionSystem()
+    drones = system.load_and_normalize_drone_data(DEFAULT_DRONE_DATA_PATH)
+    for col in ["temp_min_c", "temp_max_c", "humidity_min_pct", "humidity_max_pct"]:
+        assert drones[col].dtype.kind == "f"
+    assert drones["ip_level"].dtype.kind == "i"
+
+    ports = system.load_port_data(DEFAULT_PORT_DATA_PATH)
+    hamburg = system.extract_port_environmental_constraints(ports, "Hamburg")
+    assert (hamburg["temperature_range_min"], hamburg["temperature_range_max"]) == (-1.0, 16.0)
+
+
+def test_filters_accept_frames_without_parsed_columns():
+    system = DroneSelectionSystem()
+    drones = system.load_and_normalize_drone_data(DEFAULT_DRONE_DATA_PATH)
+    raw = drones.drop(columns=["temp_min_c", "temp_max_c", "ip_level"])
+
+    parsed = system._filter_by_temperature_range(drones, -10, 45)
+    unparsed = system._filter_by_temperature_range(raw, -10, 45)
+    assert list(parsed["Drone Name"]) == list(unparsed["Drone Name"])
+
+    parsed = system._filter_by_ip_rating(drones, "IP53")
+    unparsed = system._filter_by_ip_rating(raw, "IP53")
+    assert list(parsed["Drone Name"]) == list(unparsed["Drone Name"])
+    assert set(parsed["IP Rating"]) <= {"IP53", "IP54", "IP65", "IP67"}
@@ -0,0 +1,40 @@
+import numpy as np
+
+from catalog import get_catalog
+from fleet import fleet_size
+from utils import DroneSelectionSystem
+
+
+def test_fleet_size_per_drone():
+    stations, units = fleet_size(
+        radius_km=[2.0, 1.0, 5.0, 3.0, 0.0],
+        battery_minutes=[30, 60, 1500, 45, 30],
+        daily_flights=[10, np.nan, 1, 40, 10],
+        coverage_area_sq_km=12.5)
+    # 1 station of 5 units (300 airborne minutes a day each); 4 stations of a
+    # unit plus its relief; one unit outlasting the day; zero radius unsizable
+    assert stations[:4].tolist() == [1, 4, 1, 1]
+    assert units[:4].tolist() == [5, 8, 1, 2]
+    assert np.isnan(units[4])
+
+    _, with_spares = fleet_size([2.0], [30], [10], 12.5, spare_fraction=0.1)
+    assert with_spares.tolist() == [6]
+
+
+def test_selection_ranks_by_fleet_cost():
+    snapshot = get_catalog().snapshot()
+    system = DroneSelectionSystem()
+    selection = system.run_selection(port_name="Antwerpen", catalog=snapshot, fleet=True)
+    results = selection["results"]
+    assert selection["fleet"]["coverage_area_sq_km"] == 12.5
+    costs = results["Fleet Cost (EUR)"].to_numpy()
+    assert (np.diff(costs[~np.isnan(costs)]) >= 0).all()
+    expected = results["Fleet Units"] * (results["Price (EUR)"] + 3 * results["Maintenance Cost (EUR)"])
+    np.testing.assert_allclose(costs, expected)
+
+    # The price slider weighs the fleet cost instead of the unit price
+    sliders = {"Battery Life (minutes)": 1, "Wind Resistance (m/s)": 1, "Camera Resolution (MP)": 1,
+               "Price (EUR)": 5}
+    ranked = system.run_selection(port_name="Antwerpen", catalog=snapshot, fleet=True, slider_values=sliders)
+    assert "Fleet Cost (EUR)_normalized" in ranked["results"].columns
+    assert "Price (EUR)_normalized" not in ranked["results"].columns
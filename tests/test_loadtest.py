@@ -0,0 +1,44 @@
+import threading
+
+from werkzeug.serving import make_server
+
+from app import app, match_cache
+from benchmarks.loadtest import SLIDER_FIELDS, compare, generate_requests, load_test, read_requests, write_requests
+
+
+def test_generated_requests_are_seeded_and_replayable(tmp_path):
+    requests = generate_requests(20, seed=5)
+    assert requests == generate_requests(20, seed=5)
+    assert requests != generate_requests(20, seed=6)
+    for entry in requests:
+        form = entry["form"]
+        assert entry["path"] == "/match-drones" and 1 <= len(form["purpose"]) <= 3
+        assert all(1 <= float(form[field]) <= 5 for field in SLIDER_FIELDS)
+    write_requests(tmp_path / "requests.jsonl", requests)
+    assert read_requests(tmp_path / "requests.jsonl") == requests
+
+
+def test_in_process_and_server_runs_report_per_endpoint():
+    match_cache.clear()
+    invalid = {"method": "POST", "path": "/api/v1/match", "json": {"port": "Hamburg", "method": "nope"}}
+    requests = generate_requests(6, seed=1) + [invalid]
+    report = load_test(requests, concurrency=3, warmup=0)
+    stats = report["endpoints"]["/match-drones"]
+    assert stats["requests"] == 6 and stats["errors"] == 0
+    assert stats["latency_ms"]["p50"] <= stats["latency_ms"]["p99"]
+    assert report["endpoints"]["/api/v1/match"]["error_rate"] == 1.0
+
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f"http://127.0.0.1:{server.server_port}"
+        for mode in ("threads", "asyncio"):
+            served = load_test(requests[:4], url=url, mode=mode, concurrency=2, warmup=0)
+            assert served["endpoints"]["/match-drones"]["requests"] == 4
+            assert served["endpoints"]["/match-drones"]["errors"] == 0
+    finally:
+        server.shutdown()
+
+    rows = {(row[0], row[1]): row for row in compare(report, served)}
+    assert ("/match-drones", "p99 ms") in rows and ("/match-drones", "throughput rps") in rows
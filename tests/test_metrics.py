@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+import app as app_module
+from config import Config
+from metrics import MetricsRegistry, WorkerMetrics
+from utils import DEFAULT_DRONE_DATA_PATH, DroneSelectionSystem
+
+FORM = {"port": "Hamburg", "purpose": ["Port Security"], "budget": "60000", "maintenance_cost": "1500"}
+
+
+@pytest.fixture
+def client():
+    app_module.match_cache.clear()
+    return app_module.app.test_client()
+
+
+def test_histogram_exposition():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ["stage"], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, stage='a "b"')
+    text = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{stage="a \\"b\\"",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{stage="a \\"b\\"",le="1.0"} 2' in text
+    assert 'latency_seconds_bucket{stage="a \\"b\\"",le="+Inf"} 3' in text
+    assert 'latency_seconds_count{stage="a \\"b\\""} 3' in text
+    assert 'latency_seconds_sum{stage="a \\"b\\""} 5.55' in text
+
+
+def _worker(requests):
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.", ["path"]).inc(requests, path="/a")
+    registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)).observe(0.5)
+    return registry
+
+
+def test_worker_metrics_are_summed_across_processes(tmp_path):
+    directory = str(tmp_path)
+    WorkerMetrics(directory, _worker(1)).write(101)
+    WorkerMetrics(directory, _worker(2)).write(102)
+    live = WorkerMetrics(directory, _worker(3))
+
+    def rendered():
+        # As worker 103 renders it: its live values plus the other files
+        return live.registry.combined(live.states(exclude=103)).render()
+
+    assert 'requests_total{path="/a"} 6' in rendered()
+    assert "latency_seconds_count 3" in rendered()
+
+    # An exited worker's values stay in the totals
+    WorkerMetrics(directory, _worker(0)).retire(101)
+    assert sorted(os.listdir(directory)) == ["102.json", "retired.json"]
+    assert 'requests_total{path="/a"} 6' in rendered()
+
+
+def test_pipeline_stages_are_exported(client):
+    assert client.post("/match-drones", data=FORM).status_code == 200
+    text = client.get("/metrics").get_data(as_text=True)
+
+    for stage in ("load", "port_constraints", "port", "purpose", "cost", "ahp", "ranking", "render"):
+        assert f'dss_stage_duration_seconds_count{{stage="{stage}"}}' in text
+    assert 'dss_stage_rows_bucket{stage="port",direction="in",le="100.0"}' in text
+    assert 'dss_request_duration_seconds_count{endpoint="/match-drones",status="200"}' in text
+
+
+def test_cost_filtering_does_not_print(capsys):
+    system = DroneSelectionSystem()
+    drones = system.load_and_normalize_drone_data(DEFAULT_DRONE_DATA_PATH)
+    assert len(system.cost_and_maintenance_filtering(drones, 60000, 1500))
+    assert capsys.readouterr().out == ""
+
+
+def test_profile_header_is_opt_in(client, tmp_path, monkeypatch):
+    response = client.post("/match-drones", data=FORM, headers={"X-Profile": "1"})
+    assert "X-Profile-Id" not in response.headers
+
+    monkeypatch.setattr(Config, "PROFILING", True)
+    monkeypatch.setattr(Config, "PROFILE_DIR", str(tmp_path))
+    response = client.post("/match-drones", data=FORM, headers={"X-Profile": "1"})
+    assert os.path.exists(tmp_path / f"{response.headers['X-Profile-Id']}.prof")
+    assert "X-Profile-Id" not in client.post("/match-drones", data=FORM).headers
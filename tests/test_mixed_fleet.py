@@ -0,0 +1,81 @@
+import itertools
+
+import numpy as np
+
+from catalog import get_catalog
+import mixed_fleet
+from mixed_fleet import MixedFleetOptimizer, dominated_models
+from utils import DroneSelectionSystem
+
+
+def _brute_force(masks, scores, prices, maintenance, target, budget, max_maintenance, max_models):
+    for size in range(1, max_models + 1):
+        best = None
+        for models in itertools.combinations(range(len(masks)), size):
+            models = list(models)
+            covered = np.bitwise_or.reduce(masks[models])
+            if (int(covered) & target != target or prices[models].sum() > budget
+                    or maintenance[models].sum() > max_maintenance):
+                continue
+            if best is None or scores[models].sum() > best:
+                best = scores[models].sum()
+        if best is not None:
+            return size, best
+    return None
+
+
+def test_optimizer_matches_brute_force():
+    rng = np.random.default_rng(7)
+    for _ in range(60):
+        n, purposes = int(rng.integers(4, 16)), int(rng.integers(2, 6))
+        masks = np.array([sum(1 << int(b) for b in rng.choice(purposes, int(rng.integers(1, 3)), replace=False))
+                          for _ in range(n)], dtype=np.uint64)
+        scores = rng.random(n).round(2)
+        prices = rng.integers(1, 10, n).astype(float)
+        maintenance = rng.integers(1, 5, n).astype(float)
+        budget, max_maintenance = float(rng.integers(5, 30)), float(rng.integers(3, 15))
+        target = (1 << purposes) - 1
+        result = MixedFleetOptimizer(masks, scores, prices, maintenance, budget, max_maintenance,
+                                     max_models=3).solve(target)
+        expected = _brute_force(masks, scores, prices, maintenance, target, budget, max_maintenance, 3)
+        assert result["optimal"]
+        if expected is None:
+            assert result["models"] == []
+        else:
+            assert (len(result["models"]), result["score"]) == (expected[0], np.float64(expected[1]))
+
+
+def test_dominance_keeps_the_first_of_identical_models():
+    masks = np.array([0b11, 0b01, 0b11, 0b10], dtype=np.uint64)
+    dominated = dominated_models(masks, np.array([0.9, 0.8, 0.9, 0.95]),
+                                 np.array([10.0, 10.0, 10.0, 12.0]), np.array([1.0, 1.0, 1.0, 1.0]))
+    assert dominated.tolist() == [False, True, True, False]
+
+
+def test_mixed_fleet_covers_purposes_no_single_drone_meets():
+    system = DroneSelectionSystem()
+    purposes = ["Reconnaissance", "Port Security"]
+    assert system.run_selection(selected_purposes=purposes, budget=15000)["total"] == 0
+
+    mix = system.select_mixed_fleet(selected_purposes=purposes, budget=15000)
+    models = mix["models"]
+    assert len(models) == 2 and mix["optimal"]
+    assert mix["price"] == models["Price (EUR)"].sum() <= 15000
+    covered = set("; ".join(models["Purposes Covered"]).split("; "))
+    assert covered == set(purposes)
+
+    # Sized for continuous coverage of a port, each model counts with its fleet capex
+    snapshot = get_catalog().snapshot()
+    sized = system.select_mixed_fleet(port_name="Antwerpen", selected_purposes=purposes, budget=200000,
+                                      catalog=snapshot, fleet=True)
+    assert sized["price"] == sized["models"]["Fleet Capex (EUR)"].sum() <= 200000
+
+    assert system.select_mixed_fleet(selected_purposes=purposes + ["Agricultural"])["uncoverable"] == ["Agricultural"]
+
+
+def test_popcount_without_bitwise_count(monkeypatch):
+    values = np.array([0, 1, 0b1011, 2**64 - 1], dtype=np.uint64)
+    expected = [0, 1, 3, 64]
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    assert mixed_fleet._popcount(values).tolist() == expected
+    assert int(mixed_fleet._popcount(values[2])) == 3
@@ -0,0 +1,101 @@
+import itertools
+
+import pytest
+
+from planner import Predicate, QueryPlanner
+from utils import DEFAULT_DRONE_DATA_PATH, DEFAULT_PORT_DATA_PATH, DroneSelectionSystem
+
+
+@pytest.fixture(scope="module")
+def data():
+    system = DroneSelectionSystem()
+    drones = system.load_and_normalize_drone_data(DEFAULT_DRONE_DATA_PATH)
+    ports = system.load_port_data(DEFAULT_PORT_DATA_PATH)
+    return system, drones, ports
+
+
+def _staged(system, drones, constraints, purposes, budget, max_maintenance_cost):
+    df = system.filter_drones_by_port_constraints(drones, constraints)
+    df = system.purpose_based_drone_filtering(df, purposes)
+    return system.cost_and_maintenance_filtering(df, budget, max_maintenance_cost)
+
+
+@pytest.mark.parametrize("port_name", [None, "Hamburg", "Valencia"])
+def test_fused_plan_matches_staged_filters(data, port_name):
+    system, drones, ports = data
+    constraints = system.extract_port_environmental_constraints(ports, port_name) if port_name else {}
+    purposes = list(system.purpose_mapping)
+    for combo in itertools.chain([[]], itertools.combinations(purposes, 1), itertools.combinations(purposes[::2], 2)):
+        for budget, maintenance in [(None, None), (20000, 800), (80000, 2000)]:
+            plan = system.build_query_plan(drones, constraints, list(combo), budget, maintenance)
+            fused = plan.execute(drones)
+            staged = _staged(system, drones, constraints, list(combo), budget, maintenance)
+            assert list(fused["Drone Name"]) == list(staged["Drone Name"])
+
+
+def test_explain_reports_rows_per_predicate(data):
+    system, drones, ports = data
+    constraints = system.extract_port_environmental_constraints(ports, "Antwerpen")
+    plan = system.build_query_plan(drones, constraints, ["Port Security"], 60000, 1500)
+
+    estimated = plan.explain()
+    assert {"predicate", "stage", "estimated_selectivity", "estimated_ns_per_row"} <= set(estimated[0])
+
+    result = plan.execute(drones)
+    trace = plan.explain()
+    assert len(trace) == len(plan.predicates)
+    assert trace[0]["rows_in"] == len(drones)
+    assert trace[-1]["rows_out"] == len(result)
+    for before, after in zip(trace, trace[1:]):
+        assert after["rows_in"] == before["rows_out"]
+
+
+def test_planner_orders_by_observed_selectivity():
+    planner = QueryPlanner()
+    loose = Predicate("loose", "purpose", ["x"], lambda x: x >= 0, key="loose")
+    strict = Predicate("strict", "cost", ["x"], lambda x: x >= 90, key="strict")
+    # Same per-row cost; the predicate that removes more rows should run first
+    planner.stats.observe(loose, 100, 95, 10000)
+    planner.stats.observe(strict, 100, 10, 10000)
+    plan = planner.plan([loose, strict])
+    assert [p.key for p in plan.predicates] == ["strict", "loose"]
+
+    # A much more expensive predicate is deferred even if it is selective
+    planner.stats.observe(strict, 100, 10, 10**8)
+    plan = planner.plan([loose, strict])
+    assert [p.key for p in plan.predicates] == ["loose", "strict"]
+
+
+def test_select_drones_reports_failing_stage(data):
+    system, _, _ = data
+    _, summary = system.select_drones(port_name="Hamburg", selected_purposes=["Port Security"],
+                                      slider_values={}, budget=10, max_maintenance_cost=10000)
+    assert summary == "No drones meet the budget constraints"
+    _, summary = system.select_drones(port_name="Hamburg", selected_purposes=list(system.purpose_mapping),
+                                      slider_values={}, budget=None, max_maintenance_cost=None)
+    assert summary == "No drones meet the selected purpose requirements"
+
+
+def test_diagnostics_agree_with_the_plan_in_one_pass(data):
+    system, drones, ports = data
+    constraints = system.extract_port_environmental_constraints(ports, "Hamburg")
+    plan, report = system.diagnose(drones, constraints, ["Port Security", "Ship Inspection"], 30000, 1500)
+    staged = _staged(system, drones, constraints, ["Port Security", "Ship Inspection"], 30000, 1500)
+    assert list(drones["Drone Name"].iloc[report.passing.nonzero()[0]]) == list(staged["Drone Name"])
+    assert plan.explain()[-1]["rows_out"] == len(staged)
+
+    summary = {c["key"]: c for c in report.constraints(near_misses=3)}
+    assert {"port:wind", "port:ip", "cost:budget", "cost:maintenance"} <= set(summary)
+    budget = summary["cost:budget"]
+    assert budget["eliminated"] == int((drones["Price (EUR)"] > 30000).sum())
+    closest = budget["near_misses"][0]["other_failures"]
+    gaps = [m["gap"] for m in budget["near_misses"] if m["other_failures"] == closest]
+    assert gaps == sorted(gaps) and all(g > 0 for g in gaps)
+
+    failed = report.failed_constraints(limit=None)
+    assert len(failed) == len(drones) - len(staged)
+    name, reasons = next(iter(failed.items()))
+    row = drones.index[drones["Drone Name"] == name][0]
+    for predicate in plan.predicates:
+        passes = bool(predicate.test(*[drones.loc[[row], c].to_numpy() for c in predicate.columns])[0])
+        assert (predicate.name in reasons) == (not passes)
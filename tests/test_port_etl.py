@@ -0,0 +1,54 @@
+import os
+
+import pandas as pd
+
+from columnar import cache_directory, read_columnar
+from port_etl import DEFAULT_SOURCES, PortETL
+from utils import DEFAULT_PORT_DATA_PATH
+
+
+def test_sources_rebuild_the_merged_catalog(tmp_path):
+    output = str(tmp_path / "ports.csv")
+    report = PortETL(output).run()
+    assert report["written"] and report["problem_count"] == 0
+    # The columnar cache is compiled with the CSV, so the backend's first load is warm
+    assert read_columnar(cache_directory(output), output) is not None
+    pd.testing.assert_frame_equal(
+        pd.read_csv(output).sort_values(["country_code", "port_name"], ignore_index=True),
+        pd.read_csv(DEFAULT_PORT_DATA_PATH).sort_values(["country_code", "port_name"], ignore_index=True))
+
+    # Nothing changed: every source is skipped and the CSV is left alone
+    mtime = os.stat(output).st_mtime_ns
+    report = PortETL(output).run()
+    assert all(entry["skipped"] for entry in report["sources"]) and not report["written"]
+    assert os.stat(output).st_mtime_ns == mtime
+
+
+def test_upserts_changed_rows_only_and_validates(tmp_path):
+    output = str(tmp_path / "ports.csv")
+    PortETL(output).run(DEFAULT_SOURCES)
+    source = tmp_path / "wind.csv"
+    source.write_text(
+        "country_code,port_name,average_wind_speed_km_h,maximum_wind_speed_m_s\n"
+        "BE,antwerpen,36,12.5\n"            # spelling variant, wind in km/h: 10 m/s
+        "BE,Gent,18,12.0\n"                 # 5 m/s, as before
+        "BE,Zeebruge,22.68,13.2\n"          # misspelt, matched to Zeebrugge; 6.3 m/s as before
+        "NL,Nieuwhaven,18,13.0\n"           # new port
+        "DE,Hamburg,18,3.0\n"               # maximum below average
+        "DE,Kiel,windy,12\n"                # not a number
+        "X1,Nowhere,18,12\n",               # bad country code
+        encoding="utf-8")
+    etl = PortETL(output)
+    report = etl.run([str(source)])
+    entry = report["sources"][0]
+    assert (entry["inserted"], entry["updated"], entry["unchanged"], entry["rejected"]) == (1, 1, 2, 3)
+    assert {"source_name": "antwerpen", "port_name": "Antwerpen"} in entry["variants"]
+    assert {"source_name": "Zeebruge", "port_name": "Zeebrugge"} in entry["variants"]
+    assert {p["reason"] for p in report["problems"]} == {
+        "below the average wind speed", "not a number", "not an ISO country code"}
+
+    ports = pd.read_csv(output).set_index("port_name")
+    assert ports.loc["Antwerpen", "average_wind_speed_m_s"] == 10
+    assert ports.loc["Antwerpen", "humidity_percent"] == 78
+    assert ports.loc["Nieuwhaven", "maximum_wind_speed_m_s"] == 13
+    assert ports.loc["Hamburg", "maximum_wind_speed_m_s"] > 3
@@ -0,0 +1,53 @@
+import portfolio
+from catalog import get_catalog
+from portfolio import PortfolioPool, portfolio_report, select_ports
+from utils import DroneSelectionSystem
+
+OPTIONS = {"selected_purposes": ["Port Security"], "budget": 60000, "max_maintenance_cost": 1500}
+
+
+def test_select_ports():
+    snapshot = get_catalog().snapshot()
+    everything, unknown = select_ports(snapshot.ports, "all")
+    assert len(everything) == len(snapshot.ports) and unknown == []
+    names, unknown = select_ports(snapshot.ports, ["hamburg", "Atlantis", "Gent"], "be", snapshot.port_index)
+    assert names == ["Antwerpen", "Gent", "Oostende", "Zeebrugge", "Hamburg"]
+    assert unknown == ["Atlantis"]
+
+
+def test_grouped_evaluation_matches_single_port_selections():
+    snapshot = get_catalog().snapshot()
+    system = DroneSelectionSystem()
+    names = snapshot.ports["port_name"].tolist()
+    for fleet in (False, True):
+        groups = system.evaluate_ports(names, snapshot, 5, fleet=fleet, **OPTIONS)
+        assert sorted(p for g in groups for p in g["ports"]) == sorted(names)
+        for group in groups:
+            for port in group["ports"][:2]:
+                selection = system.run_selection(port_name=port, catalog=snapshot, fleet=fleet, **OPTIONS)
+                assert selection["results"]["Drone Name"].tolist() == group["drones"]
+                assert selection["total"] == group["total"]
+
+    report = portfolio_report(groups, top_k=5)
+    assert report["ports"] == len(names)
+    assert report["ports_with_drones"] + len(report["ports_without_drones"]) == len(names)
+    leader = report["drones"][0]
+    assert leader["deployable_ports"] >= report["drones"][-1]["deployable_ports"]
+    assert leader["top_k_ports"] <= leader["deployable_ports"]
+
+
+def test_pool_matches_in_process_evaluation(monkeypatch):
+    snapshot = get_catalog().snapshot()
+    system = DroneSelectionSystem()
+    names = snapshot.ports["port_name"].tolist()[:12]
+    inline = system.evaluate_ports(names, snapshot, 3, fleet=True, **OPTIONS)
+    monkeypatch.setattr(portfolio, "MIN_PARALLEL", 1)
+    pool = PortfolioPool(2)
+    try:
+        pooled = system.evaluate_ports(names, snapshot, 3, executor=pool.executor(system, snapshot),
+                                       fleet=True, **OPTIONS)
+    finally:
+        pool.shutdown()
+    assert [g["ports"] for g in pooled] == [g["ports"] for g in inline]
+    assert [g["drones"] for g in pooled] == [g["drones"] for g in inline]
+    assert all(p["results"].equals(i["results"]) for p, i in zip(pooled, inline))
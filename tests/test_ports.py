@@ -0,0 +1,61 @@
+import pytest
+
+from catalog import get_catalog
+from ports import PortIndex, normalize_port_name
+from utils import DEFAULT_PORT_DATA_PATH, DroneSelectionSystem
+
+
+@pytest.fixture(scope="module")
+def ports():
+    return DroneSelectionSystem().load_port_data(DEFAULT_PORT_DATA_PATH)
+
+
+def test_normalize_folds_accents_case_and_prefix():
+    assert normalize_port_name("Lübeck") == normalize_port_name("LUBECK") == "lubeck"
+    assert normalize_port_name("Ploče") == "ploce"
+    assert normalize_port_name("Port of Hamburg") == "hamburg"
+    assert normalize_port_name("Nordby (Fanø)") == "nordby fano"
+
+
+def test_exact_lookup_does_not_match_partial_names(ports):
+    index = PortIndex(ports)
+    names = list(ports["port_name"])
+    assert names[index.lookup("lubeck")] == "Lübeck"
+    assert names[index.lookup("Port of Hamburg")] == "Hamburg"
+    assert index.lookup("Ham") is None
+    # Every port resolves to itself
+    for position, name in enumerate(names):
+        assert index.lookup(name) == position
+
+
+def test_autocomplete_prefix_and_country(ports):
+    index = PortIndex(ports)
+    names = [p["port_name"] for p in index.complete("ham")]
+    assert "Hamburg" in names and "Hamina" in names
+    assert all(p["country_code"] == "DE" for p in index.complete("b", country="de"))
+    assert "Milford Haven" in [p["port_name"] for p in index.complete("haven")]
+    assert len(index.complete("a", limit=3)) == 3
+    assert index.complete("") == []
+
+
+def test_select_drones_uses_folded_port_names():
+    system = DroneSelectionSystem()
+    ports = system.load_port_data(DEFAULT_PORT_DATA_PATH)
+    by_name = system.extract_port_environmental_constraints(ports, "Lübeck")
+    folded = system.extract_port_environmental_constraints(ports, "port of LUBECK")
+    assert by_name == folded
+    assert by_name != system._get_default_port_constraints()
+
+
+def test_port_names_resolve_the_same_with_and_without_a_catalog(ports):
+    system = DroneSelectionSystem()
+    snapshot = get_catalog().snapshot()
+    antwerpen = system.extract_port_environmental_constraints(ports, "Antwerpen")
+    assert system.extract_port_environmental_constraints(ports, "Antwerp") == antwerpen
+    with_catalog = system.run_selection(port_name="Antwerp", catalog=snapshot)
+    from_files = system.run_selection(port_name="Antwerp")
+    assert from_files["port_constraints"] == with_catalog["port_constraints"] == antwerpen
+    assert from_files["total"] == with_catalog["total"]
+
+    unknown = system.run_selection(port_name="Atlantis", catalog=snapshot)
+    assert "port 'Atlantis' not found" in unknown["summary"]
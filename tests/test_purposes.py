@@ -0,0 +1,92 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from purposes import PurposeIndex
+from utils import DEFAULT_DRONE_DATA_PATH, DroneSelectionSystem
+
+
+@pytest.fixture
+def system_and_drones():
+    system = DroneSelectionSystem()
+    return system, system.load_and_normalize_drone_data(DEFAULT_DRONE_DATA_PATH)
+
+
+def _expected(system, drones, purposes):
+    return list(system.purpose_based_drone_filtering(drones, list(purposes))["Drone Name"])
+
+
+def test_every_purpose_combination_matches_filtering(system_and_drones):
+    system, drones = system_and_drones
+    index = PurposeIndex(system, drones, cache_size=2048)
+    names = list(system.purpose_mapping)
+    for r in [0, 1, 2, 3, len(names) - 1, len(names)]:
+        for combo in itertools.combinations(names, r):
+            mask = index.mask(combo)
+            assert list(drones[mask]["Drone Name"]) == _expected(system, drones, combo)
+
+
+def test_single_purpose_bits(system_and_drones):
+    system, drones = system_and_drones
+    index = PurposeIndex(system, drones)
+    for i, purpose in enumerate(index.purposes):
+        has_bit = (index.bits >> np.uint64(i)) & np.uint64(1) == 1
+        assert list(drones[has_bit]["Drone Name"]) == _expected(system, drones, [purpose])
+
+
+def test_non_decomposable_combination_uses_aggregated_requirements(system_and_drones):
+    system, drones = system_and_drones
+    # The first value wins for a non-numeric attribute, so "Any" ignores the numeric threshold
+    system.purpose_mapping = {
+        "Lenient": {"Battery Life (minutes)": "Any"},
+        "Strict": {"Battery Life (minutes)": 50},
+    }
+    index = PurposeIndex(system, drones)
+    mask = index.mask(["Lenient", "Strict"])
+    assert mask.all()
+    assert list(drones[mask]["Drone Name"]) == _expected(system, drones, ["Lenient", "Strict"])
+
+
+def test_adding_purpose_updates_index_incrementally(system_and_drones):
+    system, drones = system_and_drones
+    index = PurposeIndex(system, drones)
+    cached = index.mask(["Port Security"])
+    old_bits = index.bits.copy()
+
+    system.purpose_mapping["Long Range Patrol"] = {"Flight Radius (km)": 30, "Battery Life (minutes)": 60}
+    mask = index.mask(["Port Security", "Long Range Patrol"], system.purpose_mapping)
+
+    assert index.purposes[-1] == "Long Range Patrol"
+    low_bits = np.uint64((1 << (len(index.purposes) - 1)) - 1)
+    assert np.array_equal(index.bits & low_bits, old_bits)
+    assert index.mask(["Port Security"]) is cached
+    assert list(drones[mask]["Drone Name"]) == _expected(system, drones, ["Port Security", "Long Range Patrol"])
+
+
+def test_mask_computed_during_a_sync_is_not_cached(system_and_drones):
+    system, drones = system_and_drones
+    system.purpose_mapping = {
+        "Lenient": {"Battery Life (minutes)": "Any"},
+        "Strict": {"Battery Life (minutes)": 50},
+    }
+    index = PurposeIndex(system, drones)
+    before = index.bits
+    changed = {"Lenient": {"Battery Life (minutes)": 40}, "Strict": {"Battery Life (minutes)": 50}}
+    compute = system.purpose_requirement_mask
+
+    def sync_meanwhile(df, requirements):
+        # Another thread changes "Lenient" while this mask is computed
+        system.purpose_requirement_mask = compute
+        index.sync(changed)
+        return compute(df, requirements)
+
+    system.purpose_requirement_mask = sync_meanwhile
+    assert index.mask(["Lenient", "Strict"]).all()
+    # sync swapped in new bits instead of writing into the array readers hold
+    assert index.bits is not before
+
+    system.purpose_mapping = changed
+    fresh = index.mask(["Lenient", "Strict"])
+    assert not fresh.all()
+    assert list(drones[fresh]["Drone Name"]) == _expected(system, drones, ["Lenient", "Strict"])
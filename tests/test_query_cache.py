@@ -0,0 +1,29 @@
+import time
+
+from query_cache import QueryCache
+
+
+def test_lru_eviction_and_counters():
+    cache = QueryCache(max_entries=2, ttl=60)
+    cache.put("a", "v1", 1)
+    cache.put("b", "v1", 2)
+    assert cache.get("a", "v1") == 1
+    cache.put("c", "v1", 3)  # evicts b, the least recently used
+    assert cache.get("b", "v1") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 1, 1)
+
+
+def test_ttl_expiry():
+    cache = QueryCache(ttl=0.01)
+    cache.put("a", "v1", 1)
+    time.sleep(0.02)
+    assert cache.get("a", "v1") is None
+
+
+def test_new_catalog_version_invalidates():
+    cache = QueryCache()
+    cache.put("a", "v1", 1)
+    assert cache.get("a", "v2") is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.get("a", "v1") is None
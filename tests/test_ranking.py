@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ranking import DecisionMatrix, get_engine, skyline_mask
+
+from utils import DEFAULT_DRONE_DATA_PATH, DroneSelectionSystem, rank_order
+
+
+def test_rank_order_partial_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.integers(0, 20, size=500).astype(float)  # many ties
+    scores[[3, 70]] = np.nan
+    full = rank_order(scores)
+    for k in [0, 1, 5, 37, 499, 500, 800]:
+        assert list(rank_order(scores, k)) == list(full[:k])
+    assert set(full[-2:]) == {3, 70}
+
+
+@pytest.fixture(scope="module")
+def ranked_inputs():
+    system = DroneSelectionSystem()
+    drones = system._add_cost_effectiveness(system.load_and_normalize_drone_data(DEFAULT_DRONE_DATA_PATH))
+    weights = system.ahp_priority_scaling({"Battery Life (minutes)": 4, "Wind Resistance (m/s)": 5,
+                                           "Camera Resolution (MP)": 3, "Price (EUR)": 2})
+    return system, drones, weights
+
+
+def test_wsm_page_is_slice_of_full_ranking(ranked_inputs):
+    system, drones, weights = ranked_inputs
+    full = system.weighted_sum_model_ranking(drones, weights)
+    assert full["WSM Score"].is_monotonic_decreasing
+    page = system.weighted_sum_model_ranking(drones, weights, top_k=7, offset=5)
+    assert list(page["Drone Name"]) == list(full["Drone Name"].iloc[5:12])
+    assert np.allclose(page["WSM Score"], full["WSM Score"].iloc[5:12])
+    assert list(page.columns) == list(full.columns)
+
+
+def test_run_selection_reports_total_separately(ranked_inputs):
+    system, _, _ = ranked_inputs
+    sliders = {"Battery Life (minutes)": 3, "Wind Resistance (m/s)": 3, "Camera Resolution (MP)": 3, "Price (EUR)": 3}
+    everything = system.run_selection(slider_values=sliders, budget=1e9, max_maintenance_cost=1e9)
+    page = system.run_selection(slider_values=sliders, budget=1e9, max_maintenance_cost=1e9, top_k=4, offset=2)
+    assert page["total"] == everything["total"] == len(everything["results"])
+    assert list(page["results"]["Drone Name"]) == list(everything["results"]["Drone Name"].iloc[2:6])
+
+
+def test_candidate_set_rank_matches_wsm(ranked_inputs):
+    from candidates import CandidateSet
+    system, drones, _ = ranked_inputs
+    criteria = ["Battery Life (minutes)", "Wind Resistance (m/s)", "Camera Resolution (MP)", "Price (EUR)"]
+    candidates = CandidateSet(system, drones, criteria)
+    for sliders in [(4, 5, 3, 2), (1, 1, 1, 5), (5, 2, 2, 1)]:
+        slider_values = dict(zip(criteria, sliders))
+        expected = system.weighted_sum_model_ranking(drones, system.ahp_priority_scaling(slider_values), top_k=10)
+        ranked, total = candidates.rank(slider_values, top_k=10)
+        assert total == len(drones)
+        assert list(ranked["Drone Name"]) == list(expected["Drone Name"])
+        assert np.allclose(ranked["WSM Score"], expected["WSM Score"])
+
+
+def test_price_is_a_cost_criterion(ranked_inputs):
+    system, drones, _ = ranked_inputs
+    ranked = system.weighted_sum_model_ranking(drones, {"Price (EUR)": 1.0})
+    prices = ranked["Price (EUR)"].to_numpy()
+    cheapest = drones["Price (EUR)"].min()
+    assert prices[0] == cheapest
+    assert ranked["Price (EUR)_normalized"].iloc[0] == 1.0
+
+
+def test_engines_on_small_decision_matrix():
+    # Price is a cost; "b" is dominated by "a" (cheaper, same battery)
+    frame = pd.DataFrame({"Battery Life (minutes)": [40.0, 40.0, 60.0, 20.0],
+                          "Price (EUR)": [1000.0, 1500.0, 3000.0, 500.0]}, index=list("abcd"))
+    decision = DecisionMatrix(frame, ["Battery Life (minutes)", "Price (EUR)"])
+    weights = np.array([0.5, 0.5])
+    assert list(decision.directions) == [1, -1]
+
+    order, scores, total = get_engine("skyline").rank(decision, weights)
+    assert total == 3 and set(frame.index[order]) == {"a", "c", "d"}
+
+    topsis = get_engine("topsis").scores(decision, weights)
+    assert topsis.argmax() == 0 and ((topsis >= 0) & (topsis <= 1)).all()
+
+    order, q, total = get_engine("vikor").rank(decision, weights)
+    assert frame.index[order[0]] == "a" and total == 4
+    assert q.min() == 0.0 and q.max() == 1.0
+
+    with pytest.raises(ValueError):
+        get_engine("electre")
+
+
+def test_skyline_matches_pairwise_dominance():
+    rng = np.random.default_rng(3)
+    points = np.round(rng.random((3000, 4)), 2)  # many ties and duplicates
+    at_least = (points[None] >= points[:, None]).all(axis=2)
+    better = (points[None] > points[:, None]).any(axis=2)
+    assert (skyline_mask(points) == ~(at_least & better).any(axis=1)).all()
+
+
+def test_rank_candidates_reports_skyline_size(ranked_inputs):
+    system, drones, weights = ranked_inputs
+    ranked, total = system.rank_candidates(drones, weights, method="skyline")
+    assert 0 < total == len(ranked) <= len(drones)
+    assert ranked["Skyline WSM Score"].is_monotonic_decreasing
+    page, page_total = system.rank_candidates(drones, weights, method="topsis", top_k=3, offset=1)
+    assert page_total == len(drones) and len(page) == 3
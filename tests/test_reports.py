@@ -0,0 +1,157 @@
+import re
+import statistics
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from pdf import PDFDocument
+from reports import ArtifactCache, ReportJobs, render_report
+
+MATCH = {
+    "port": "Hamburg",
+    "purposes": ["Port Security"],
+    "budget": 60000,
+    "maintenance_cost": 1500,
+    "battery_life_priority": 4,
+    "wind_resistance_priority": 5,
+    "camera_resolution_priority": 3,
+    "price_priority": 2,
+}
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    jobs = ReportJobs(ArtifactCache(str(tmp_path)), max_workers=2, max_pending=64)
+    monkeypatch.setattr(app_module, "report_jobs", jobs)
+    yield jobs
+    jobs.shutdown()
+
+
+@pytest.fixture
+def client(jobs):
+    app_module.match_cache.clear()
+    return app_module.app.test_client()
+
+
+def test_pdf_document_structure():
+    doc = PDFDocument("Test (report)")
+    doc.heading("Heading")
+    doc.table(["a", "b"], [[i, "x" * 200] for i in range(120)])
+    data = doc.render()
+
+    assert data.startswith(b"%PDF-1.4") and data.rstrip().endswith(b"%%EOF")
+    assert len(doc.pages) > 1
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    assert data[xref:xref + 4] == b"xref"
+    # Every object offset in the cross-reference table points at its object
+    offsets = re.findall(rb"(\d{10}) 00000 n", data)
+    for number, offset in enumerate(offsets, 1):
+        assert data[int(offset):].startswith(b"%d 0 obj" % number)
+
+
+def test_report_job_is_rendered_once_and_cached(client, jobs):
+    response = client.post("/api/v1/reports", json=MATCH)
+    assert response.status_code in (200, 202)
+    job = response.get_json()
+    assert jobs.wait(job["id"], timeout=60)["status"] == "done"
+
+    status = client.get(job["status_url"]).get_json()
+    assert status["status"] == "done"
+    first = client.get(job["download_url"])
+    assert first.status_code == 200
+    assert first.mimetype == "application/pdf"
+    assert first.data.startswith(b"%PDF")
+    assert "immutable" in first.headers["Cache-Control"]
+
+    # The same query (in any field order) is answered from the artifact cache
+    again = client.post("/api/v1/reports", json=dict(reversed(list(MATCH.items()))))
+    assert again.status_code == 200 and again.get_json()["id"] == job["id"]
+    assert client.get(job["download_url"]).data == first.data
+    assert client.get(job["download_url"], headers={"If-None-Match": f'"{job["id"]}"'}).status_code == 304
+
+    redirect = client.get("/export/pdf", query_string={**MATCH, "purpose": "Port Security"})
+    assert redirect.status_code == 303
+
+
+def test_report_contents(monkeypatch):
+    snapshot = app_module.catalog.snapshot()
+    status = {}
+
+    class Capture:
+        def submit(self, job_id, build):
+            status["report"] = build()
+            return {"id": job_id, "status": "queued"}
+
+    monkeypatch.setattr(app_module, "report_jobs", Capture())
+    app_module._submit_report(MATCH)
+
+    report = status["report"]
+    assert report["catalog_version"] == snapshot.version
+    assert report["port_constraints"]["maximum_wind_speed_m_s"] == pytest.approx(12.9)
+    assert sum(w["geometric"] for w in report["weights"]) == pytest.approx(1.0)
+    assert report["elimination"][0]["rows_in"] == len(snapshot.drones)
+    assert report["elimination"][-1]["rows_out"] == report["total"] == len(report["rows"])
+    assert render_report(report).startswith(b"%PDF")
+
+
+def test_jobs_build_off_the_submitting_thread(tmp_path):
+    jobs = ReportJobs(ArtifactCache(str(tmp_path)), max_workers=1, max_pending=4, failed_ttl=0.5)
+    release = threading.Event()
+
+    def slow():
+        release.wait(10)
+        raise ValueError("no report")
+
+    try:
+        start = time.perf_counter()
+        assert jobs.submit("a" * 64, slow)["status"] == "queued"
+        # Neither the submission nor a status read waits for the build
+        assert jobs.status("a" * 64)["status"] == "queued"
+        assert time.perf_counter() - start < 1
+        release.set()
+        assert jobs.wait("a" * 64, timeout=10)["error"] == "no report"
+        # A failure is reported for failed_ttl seconds, then forgotten
+        time.sleep(0.6)
+        assert jobs.status("a" * 64) is None
+    finally:
+        jobs.shutdown()
+
+
+def test_unknown_report(client):
+    assert client.get("/api/v1/reports/" + "0" * 64).status_code == 404
+    assert client.get("/api/v1/reports/../etc").status_code == 404
+    assert client.get("/api/v1/reports/" + "0" * 64 + "/pdf").status_code == 404
+
+
+def test_report_burst_does_not_delay_matching(client, jobs):
+    form = {"port": "Hamburg", "purpose": ["Port Security"], "budget": "60000", "maintenance_cost": "1500"}
+
+    def match_latencies(n=20):
+        latencies = []
+        for _ in range(n):
+            start = time.perf_counter()
+            assert client.post("/match-drones", data=form).status_code == 200
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    # Start the pool first, so the baseline does not include worker startup
+    jobs.wait(client.post("/api/v1/reports", json=MATCH).get_json()["id"], timeout=60)
+    baseline = match_latencies()
+
+    submitted = []
+    for budget in range(40):
+        start = time.perf_counter()
+        response = client.post("/api/v1/reports", json={**MATCH, "budget": 20000 + 1000 * budget})
+        submitted.append(time.perf_counter() - start)
+        assert response.status_code in (200, 202)
+    during = match_latencies()
+    for budget in range(40):
+        job_id = client.post("/api/v1/reports", json={**MATCH, "budget": 20000 + 1000 * budget}).get_json()["id"]
+        assert jobs.wait(job_id, timeout=120)["status"] == "done"
+
+    base = statistics.median(baseline)
+    # Queuing a report does not render it, and rendering does not block the request threads
+    assert statistics.median(submitted) < base + 0.25
+    assert statistics.median(during) < 3 * base + 0.05
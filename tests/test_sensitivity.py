@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from sensitivity import WeightSensitivity, sample_weights
+from utils import rank_order
+
+
+def test_sample_weights_on_simplex_around_base():
+    rng = np.random.default_rng(0)
+    base = np.array([0.5, 0.3, 0.0, 0.2])
+    weights = sample_weights(rng, 20000, base, concentration=200.0)
+    assert np.allclose(weights.sum(axis=1), 1.0)
+    assert (weights[:, 2] == 0).all()
+    assert np.allclose(weights.mean(axis=0), base, atol=0.005)
+
+
+@pytest.mark.parametrize("base", [None, np.array([0.4, 0.3, 0.2, 0.1]), np.array([0.5, 0.0, 0.3, 0.2])])
+def test_rank_counts_match_brute_force(base):
+    rng = np.random.default_rng(1)
+    matrix, bonus = rng.random((300, 4)), rng.random(300) * 0.1
+    engine = WeightSensitivity(matrix, np.ones(4, dtype=bool), bonus, top=5)
+    result = engine.run(base, samples=3000, seed=7, chunk_bytes=4 * 300 * 100)
+
+    # Same sample stream, ranked one sample at a time
+    weights = sample_weights(np.random.default_rng(7), 3000,
+                             np.ones(4) if base is None else base, 4.0 if base is None else 100.0)
+    expected = np.zeros((300, 5), dtype=int)
+    for row in weights @ matrix.T + bonus:
+        expected[rank_order(row, 5), np.arange(5)] += 1
+
+    assert list(result.positions) == list(np.flatnonzero(expected.sum(axis=1)))
+    assert (result.rank_counts == expected[result.positions]).all()
+    assert result.rank_counts[:, 0].sum() == 3000
+
+
+def test_records_report_probabilities_and_intervals():
+    matrix = np.array([[1.0, 0.0], [0.0, 1.0], [0.4, 0.4]])
+    engine = WeightSensitivity(matrix, np.ones(2, dtype=bool), top=2)
+    records = engine.run(None, samples=5000, seed=0).records(["a", "b", "c"], engine.base_ranks(np.array([0.5, 0.5])))
+    by_name = {r["name"]: r for r in records}
+    assert by_name["a"]["p_first"] + by_name["b"]["p_first"] == pytest.approx(1.0)
+    assert by_name["a"]["p_first"] == pytest.approx(0.5, abs=0.05)
+    # c (0.4 for any weights) is second whenever the weaker of a and b is below 0.4
+    assert by_name["c"]["p_first"] == 0 and by_name["c"]["p_top"] == pytest.approx(0.8, abs=0.03)
+    assert by_name["c"]["rank_median"] == 2
+    assert by_name["a"]["rank_low"] == 1 and by_name["a"]["rank_high"] is None
@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+import serve
+from catalog import resolve_data_path
+from config import Config
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="the pre-fork server needs os.fork")
+
+
+def _ready(url, unless_version=None, timeout=60):
+    """The /ready body once the server is ready with a catalog version other than unless_version."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url + "/ready", timeout=5) as response:
+                body = json.loads(response.read())
+            if body["catalog_version"] != unless_version:
+                return body
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise AssertionError("server did not become ready")
+
+
+def _matches(url):
+    with urllib.request.urlopen(url + "/metrics", timeout=5) as response:
+        text = response.read().decode()
+    return sum(int(line.rsplit(" ", 1)[1]) for line in text.splitlines()
+               if line.startswith('dss_request_duration_seconds_count{endpoint="/match-drones"'))
+
+
+def test_prefork_workers_serve_and_roll_over_on_catalog_change(tmp_path):
+    drones = tmp_path / "drones.csv"
+    shutil.copy(resolve_data_path(Config.DRONE_DATA_PATH), drones)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    env = dict(os.environ, HOST="127.0.0.1", PORT=str(port), WORKERS="2", THREADS="2",
+               CATALOG_CHECK_INTERVAL="0.5", GRACEFUL_TIMEOUT="10", DRONE_DATA_PATH=str(drones),
+               PORT_DATA_PATH=resolve_data_path(Config.PORT_DATA_PATH),
+               COLUMNAR_CACHE_DIR=str(tmp_path / "columnar"), REPORT_CACHE_DIR=str(tmp_path / "reports"))
+    server = subprocess.Popen([sys.executable, serve.__file__], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    try:
+        first = _ready(url)
+        assert first["status"] == "ready" and first["drones"] > 0 and first["pid"] != server.pid
+
+        form = b"port=Hamburg&purpose=Port+Security&budget=60000&maintenance_cost=1500"
+        for _ in range(4):
+            with urllib.request.urlopen(url + "/match-drones", data=form, timeout=30) as response:
+                assert response.status == 200
+        # Whichever worker answers, /metrics counts the requests of all of them
+        time.sleep(1.5)
+        assert _matches(url) == 4
+
+        # A changed drone file is loaded by the parent and served by a new generation of workers
+        lines = drones.read_text(encoding="utf-8-sig").splitlines()
+        drones.write_text("\n".join(lines + [lines[1]]) + "\n", encoding="utf-8")
+        updated = _ready(url, unless_version=first["catalog_version"])
+        assert updated["drones"] == first["drones"] + 1
+        assert updated["pid"] != first["pid"]
+        # The retired generation's requests stay counted
+        time.sleep(1.5)
+        assert _matches(url) == 4
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
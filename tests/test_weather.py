@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from catalog import DroneCatalog
+from utils import DEFAULT_DRONE_DATA_PATH, DEFAULT_PORT_DATA_PATH, DroneSelectionSystem
+from weather import WeatherStore, compile_weather, operability_fraction
+
+
+def _hourly(path, port, hours, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "country_code": "BE",
+        "port_name": port,
+        "timestamp": pd.date_range("2024-01-01", periods=hours, freq="h", tz="UTC").astype(str),
+        "wind_speed_m_s": rng.gamma(2.0, 3.0, hours).round(1),
+        "temperature_c": rng.normal(10, 8, hours).round(1),
+        "humidity_percent": rng.uniform(40, 100, hours).round(),
+    })
+    frame.loc[5, "wind_speed_m_s"] = np.nan  # a missing reading is not counted
+    frame.to_csv(path, index=False)
+    return frame
+
+
+def test_operability_matches_hour_by_hour_count(tmp_path):
+    frame = _hourly(tmp_path / "hourly.csv", "antwerpen", 500)
+    # Split into two files to exercise chunked, multi-source compiling
+    frame.iloc[:200].to_csv(tmp_path / "a.csv", index=False)
+    frame.iloc[200:].to_csv(tmp_path / "b.csv", index=False)
+    compile_weather([str(tmp_path / "a.csv"), str(tmp_path / "b.csv")], str(tmp_path / "store"), chunk_rows=64)
+    store = WeatherStore.open(str(tmp_path / "store"))
+    assert len(store) == 1 and store.hours == 500
+    series = store.series("be", "Antwerpen")
+    assert store.series("BE", "Gent") is None
+
+    drones = DroneSelectionSystem().load_and_normalize_drone_data(DEFAULT_DRONE_DATA_PATH)
+    fractions = operability_fraction(drones, series, hour_block=97)
+    recorded = frame.dropna(subset=["wind_speed_m_s"])
+    for i in [0, 7, 23]:
+        drone = drones.iloc[i]
+        ok = ((recorded["wind_speed_m_s"] <= drone["Wind Resistance (m/s)"])
+              & (recorded["temperature_c"] >= drone["temp_min_c"])
+              & (recorded["temperature_c"] <= drone["temp_max_c"]))
+        if not np.isnan(drone["humidity_max_pct"]):
+            ok &= recorded["humidity_percent"] <= drone["humidity_max_pct"]
+        assert fractions[i] == ok.mean()
+
+
+def test_selection_uses_an_operability_threshold(tmp_path):
+    _hourly(tmp_path / "hourly.csv", "Antwerpen", 24 * 60)
+    compile_weather([str(tmp_path / "hourly.csv")], str(tmp_path / "weather"))
+    catalog = DroneCatalog(DEFAULT_DRONE_DATA_PATH, DEFAULT_PORT_DATA_PATH, weather_dir=str(tmp_path / "weather"))
+    snapshot = catalog.snapshot()
+    system = DroneSelectionSystem()
+
+    hard = system.run_selection(port_name="Antwerpen", catalog=snapshot)
+    assert hard["operability"] is None
+    selection = system.run_selection(port_name="Antwerpen", catalog=snapshot, operability_threshold=0.8,
+                                     diagnostics=True)
+    assert selection["operability"] == {"threshold": 0.8, "hours": 24 * 60}
+    results = selection["results"]
+    assert not results.empty and (results["Operability"] >= 0.8).all()
+    keys = [c["key"] for c in selection["diagnostics"].constraints()]
+    assert "port:operability" in keys and "port:wind" not in keys and "port:temperature" not in keys
+
+    # The fused plan and the stage-by-stage filter agree
+    fused = system.run_selection(port_name="Antwerpen", catalog=snapshot, operability_threshold=0.8)
+    assert sorted(fused["results"]["Drone Name"]) == sorted(results["Drone Name"])
+    series = snapshot.weather.series("BE", "Antwerpen")
+    staged = system.filter_drones_by_port_constraints(
+        snapshot.drones, selection["port_constraints"], operability_threshold=0.8, weather=series)
+    assert sorted(staged["Drone Name"]) == sorted(results["Drone Name"])
+
+    # Ports without weather keep the worst-case cutoffs
+    gent = system.run_selection(port_name="Gent", catalog=snapshot, operability_threshold=0.8)
+    assert gent["operability"] is None and "Operability" not in gent["results"].columns
+
+
+def test_port_without_recorded_hours_keeps_the_cutoffs(tmp_path):
+    frame = _hourly(tmp_path / "hourly.csv", "Antwerpen", 48)
+    # Humidity only
+    frame.assign(wind_speed_m_s=np.nan).to_csv(tmp_path / "hourly.csv", index=False)
+    compile_weather([str(tmp_path / "hourly.csv")], str(tmp_path / "weather"))
+    snapshot = DroneCatalog(DEFAULT_DRONE_DATA_PATH, DEFAULT_PORT_DATA_PATH,
+                            weather_dir=str(tmp_path / "weather")).snapshot()
+    system = DroneSelectionSystem()
+    assert snapshot.weather.series("BE", "Antwerpen") is not None
+
+    hard = system.run_selection(port_name="Antwerpen", catalog=snapshot)
+    selection = system.run_selection(port_name="Antwerpen", catalog=snapshot, operability_threshold=0.8)
+    assert selection["operability"] is None
+    assert list(selection["results"]["Drone Name"]) == list(hard["results"]["Drone Name"]) != []
+    staged = system.filter_drones_by_port_constraints(
+        snapshot.drones, selection["port_constraints"], operability_threshold=0.8,
+        weather=snapshot.weather.series("BE", "Antwerpen"))
+    assert sorted(staged["Drone Name"]) == sorted(hard["results"]["Drone Name"])